@@ -1,10 +1,14 @@
 """Main package initialization"""
 
-from bbox import metrics, utils
+from bbox import evaluation, iou_variants, matching, metrics, utils
 from bbox.bbox2d import BBox2D
-from bbox.bbox2d_list import BBox2DList
+from bbox.bbox2d_index import BBox2DIndex
+from bbox.bbox2d_list import BBox2DList, BBox2DListBuilder
 from bbox.bbox3d import BBox3D
+from bbox.bbox3d_list import BBox3DList
 from bbox.box_modes import XYWH, XYXY
+from bbox.rotated_bbox2d import RotatedBBox2D
+from bbox.rotated_bbox2d_list import RotatedBBox2DList
 
 __author__ = "Varun Agrawal"
 __copyright__ = "Varun Agrawal"
@@ -0,0 +1,313 @@
+"""Spatial index over 2D bounding boxes."""
+
+# pylint: disable=invalid-name,missing-docstring
+
+import numpy as np
+
+from bbox.bbox2d import BBox2D
+from bbox.bbox2d_list import BBox2DList
+from bbox.box_modes import XYWH, XYXY
+from bbox.kernels import jaccard_index_xyxy
+
+
+def _as_xyxy(boxes, mode=XYWH):
+    """
+    Get the (N, 4) XYXY float array of `boxes`, which can be anything accepted by \
+        :py:class:`BBox2DList`.
+    """
+    if isinstance(boxes, BBox2D):
+        boxes = [boxes]
+    if not isinstance(boxes, BBox2DList):
+        boxes = BBox2DList(boxes, mode=mode)
+    return boxes.bboxes.astype(np.float64)
+
+
+class BBox2DIndex:
+    """
+    Uniform grid index over a set of 2D bounding boxes, to find the boxes overlapping \
+        other boxes or containing points without comparing against all of them.
+
+    Every box is registered in the grid cells it covers, so a query only looks at the boxes
+    registered in the cells covered by the query. A pair of overlapping boxes is reported
+    from the single cell containing the top-left corner of their intersection, so that no
+    duplicate has to be removed. All the queries of a batch are answered at once.
+
+    The indices returned by the queries are the indices of the boxes in the list the index
+    was built from, followed by the indices returned by :py:meth:`insert`.
+
+    Args:
+        bbl (:py:class:`BBox2DList`): List of 2D bounding boxes to index.
+        cell_size (:py:class:`float` or :py:class:`tuple`, optional): Width and height of the \
+            grid cells. Defaults to the mean width and height of the boxes, enlarged if \
+            needed so that there are not many more cells than boxes.
+    """
+
+    def __init__(self, bbl, cell_size=None):
+        self._boxes = np.zeros((0, 4))
+        self._alive = np.zeros(0, dtype=bool)
+        # cell size given by the user, kept when the grid is rebuilt
+        self._fixed_cell_size = None
+        self.rebuild(bbl, cell_size=cell_size)
+
+    def __len__(self):
+        return int(np.count_nonzero(self._alive))
+
+    @property
+    def bboxes(self):
+        """
+        :py:class:`ndarray`: Array of shape (N, 4) of the boxes in XYXY format, \
+            including the removed ones.
+        """
+        return self._boxes
+
+    @property
+    def cell_size(self):
+        """
+        :py:class:`ndarray`: Width and height of the grid cells.
+        """
+        return self._cell_size
+
+    def rebuild(self, bbl=None, cell_size=None):
+        """
+        Build the grid again, from the boxes currently indexed or from a new list of boxes.
+
+        Args:
+            bbl (:py:class:`BBox2DList`, optional): New list of 2D bounding boxes to index, \
+                which replaces all the boxes currently indexed.
+            cell_size (:py:class:`float` or :py:class:`tuple`, optional): Width and height of \
+                the grid cells, see :py:class:`BBox2DIndex`. Defaults to the cell size last \
+                given to the index, if any, which is also used by the automatic rebuilds.
+        """
+        if cell_size is None:
+            cell_size = self._fixed_cell_size
+
+        if bbl is not None:
+            self._boxes = _as_xyxy(bbl)
+            self._alive = np.ones(self._boxes.shape[0], dtype=bool)
+
+        boxes = self._boxes[self._alive]
+        lo, hi = boxes[:, 0:2], boxes[:, 2:4] + 1
+
+        if boxes.shape[0] > 0:
+            self._origin = lo.min(axis=0)
+            extent = np.maximum(hi.max(axis=0) - self._origin, 1)
+        else:
+            self._origin = np.zeros(2)
+            extent = np.ones(2)
+
+        if cell_size is None:
+            size = (hi - lo).mean(axis=0) if boxes.shape[0] > 0 else extent
+            size = np.maximum(size, 1)
+            # avoid grids with many more cells than boxes
+            n_cells = np.prod(np.ceil(extent / size))
+            max_cells = 4 * boxes.shape[0] + 16
+            if n_cells > max_cells:
+                size = size * np.sqrt(n_cells / max_cells)
+        else:
+            size = np.broadcast_to(np.asarray(cell_size, dtype=np.float64), (2,))
+            if np.any(size <= 0):
+                raise ValueError("cell_size should be positive.")
+            self._fixed_cell_size = size
+        self._cell_size = np.array(size, dtype=np.float64)
+        self._shape = np.maximum(np.ceil(extent / self._cell_size), 1).astype(np.intp)
+
+        ids = np.flatnonzero(self._alive)
+        owner, keys = self._cells(lo, hi)
+        order = np.argsort(keys, kind='stable')
+        self._entries = ids[owner[order]]
+        n_cells = int(np.prod(self._shape))
+        self._starts = np.zeros(n_cells + 1, dtype=np.intp)
+        np.cumsum(np.bincount(keys, minlength=n_cells), out=self._starts[1:])
+
+        # boxes updated since the last rebuild are registered separately
+        self._stale = np.zeros(self._boxes.shape[0], dtype=bool)
+        self._extra_keys = np.zeros(0, dtype=np.intp)
+        self._extra_entries = np.zeros(0, dtype=np.intp)
+
+    def _cell_of(self, points):
+        """Grid coordinates of the cells containing `points`, clipped to the grid."""
+        cells = np.floor((points - self._origin) / self._cell_size)
+        return np.clip(cells, 0, self._shape - 1).astype(np.intp)
+
+    def _key(self, cells):
+        return cells[:, 1] * self._shape[0] + cells[:, 0]
+
+    def _cells(self, lo, hi):
+        """
+        Expand the rectangles [lo, hi] into the cells they cover.
+
+        Returns:
+            tuple: The index of the rectangle and the key of every covered cell.
+        """
+        c0, c1 = self._cell_of(lo), self._cell_of(hi)
+        span = c1 - c0 + 1
+        counts = span[:, 0] * span[:, 1]
+
+        owner = np.repeat(np.arange(lo.shape[0]), counts)
+        offsets = np.arange(owner.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = c0[owner] + np.stack((offsets % span[owner, 0], offsets // span[owner, 0]),
+                                     axis=1)
+        return owner, self._key(cells)
+
+    def _lookup(self, owner, keys):
+        """
+        Find the boxes registered in the cells `keys`.
+
+        Returns:
+            tuple: The `owner` and the key of the cell of every found box, and the box index.
+        """
+        def gather(begin, end, entries):
+            counts = end - begin
+            idx = np.repeat(np.arange(keys.shape[0]), counts)
+            offsets = np.arange(idx.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+            return idx, entries[np.repeat(begin, counts) + offsets]
+
+        i1, b1 = gather(self._starts[keys], self._starts[keys + 1], self._entries)
+        mask = ~self._stale[b1]
+        i1, b1 = i1[mask], b1[mask]
+
+        i2, b2 = gather(np.searchsorted(self._extra_keys, keys, side='left'),
+                        np.searchsorted(self._extra_keys, keys, side='right'),
+                        self._extra_entries)
+
+        idx = np.concatenate((i1, i2))
+        boxes = np.concatenate((b1, b2))
+        mask = self._alive[boxes]
+        idx, boxes = idx[mask], boxes[mask]
+        return owner[idx], keys[idx], boxes
+
+    def _register(self, ids):
+        """Register the boxes `ids` in the cells of the updated boxes."""
+        ids = np.asarray(ids, dtype=np.intp)
+        keep = ~np.isin(self._extra_entries, ids)
+        boxes = self._boxes[ids]
+        owner, keys = self._cells(boxes[:, 0:2], boxes[:, 2:4] + 1)
+
+        keys = np.concatenate((self._extra_keys[keep], keys))
+        entries = np.concatenate((self._extra_entries[keep], ids[owner]))
+        order = np.argsort(keys, kind='stable')
+        self._extra_keys, self._extra_entries = keys[order], entries[order]
+        self._stale[ids] = True
+
+        # the grid is built again once the updates dominate it
+        if self._extra_entries.shape[0] > max(self._entries.shape[0], 64):
+            self.rebuild()
+
+    def update(self, indices, boxes, mode=XYWH):
+        """
+        Replace the boxes at `indices` with `boxes`.
+
+        Args:
+            indices (:py:class:`int` or :py:class:`ndarray`): Indices of the boxes to update.
+            boxes: New boxes, as accepted by :py:class:`BBox2DList`.
+            mode (BoxMode2D): Format of `boxes` if not a :py:class:`BBox2DList`.
+        """
+        indices = np.atleast_1d(np.asarray(indices, dtype=np.intp))
+        boxes = _as_xyxy(boxes, mode=mode)
+        if boxes.shape[0] != indices.shape[0]:
+            raise ValueError("indices and boxes should have the same number of elements.")
+        if not np.all(self._alive[indices]):
+            raise IndexError("Cannot update boxes which are not in the index.")
+
+        self._boxes[indices] = boxes
+        self._register(indices)
+
+    def insert(self, boxes, mode=XYWH):
+        """
+        Add new boxes to the index.
+
+        Args:
+            boxes: New boxes, as accepted by :py:class:`BBox2DList`.
+            mode (BoxMode2D): Format of `boxes` if not a :py:class:`BBox2DList`.
+
+        Returns:
+            :py:class:`ndarray`: Indices of the new boxes.
+        """
+        boxes = _as_xyxy(boxes, mode=mode)
+        ids = np.arange(self._boxes.shape[0], self._boxes.shape[0] + boxes.shape[0])
+
+        self._boxes = np.concatenate((self._boxes, boxes))
+        self._alive = np.concatenate((self._alive, np.ones(boxes.shape[0], dtype=bool)))
+        self._stale = np.concatenate((self._stale, np.zeros(boxes.shape[0], dtype=bool)))
+        self._register(ids)
+        return ids
+
+    def remove(self, indices):
+        """
+        Remove the boxes at `indices` from the index. The indices of the other boxes \
+            do not change.
+
+        Args:
+            indices (:py:class:`int` or :py:class:`ndarray`): Indices of the boxes to remove.
+        """
+        self._alive[np.asarray(indices, dtype=np.intp)] = False
+
+    def query_overlaps(self, boxes, mode=XYWH):
+        """
+        Find the pairs of query boxes and indexed boxes which overlap, i.e. have \
+            an intersection of positive area.
+
+        Args:
+            boxes: Query boxes, as accepted by :py:class:`BBox2DList`.
+            mode (BoxMode2D): Format of `boxes` if not a :py:class:`BBox2DList`.
+
+        Returns:
+            tuple: Index arrays `(query_idx, box_idx)` of the overlapping pairs, \
+                sorted by query and box index.
+        """
+        queries = _as_xyxy(boxes, mode=mode)
+        owner, keys = self._cells(queries[:, 0:2], queries[:, 2:4] + 1)
+        q, keys, b = self._lookup(owner, keys)
+
+        a, c = queries[q], self._boxes[b]
+        corner = np.maximum(a[:, 0:2], c[:, 0:2])
+        overlap = np.all(np.minimum(a[:, 2:4], c[:, 2:4]) + 1 > corner, axis=1)
+
+        # report every pair only from the cell containing the corner of the intersection
+        mask = overlap & (self._key(self._cell_of(corner)) == keys)
+        q, b = q[mask], b[mask]
+
+        order = np.lexsort((b, q))
+        return q[order], b[order]
+
+    def query_point(self, points):
+        """
+        Find the pairs of points and indexed boxes containing them, \
+            with the same convention as :py:meth:`BBox2D.contains`.
+
+        Args:
+            points: Array of shape (P, 2) of (x, y) points.
+
+        Returns:
+            tuple: Index arrays `(point_idx, box_idx)` of the pairs, \
+                sorted by point and box index.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        p, _, b = self._lookup(np.arange(points.shape[0]), self._key(self._cell_of(points)))
+
+        c = self._boxes[b]
+        mask = np.all((c[:, 0:2] <= points[p]) & (points[p] <= c[:, 2:4]), axis=1)
+        p, b = p[mask], b[mask]
+
+        order = np.lexsort((b, p))
+        return p[order], b[order]
+
+    def query_iou_above(self, boxes, thresh, mode=XYWH):
+        """
+        Find the pairs of query boxes and indexed boxes whose IoU is greater than `thresh`.
+
+        Args:
+            boxes: Query boxes, as accepted by :py:class:`BBox2DList`.
+            thresh (:py:class:`float`): Minimum IoU, at least 0.
+            mode (BoxMode2D): Format of `boxes` if not a :py:class:`BBox2DList`.
+
+        Returns:
+            tuple: Index arrays `(query_idx, box_idx)` of the pairs, sorted by query and \
+                box index, and the IoU of every pair.
+        """
+        queries = _as_xyxy(boxes, mode=mode)
+        q, b = self.query_overlaps(queries, mode=XYXY)
+        iou = jaccard_index_xyxy(queries[q], self._boxes[b])
+
+        mask = iou > thresh
+        return q[mask], b[mask], iou[mask]
@@ -9,10 +9,54 @@ from bbox.bbox2d import BBox2D
 from bbox.box_modes import XYXY, XYWH
 
 
+def _as_box_array(arr):
+    """
+    Convert `arr` to a numeric 2D array of shape (N, 4), one bounding box per row.
+    Rows with extra dimensions (e.g. a 2x2 ndarray) are flattened, as done by :py:class:`BBox2D`.
+    """
+    try:
+        arr = np.asarray(arr)
+    except ValueError:
+        raise ValueError(
+            "Invalid input length. Each element should have 4 elements.")
+
+    if arr.dtype.kind not in "biuf":
+        arr = arr.astype(np.float64)
+
+    arr = arr.reshape(arr.shape[0], -1)
+    if arr.shape[1] != 4:
+        raise ValueError(
+            "Invalid input length. Each element should have 4 elements.")
+    return arr
+
+
+def _to_xyxy(arr, mode=XYWH, dtype=np.float64):
+    """
+    Convert an (N, 4) array of bounding boxes in `mode` format to the XYXY format.
+    This is the vectorized equivalent of calling ``BBox2D(x, mode=mode).numpy(mode=XYXY)``
+    on every row `x` of `arr`, and performs the same arithmetic so the results are identical.
+    """
+    if mode == XYXY:
+        w = arr[:, 2] - arr[:, 0] + 1
+        h = arr[:, 3] - arr[:, 1] + 1
+    elif mode == XYWH:
+        w = arr[:, 2]
+        h = arr[:, 3]
+    else:
+        raise ValueError('argument mode has invalid value')
+
+    bboxes = np.empty(arr.shape, dtype=dtype)
+    bboxes[:, 0:2] = arr[:, 0:2]
+    # (x2, y2) will be used for indexing, hence we need to subtract 1
+    bboxes[:, 2] = bboxes[:, 0] + w - 1
+    bboxes[:, 3] = bboxes[:, 1] + h - 1
+    return bboxes
+
+
 class BBox2DList:
     """Bounding Box 2D list class."""
 
-    def __init__(self, arr, mode=XYWH):
+    def __init__(self, arr, mode=XYWH, dtype=None):
         """
         Class to reprsent a list of 2D bounding boxes.
         Expects an iterable of bounding boxes of the form
@@ -23,6 +67,9 @@ class BBox2DList:
             mode (BoxMode): Indicator of box format (x, y, w, h) or (x1, y1, x2, y2). \
                 The values are 0 for XYWH format and 1 for XYXY format.\
                     See :py:mod:`~bbox.box_modes`.
+            dtype (data-type, optional): Storage type of the boxes, e.g. `np.float32` or \
+                `np.int32`. Defaults to `np.float64`, or to the storage type of `arr` if it \
+                is a :py:class:`BBox2DList`.
 
         Raises
             ValueError: If `x` is not of length 4.
@@ -30,27 +77,27 @@ class BBox2DList:
 
         """
         # Internally, we record the Bounding Box list as a 2D ndarray in XYXY format.
+        if dtype is None and not isinstance(arr, BBox2DList):
+            dtype = np.float64
 
         # We convert arr to a 2D numpy array when possible
         # check if input is a list
         if isinstance(arr, list):
             # if the list is empty, set the input to be an empty numpy array
             if not arr:
-                self.bboxes = np.empty((0, 4))
+                self.bboxes = np.empty((0, 4), dtype=dtype)
 
             # list is not empty, so we continue
             else:
                 # check if the list elements are either numpy arrays or lists
-                # if yes, then convert to a list of BBox2D objects
+                # if yes, then convert them all at once to an (N, 4) array
                 if all(isinstance(x, np.ndarray) or isinstance(x, list) for x in arr):
-                    self.bboxes = np.asarray([
-                        BBox2D(x, mode=mode).numpy(mode=XYXY)
-                        for x in arr])
+                    self.bboxes = _to_xyxy(_as_box_array(arr), mode=mode, dtype=dtype)
 
                 elif all(isinstance(x, BBox2D) for x in arr):
                     # parse a list of BBox2D objects
                     self.bboxes = np.asarray(
-                        [x.numpy(mode=XYXY) for x in arr])
+                        [x.numpy(mode=XYXY) for x in arr], dtype=dtype)
 
                 else:
                     raise TypeError(
@@ -61,7 +108,7 @@ class BBox2DList:
         elif isinstance(arr, np.ndarray):
             # Check for empty ndarray
             if arr.ndim == 2 and arr.shape[0] == 0:
-                self.bboxes = np.empty((0, 4))
+                self.bboxes = np.empty((0, 4), dtype=dtype)
 
             else:
                 # if input is a 1D vector, we add the second dimension
@@ -76,17 +123,73 @@ class BBox2DList:
                     raise ValueError(err_msg)
 
                 # parse the input
-                self.bboxes = np.asarray(
-                    [BBox2D(x, mode=mode).numpy(mode=XYXY) for x in arr], dtype=np.float64)
+                self.bboxes = _to_xyxy(_as_box_array(arr), mode=mode, dtype=dtype)
 
         # if `arr` is a BBox2DList, just make a copy
         elif isinstance(arr, BBox2DList):
-            self.bboxes = arr.bboxes
+            self.bboxes = arr.bboxes if dtype is None else arr.bboxes.astype(dtype, copy=False)
 
         else:
             raise TypeError(
                 "Invalid input type. Please use a list or a numpy array.")
 
+    @classmethod
+    def from_buffer(cls, buffer, mode=XYXY, copy=False, readonly=False):
+        """
+        Create a bounding box list directly on top of an existing buffer.
+
+        `buffer` can be a :py:class:`ndarray`, a :py:class:`memoryview` or any object
+        supporting the buffer protocol, holding either an (N, 4) array or a flat array
+        of 4N values. The element type of the buffer is preserved.
+
+        When `copy=False`, the returned list is a view: no data is copied, modifying
+        the list (e.g. via the coordinate setters) writes into `buffer`, and changes
+        made to `buffer` by the caller are visible in the list. The caller must keep
+        `buffer` alive and unchanged in size for as long as the list is used.
+
+        Args:
+            buffer: Buffer of bounding boxes.
+            mode (BoxMode2D): Indicator of box format (x, y, w, h) or (x1, y1, x2, y2). \
+                Only XYXY can be wrapped without copying. See :py:mod:`~bbox.box_modes`.
+            copy (:py:class:`bool`): If True, the boxes are copied into a new array \
+                (default is False).
+            readonly (:py:class:`bool`): If True, the boxes of the returned list cannot be \
+                modified. The caller's buffer remains writeable (default is False).
+
+        Raises:
+            ValueError: If the buffer cannot be viewed as an (N, 4) array, or if a view \
+                is requested for a mode other than XYXY.
+        """
+        if isinstance(buffer, np.ndarray):
+            data = buffer
+        else:
+            data = np.asarray(memoryview(buffer))
+
+        if data.ndim == 1 and data.shape[0] % 4 == 0:
+            data = np.reshape(data, (-1, 4), copy=None if copy else False)
+        if data.ndim != 2 or data.shape[1] != 4:
+            raise ValueError(
+                "Invalid dimensions. Expected buffer of size Nx4 or 4N. "
+                "Got {0}".format(data.shape))
+
+        if mode != XYXY:
+            if not copy:
+                raise ValueError(
+                    "Only XYXY buffers can be wrapped without a copy. Use copy=True.")
+            data = _to_xyxy(data, mode=mode, dtype=data.dtype)
+        elif copy:
+            data = data.copy()
+        else:
+            # take a view so that marking it read-only does not affect the caller's array
+            data = data.view()
+
+        if readonly:
+            data.flags.writeable = False
+
+        bbl = cls.__new__(cls)
+        bbl.bboxes = data
+        return bbl
+
     def __eq__(self, x):
         if not isinstance(x, BBox2DList):
             return False
@@ -107,17 +210,28 @@ class BBox2DList:
     def __len__(self):
         return self.bboxes.shape[0]
 
-    def mul(self, scale):
+    @property
+    def dtype(self):
+        """
+        :py:class:`numpy.dtype`: Storage type of the bounding boxes.
+        """
+        return self.bboxes.dtype
+
+    def mul(self, scale, dtype=None):
         """
         Scale the bounding boxes by the factor `s`.
 
         Args:
             scale : Scalar factor to scale by.
+            dtype (data-type, optional): Storage type of the result. Defaults to the storage \
+                type of this list promoted with `scale`, so that integer boxes scaled by \
+                a float are stored as float64 instead of being truncated.
         """
         if not isinstance(scale, (int, float)):
             raise ValueError(
                 "Bounding boxes can only be multiplied by scalar (int or float)")
-        return BBox2DList(self.bboxes * scale, mode=XYXY)
+        scaled = self.bboxes * scale
+        return BBox2DList(scaled, mode=XYXY, dtype=scaled.dtype if dtype is None else dtype)
 
     def __mul__(self, val):
         return self.mul(val)
@@ -235,12 +349,15 @@ class BBox2DList:
         """
         return self.bboxes.shape
 
-    def append(self, x, mode=XYWH):
+    def append(self, x, mode=XYWH, dtype=None):
         """
         Append a bounding box to the bounding box list.
 
         Args:
             x: Bounding box to append.
+            dtype (data-type, optional): Storage type of the result (default is the storage \
+                type of this list). The coordinates are cast to this type, so they are \
+                truncated if it is an integer type.
         """
         if isinstance(x, (tuple, list, np.ndarray)):
             try:
@@ -271,15 +388,19 @@ class BBox2DList:
             raise TypeError(
                 "Expected input of type (list, tuple, np.ndarray, BBox2D)")
 
-        return BBox2DList(np.append(self.bboxes, x, axis=0), mode=XYXY)
+        return BBox2DList(np.append(self.bboxes, x, axis=0), mode=XYXY,
+                          dtype=self.dtype if dtype is None else dtype)
 
-    def insert(self, x, idx, mode=XYWH):
+    def insert(self, x, idx, mode=XYWH, dtype=None):
         """
         Insert a bounding box at a specific location.
 
         Args:
             x: Bounding box to insert.
             idx (:py:class:`int`): Position where to insert bounding box.
+            dtype (data-type, optional): Storage type of the result (default is the storage \
+                type of this list). The coordinates are cast to this type, so they are \
+                truncated if it is an integer type.
         """
         if isinstance(x, (tuple, list, np.ndarray)):
             try:
@@ -306,7 +427,8 @@ class BBox2DList:
         # ensure that the input is in 2 point format
         x = x.numpy(mode=XYXY).reshape(1, 4)
 
-        return BBox2DList(np.insert(self.bboxes, idx, x, axis=0), mode=XYXY)
+        return BBox2DList(np.insert(self.bboxes, idx, x, axis=0), mode=XYXY,
+                          dtype=self.dtype if dtype is None else dtype)
 
     def delete(self, index):
         """
@@ -315,7 +437,63 @@ class BBox2DList:
         Args:
             index (:py:class:`int`): Index of the box to delete.
         """
-        return BBox2DList(np.delete(self.bboxes, index, axis=0), mode=XYXY)
+        return BBox2DList(np.delete(self.bboxes, index, axis=0), mode=XYXY, dtype=self.dtype)
+
+    def contains_points(self, points, sparse=False, tile_size=None):
+        """
+        Check which points are inside which bounding boxes, \
+            with the same convention as :py:meth:`BBox2D.contains`.
+
+        The boxes and points are compared in blocks of `tile_size` x `tile_size` pairs,
+        so the peak memory used besides the output is proportional to `tile_size**2`.
+
+        Args:
+            points: Array of shape (P, 2) of (x, y) points.
+            sparse (:py:class:`bool`): If True, return the index pairs of the boxes and \
+                the points they contain instead of the dense matrix (default is False).
+            tile_size (:py:class:`int`, optional): Maximum number of boxes and points \
+                compared at once. By default all the pairs are compared in a single block.
+
+        Returns:
+            :py:class:`ndarray`: Boolean matrix of shape (N, P), or if `sparse` is True, \
+                a tuple of index arrays `(box_idx, point_idx)` sorted by box and point index.
+
+        Raises:
+            ValueError: If `points` is not of shape (P, 2).
+        """
+        points = np.asarray(points)
+        if points.ndim == 1 and points.shape[0] == 2:
+            points = points[np.newaxis, :]
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError("Invalid argument points. Expected array of shape (P, 2).")
+
+        n, p = self.bboxes.shape[0], points.shape[0]
+        tile_n = max(n if tile_size is None else tile_size, 1)
+        tile_p = max(p if tile_size is None else tile_size, 1)
+
+        x, y = points[np.newaxis, :, 0], points[np.newaxis, :, 1]
+        out = None if sparse else np.empty((n, p), dtype=bool)
+        rows, cols = [], []
+
+        for i in range(0, n, tile_n):
+            b = self.bboxes[i:i + tile_n, :, np.newaxis]
+            for j in range(0, p, tile_p):
+                xj, yj = x[:, j:j + tile_p], y[:, j:j + tile_p]
+                inside = (b[:, 0] <= xj) & (xj <= b[:, 2]) & (b[:, 1] <= yj) & (yj <= b[:, 3])
+                if sparse:
+                    r, c = np.nonzero(inside)
+                    rows.append(r + i)
+                    cols.append(c + j)
+                else:
+                    out[i:i + tile_n, j:j + tile_p] = inside
+
+        if not sparse:
+            return out
+
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.intp)
+        cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.intp)
+        order = np.lexsort((cols, rows))
+        return rows[order], cols[order]
 
     def copy(self):
         """
@@ -323,17 +501,170 @@ class BBox2DList:
         """
         return deepcopy(self)
 
-    def numpy(self, mode=XYWH):
+    def numpy(self, mode=XYWH, dtype=None):
         """
         Return np.ndarray of shape (N, 4) representing all the bounding boxes.
 
         Args:
             mode (BoxMode2D): Mode in which to return the box. See :py:mod:`~bbox.box_modes`.
+            dtype (data-type, optional): Type of the returned array (default is the storage \
+                type of this list).
         """
         if mode == XYXY:
-            return self.bboxes
+            if dtype is None:
+                return self.bboxes
+            return self.bboxes.astype(dtype, copy=False)
         else:
-            bboxes = deepcopy(self.bboxes)
+            bboxes = self.bboxes.astype(self.dtype if dtype is None else dtype, copy=True)
             bboxes[:, 2] = bboxes[:, 2] - bboxes[:, 0] + 1
             bboxes[:, 3] = bboxes[:, 3] - bboxes[:, 1] + 1
             return bboxes
+
+
+class BBox2DListBuilder:
+    """
+    Growable buffer to incrementally build a :py:class:`BBox2DList`.
+
+    Boxes are written in place into a preallocated array whose capacity is doubled
+    whenever it runs out of space, so appending N boxes one at a time costs O(N)
+    amortized instead of the O(N^2) of repeated :py:meth:`BBox2DList.append` calls.
+
+    Args:
+        capacity (:py:class:`int`, optional): Initial number of boxes to allocate space for \
+            (default is 16).
+        dtype (data-type, optional): Storage type of the boxes (default is `np.float64`).
+    """
+
+    def __init__(self, capacity=16, dtype=np.float64):
+        if capacity < 0:
+            raise ValueError("Capacity cannot be negative.")
+        self._buffer = np.empty((capacity, 4), dtype=dtype)
+        self._size = 0
+        # set when the buffer is shared with a BBox2DList returned by `build`
+        self._shared = False
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        """
+        :py:class:`int`: Number of boxes that fit in the buffer without reallocating.
+        """
+        return self._buffer.shape[0]
+
+    @property
+    def dtype(self):
+        """
+        :py:class:`numpy.dtype`: Storage type of the bounding boxes.
+        """
+        return self._buffer.dtype
+
+    def reserve(self, capacity):
+        """
+        Ensure the buffer can hold at least `capacity` boxes.
+
+        Args:
+            capacity (:py:class:`int`): Minimum number of boxes.
+        """
+        if capacity > self.capacity:
+            # grow geometrically so that repeated appends are amortized O(1)
+            capacity = max(capacity, 2 * self.capacity)
+        elif self._shared:
+            # copy-on-write so that a previously built list is not modified
+            capacity = self.capacity
+        else:
+            return
+
+        buffer = np.empty((capacity, 4), dtype=self.dtype)
+        buffer[:self._size] = self._buffer[:self._size]
+        self._buffer = buffer
+        self._shared = False
+
+    def _convert(self, x, mode):
+        if isinstance(x, BBox2DList):
+            return x.numpy(mode=XYXY)
+
+        if isinstance(x, BBox2D):
+            return x.numpy(mode=XYXY).reshape(1, 4)
+
+        if isinstance(x, (tuple, list, np.ndarray)):
+            x = np.asarray(x)
+            if x.ndim == 1:
+                x = x[np.newaxis, :]
+            if x.ndim != 2 or x.shape[1] != 4:
+                raise ValueError(
+                    "Input should have shape Nx4, got {0}".format(x.shape))
+            return _to_xyxy(_as_box_array(x), mode=mode, dtype=self.dtype)
+
+        raise TypeError(
+            "Expected input of type (list, tuple, np.ndarray, BBox2D, BBox2DList)")
+
+    def append(self, x, mode=XYWH):
+        """
+        Append a bounding box to the end of the buffer.
+
+        Args:
+            x: Bounding box to append, as a list/tuple/ndarray of 4 values or a :py:class:`BBox2D`.
+            mode (BoxMode2D): Format of `x` if it is a list/tuple/ndarray. \
+                See :py:mod:`~bbox.box_modes`.
+        """
+        self.extend(x, mode=mode)
+
+    def extend(self, x, mode=XYWH):
+        """
+        Append multiple bounding boxes to the end of the buffer.
+
+        Args:
+            x: Bounding boxes to append, as an (N, 4) array or a :py:class:`BBox2DList`.
+            mode (BoxMode2D): Format of `x` if it is a list/tuple/ndarray. \
+                See :py:mod:`~bbox.box_modes`.
+        """
+        x = self._convert(x, mode)
+        n = x.shape[0]
+        self.reserve(self._size + n)
+        self._buffer[self._size:self._size + n] = x
+        self._size += n
+
+    def insert(self, x, idx, mode=XYWH):
+        """
+        Insert bounding boxes at position `idx`, shifting the following boxes in place.
+
+        Args:
+            x: Bounding box(es) to insert.
+            idx (:py:class:`int`): Position where to insert the bounding box(es).
+            mode (BoxMode2D): Format of `x` if it is a list/tuple/ndarray. \
+                See :py:mod:`~bbox.box_modes`.
+        """
+        x = self._convert(x, mode)
+        n = x.shape[0]
+        # normalize the index the same way as `list.insert`
+        if idx < 0:
+            idx += self._size
+        idx = min(max(idx, 0), self._size)
+
+        self.reserve(self._size + n)
+        self._buffer[idx + n:self._size + n] = self._buffer[idx:self._size]
+        self._buffer[idx:idx + n] = x
+        self._size += n
+
+    def clear(self):
+        """
+        Remove all the boxes, keeping the allocated capacity.
+        """
+        if self._shared:
+            self._buffer = np.empty_like(self._buffer)
+            self._shared = False
+        self._size = 0
+
+    def build(self):
+        """
+        Return the boxes as a :py:class:`BBox2DList`.
+
+        No data is copied: the list is a view over the first `len(self)` rows of the buffer.
+        The builder can still be used afterwards; it moves to a new buffer before its next
+        modification so that the returned list is never changed by the builder.
+        """
+        bbl = BBox2DList.from_buffer(self._buffer[:self._size], mode=XYXY)
+        self._shared = True
+        return bbl
@@ -7,6 +7,38 @@ from copy import deepcopy
 import numpy as np
 from pyquaternion import Quaternion
 
+from bbox.geometry import quaternion_rotation_matrix
+
+# Corners of a box relative to its center, in units of half its (length, width, height).
+# The order is the same as the points `p1`, ..., `p8` of :py:class:`BBox3D`.
+CORNERS = np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                    [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]])
+
+# Indices in `CORNERS` of the vertices of the 6 faces of a box, ordered so that the
+# normal given by :py:func:`~bbox.geometry.get_plane` of the first 3 vertices points outwards.
+FACES = np.array([[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4],
+                  [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]])
+
+
+def box_corners(center, size, rotation):
+    """
+    Compute the corners of one or more 3D boxes with a single matrix product per box.
+
+    Args:
+        center: Array of shape (..., 3) of box centers.
+        size: Array of shape (..., 3) of box (length, width, height).
+        rotation: Array of shape (..., 3, 3) of box rotation matrices.
+
+    Returns:
+        :py:class:`ndarray` of float: Array of shape (..., 8, 3) of box corners, \
+            in the same order as :py:attr:`BBox3D.p`.
+    """
+    center = np.asarray(center, dtype=float)
+    size = np.asarray(size, dtype=float)
+    # corners in the frame of each box
+    local = CORNERS * (size[..., np.newaxis, :] / 2)
+    return center[..., np.newaxis, :] + local @ np.swapaxes(rotation, -1, -2)
+
 
 class BBox3D:
     """
@@ -61,12 +93,23 @@ class BBox3D:
         else:
             self._q = Quaternion(rw, rx, ry, rz)
 
+        # rotation matrix and corners are computed lazily and cached until the box changes
+        self._rotation = None
+        self._corners = None
+
+    def _invalidate_cache(self):
+        self._rotation = None
+        self._corners = None
+
     @property
     def center(self):
         """
         Attribute to access center coordinates of box in (x, y, z) format.
         Can be set to :py:class:`list` or :py:class:`ndarray` of float.
 
+        The returned array is read-only, since the cached corners would not be updated \
+            by modifying it in place.
+
         Returns:
             :py:class:`ndarray` of float: 3-dimensional vector representing (x, y, z) coordinates \
                 of the box.
@@ -74,13 +117,17 @@ class BBox3D:
         Raises:
             ValueError: If `c` is not a vector/list of length 3.
         """
-        return self._c
+        c = self._c.view()
+        c.flags.writeable = False
+        return c
 
     @center.setter
     def center(self, c):
         if len(c) != 3:
             raise ValueError("Center coordinates should be a vector of size 3")
-        self._c = c
+        self._c = np.array(c)
+        self._cx, self._cy, self._cz = self._c
+        self._invalidate_cache()
 
     def __valid_scalar(self, x):
         if not np.isscalar(x):
@@ -100,6 +147,8 @@ class BBox3D:
     @cx.setter
     def cx(self, x):
         self._cx = self.__valid_scalar(x)
+        self._c = np.array([self._cx, self._cy, self._cz])
+        self._invalidate_cache()
 
     @property
     def cy(self):
@@ -111,6 +160,8 @@ class BBox3D:
     @cy.setter
     def cy(self, x):
         self._cy = self.__valid_scalar(x)
+        self._c = np.array([self._cx, self._cy, self._cz])
+        self._invalidate_cache()
 
     @property
     def cz(self):
@@ -122,6 +173,8 @@ class BBox3D:
     @cz.setter
     def cz(self, x):
         self._cz = self.__valid_scalar(x)
+        self._c = np.array([self._cx, self._cy, self._cz])
+        self._invalidate_cache()
 
     @property
     def q(self):
@@ -142,6 +195,7 @@ class BBox3D:
             raise ValueError("Quaternion input should be a vector of size 4")
 
         self._q = Quaternion(q)
+        self._invalidate_cache()
 
     @property
     def quaternion(self):
@@ -167,6 +221,7 @@ class BBox3D:
     @l.setter
     def l(self, x):
         self._l = self.__valid_scalar(x)
+        self._invalidate_cache()
 
     @property
     def length(self):
@@ -189,6 +244,7 @@ class BBox3D:
     @w.setter
     def w(self, x):
         self._w = self.__valid_scalar(x)
+        self._invalidate_cache()
 
     @property
     def width(self):
@@ -211,6 +267,7 @@ class BBox3D:
     @h.setter
     def h(self, x):
         self._h = self.__valid_scalar(x)
+        self._invalidate_cache()
 
     @property
     def height(self):
@@ -223,96 +280,89 @@ class BBox3D:
     def height(self, x):
         self.h = x
 
-    def __transform(self, x):
+    @property
+    def rotation_matrix(self):
         """
-        Rotate and translate the point to world coordinates.
+        The rotation matrix of the box. The matrix is cached and read-only.
+
+        Returns:
+            :py:class:`ndarray` of float: 3x3 rotation matrix.
         """
-        y = self._c + self._q.rotate(x)
-        return y
+        if self._rotation is None:
+            self._rotation = quaternion_rotation_matrix(self.q)
+            self._rotation.flags.writeable = False
+        return self._rotation
 
     @property
     def p1(self):
         """
         :py:class:`float`: Back-left-bottom point.
         """
-        p = np.array([-self._l/2, -self._w/2, -self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[0]
 
     @property
     def p2(self):
         """
         :py:class:`float`: Front-left-bottom point.
         """
-        p = np.array([self._l/2, -self._w/2, -self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[1]
 
     @property
     def p3(self):
         """
         :py:class:`float`: Front-right-bottom point.
         """
-        p = np.array([self._l/2, self._w/2, -self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[2]
 
     @property
     def p4(self):
         """
         :py:class:`float`: Back-right-bottom point.
         """
-        p = np.array([-self._l/2, self._w/2, -self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[3]
 
     @property
     def p5(self):
         """
         :py:class:`float`: Back-left-top point.
         """
-        p = np.array([-self._l/2, -self._w/2, self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[4]
 
     @property
     def p6(self):
         """
         :py:class:`float`: Front-left-top point.
         """
-        p = np.array([self._l/2, -self._w/2, self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[5]
 
     @property
     def p7(self):
         """
         :py:class:`float`: Front-right-top point.
         """
-        p = np.array([self._l/2, self._w/2, self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[6]
 
     @property
     def p8(self):
         """
         :py:class:`float`: Back-right-top point.
         """
-        p = np.array([-self._l/2, self._w/2, self._h/2])
-        p = self.__transform(p)
-        return p
+        return self.p[7]
 
     @property
     def p(self):
         """
         Attribute to access ndarray of all corners of box in order.
+        The corners are cached and read-only, they are recomputed after the box is modified.
 
         Returns:
             :py:class:`ndarray` of float: All corners of the bounding box in order.
         """
-        x = np.vstack([self.p1, self.p2, self.p3, self.p4,
-                       self.p5, self.p6, self.p7, self.p8])
-        return x
+        if self._corners is None:
+            self._corners = box_corners(self._c, [self._l, self._w, self._h],
+                                        self.rotation_matrix)
+            self._corners.flags.writeable = False
+        return self._corners
 
     def __repr__(self):
         template = "BBox3D(x={cx}, y={cy}, z={cz}), length={l}, width={w}, height={h}, "\
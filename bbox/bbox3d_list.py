@@ -0,0 +1,235 @@
+"""Bounding Box 3D list module."""
+
+# pylint: disable=invalid-name,missing-docstring
+
+from copy import deepcopy
+
+import numpy as np
+
+from bbox.bbox3d import BBox3D, box_corners
+from bbox.geometry import quaternion_rotation_matrix
+
+
+class BBox3DList:
+    """
+    Class to represent a list of 3D bounding boxes.
+
+    The boxes are stored as arrays of centers (N, 3), sizes (N, 3) in (length, width, height)
+    order and rotation quaternions (N, 4) in (w, x, y, z) form, so that operations over all
+    the boxes are vectorized.
+
+    Args:
+        arr: Sequence of :py:class:`BBox3D`, or :py:class:`ndarray` of shape (N, 10) where \
+            each row is (cx, cy, cz, length, width, height, rw, rx, ry, rz).
+
+    Raises:
+        ValueError: If `arr` is an array of invalid dimensions.
+        TypeError: If `arr` is not of type {list, numpy.ndarray, BBox3DList}.
+    """
+
+    def __init__(self, arr):
+        if isinstance(arr, BBox3DList):
+            arr = arr.numpy()
+
+        elif isinstance(arr, list):
+            if not all(isinstance(x, BBox3D) for x in arr):
+                raise TypeError(
+                    "Element of input is of invalid type. Elements must be all BBox3D")
+            arr = np.asarray([np.hstack((x.center, x.l, x.w, x.h, x.q)) for x in arr],
+                             dtype=float).reshape(-1, 10)
+
+        elif isinstance(arr, np.ndarray):
+            if arr.ndim == 1 and arr.shape[0] == 10:
+                arr = arr[np.newaxis, :]
+            if arr.ndim != 2 or arr.shape[1] != 10:
+                raise ValueError(
+                    "Invalid dimensions. Expected 2D array of size Nx10. "
+                    "Got {0}".format(arr.shape))
+
+        else:
+            raise TypeError(
+                "Invalid input type. Please use a list or a numpy array.")
+
+        arr = np.array(arr, dtype=float)
+        self.centers = arr[:, 0:3]
+        self.sizes = arr[:, 3:6]
+        self.quaternions = arr[:, 6:10]
+
+    @classmethod
+    def from_arrays(cls, centers, sizes, quaternions=None):
+        """
+        Create a list of 3D bounding boxes from arrays of their parameters.
+
+        Args:
+            centers: Array of shape (N, 3) of box centers.
+            sizes: Array of shape (N, 3) of box (length, width, height).
+            quaternions (optional): Array of shape (N, 4) of rotation quaternions \
+                in (w, x, y, z) form. Defaults to no rotation.
+        """
+        centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+        sizes = np.asarray(sizes, dtype=float).reshape(-1, 3)
+        if quaternions is None:
+            quaternions = np.tile([1.0, 0.0, 0.0, 0.0], (centers.shape[0], 1))
+        quaternions = np.asarray(quaternions, dtype=float).reshape(-1, 4)
+
+        if not centers.shape[0] == sizes.shape[0] == quaternions.shape[0]:
+            raise ValueError("centers, sizes and quaternions should have the same length.")
+
+        return cls(np.hstack((centers, sizes, quaternions)))
+
+    def __eq__(self, x):
+        if not isinstance(x, BBox3DList):
+            return False
+        return np.array_equal(self.numpy(), x.numpy())
+
+    def __len__(self):
+        return self.centers.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            cx, cy, cz = self.centers[key].tolist()
+            l, w, h = self.sizes[key].tolist()
+            return BBox3D(cx, cy, cz, length=l, width=w, height=h, q=self.quaternions[key])
+
+        return BBox3DList(self.numpy()[key])
+
+    def __repr__(self):
+        return "BBox3DList({0})".format(repr(self.numpy()))
+
+    @property
+    def shape(self):
+        """
+        :py:class:`tuple`: Shape (N, 10) of the array representation of the boxes.
+        """
+        return (len(self), 10)
+
+    @property
+    def cx(self):
+        """
+        :py:class:`ndarray`: X coordinates of the centers.
+        """
+        return self.centers[:, 0]
+
+    @property
+    def cy(self):
+        """
+        :py:class:`ndarray`: Y coordinates of the centers.
+        """
+        return self.centers[:, 1]
+
+    @property
+    def cz(self):
+        """
+        :py:class:`ndarray`: Z coordinates of the centers.
+        """
+        return self.centers[:, 2]
+
+    @property
+    def l(self):
+        """
+        :py:class:`ndarray`: Lengths of the boxes.
+        """
+        return self.sizes[:, 0]
+
+    @property
+    def length(self):
+        """
+        :py:class:`ndarray`: Lengths of the boxes.
+        """
+        return self.l
+
+    @property
+    def w(self):
+        """
+        :py:class:`ndarray`: Widths of the boxes.
+        """
+        return self.sizes[:, 1]
+
+    @property
+    def width(self):
+        """
+        :py:class:`ndarray`: Widths of the boxes.
+        """
+        return self.w
+
+    @property
+    def h(self):
+        """
+        :py:class:`ndarray`: Heights of the boxes.
+        """
+        return self.sizes[:, 2]
+
+    @property
+    def height(self):
+        """
+        :py:class:`ndarray`: Heights of the boxes.
+        """
+        return self.h
+
+    @property
+    def q(self):
+        """
+        :py:class:`ndarray`: Rotation quaternions of shape (N, 4) in (w, x, y, z) form.
+        """
+        return self.quaternions
+
+    @property
+    def volume(self):
+        """
+        :py:class:`ndarray`: Volumes of the boxes.
+        """
+        return self.l * self.w * self.h
+
+    @property
+    def rotation_matrices(self):
+        """
+        :py:class:`ndarray`: Rotation matrices of shape (N, 3, 3) of the boxes.
+        """
+        return quaternion_rotation_matrix(self.quaternions)
+
+    @property
+    def p(self):
+        """
+        Attribute to access the corners of all the boxes, in the same order as :py:attr:`BBox3D.p`.
+
+        Returns:
+            :py:class:`ndarray` of float: Array of shape (N, 8, 3).
+        """
+        return box_corners(self.centers, self.sizes, self.rotation_matrices)
+
+    def mul(self, scale):
+        """
+        Scale the centers and sizes of the boxes by a scalar factor.
+
+        Args:
+            scale : Scalar factor to scale by.
+        """
+        if not isinstance(scale, (int, float)):
+            raise ValueError(
+                "Bounding boxes can only be multiplied by scalar (int or float)")
+        return BBox3DList.from_arrays(self.centers * scale, self.sizes * scale, self.quaternions)
+
+    def __mul__(self, val):
+        return self.mul(val)
+
+    def __rmul__(self, val):
+        return self.mul(val)
+
+    def tolist(self):
+        """
+        Return the boxes as a `list` of :py:class:`BBox3D`.
+        """
+        return [self[i] for i in range(len(self))]
+
+    def copy(self):
+        """
+        Return a deep copy of this bounding box list.
+        """
+        return deepcopy(self)
+
+    def numpy(self):
+        """
+        Return np.ndarray of shape (N, 10) where each row is \
+            (cx, cy, cz, length, width, height, rw, rx, ry, rz).
+        """
+        return np.hstack((self.centers, self.sizes, self.quaternions))
@@ -0,0 +1,658 @@
+"""
+Evaluation of object detections.
+
+The COCO evaluation follows the protocol of the official `cocoapi`
+[https://github.com/cocodataset/cocoapi/blob/master/PythonAPI/pycocotools/cocoeval.py]
+
+The 3D evaluation computes the bird's eye view and 3D average precision of the KITTI
+benchmark [http://www.cvlibs.net/datasets/kitti/eval_object.php?obj_benchmark=3d]
+"""
+
+# pylint: disable=invalid-name,missing-docstring
+
+import numpy as np
+
+from bbox.bbox2d_list import BBox2DList
+from bbox.bbox3d_list import BBox3DList
+from bbox.box_modes import XYXY
+from bbox.kernels import jaccard_index_3d_candidates
+from bbox.parallel import parallel_map, split
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+RECALL_THRESHOLDS = np.linspace(0.0, 1.0, 101)
+AREA_RANGES = {
+    "all": (0, 1e5 ** 2),
+    "small": (0, 32 ** 2),
+    "medium": (32 ** 2, 96 ** 2),
+    "large": (96 ** 2, 1e5 ** 2),
+}
+MAX_DETS = (1, 10, 100)
+
+KITTI_IOU_THRESHOLDS = {"Car": 0.7, "Pedestrian": 0.5, "Cyclist": 0.5}
+KITTI_RECALL_THRESHOLDS = np.linspace(1 / 40, 1.0, 40)
+
+
+def _concatenate(per_image, counts, name, dtype=None):
+    """
+    Concatenate the per-image arrays `per_image`, which should have `counts` elements.
+    `per_image` can be None if `dtype` is given, for all zeros.
+    """
+    if per_image is None and dtype is not None:
+        return np.zeros(int(np.sum(counts)), dtype=dtype)
+    if len(per_image) != counts.shape[0]:
+        raise ValueError("{0} should have one element per image.".format(name))
+    values = [np.asarray(x, dtype=dtype).reshape(-1) for x in per_image]
+    if not np.array_equal([x.shape[0] for x in values], counts):
+        raise ValueError("{0} should have one element per box.".format(name))
+    values = [x for x in values if x.shape[0] > 0]
+    return np.concatenate(values) if values else np.zeros(0, dtype=dtype)
+
+
+def _flatten_boxes(boxes, n_images, name):
+    if len(boxes) != n_images:
+        raise ValueError("{0} should have one element per image.".format(name))
+    boxes = [b if isinstance(b, BBox2DList) else BBox2DList(b) for b in boxes]
+    counts = np.array([len(b) for b in boxes], dtype=np.intp)
+    arrays = [b.numpy(mode=XYXY, dtype=np.float64) for b in boxes]
+    arrays = np.concatenate(arrays) if arrays else np.zeros((0, 4))
+    return arrays.reshape(-1, 4), counts
+
+
+def _flatten_boxes_3d(boxes, n_images, name):
+    if len(boxes) != n_images:
+        raise ValueError("{0} should have one element per image.".format(name))
+    boxes = [b if isinstance(b, BBox3DList) else BBox3DList(b) for b in boxes]
+    counts = np.array([len(b) for b in boxes], dtype=np.intp)
+    arrays = [b.numpy() for b in boxes]
+    arrays = np.concatenate(arrays) if arrays else np.zeros((0, 10))
+    return BBox3DList(arrays.reshape(-1, 10)), counts
+
+
+def _ranks(keys, order_keys):
+    """
+    Sort elements by `keys` then by `order_keys` (a sequence of sort keys, most significant
+    last), and compute the rank of every element among the elements with the same key.
+
+    Returns:
+        tuple: The sort order and the rank of every sorted element.
+    """
+    order = np.lexsort(tuple(order_keys) + (keys,))
+    _, counts = np.unique(keys[order], return_counts=True)
+    rank = np.arange(order.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+    return order, rank
+
+
+def _padded(index, rank, shape, values, fill):
+    """Scatter `values` into an array of `shape` at (`index`, `rank`)."""
+    out = np.full(shape + values.shape[1:], fill, dtype=values.dtype)
+    out[index, rank] = values
+    return out
+
+
+def _group_keys(gt_labels, dt_labels, gt_counts, dt_counts):
+    """
+    Find the K class labels, and the key of the (image, class) group of every ground truth
+    and detection.
+
+    Returns:
+        tuple: The K sorted labels, and the keys of the ground truth and detections.
+    """
+    gt_label = _concatenate(gt_labels, gt_counts, "gt_labels")
+    dt_label = _concatenate(dt_labels, dt_counts, "dt_labels")
+    if gt_label.shape[0] == 0:
+        gt_label = gt_label.astype(dt_label.dtype)
+    if dt_label.shape[0] == 0:
+        dt_label = dt_label.astype(gt_label.dtype)
+
+    labels = np.unique(np.concatenate((gt_label, dt_label)))
+    K = labels.shape[0]
+    gt_image = np.repeat(np.arange(gt_counts.shape[0]), gt_counts)
+    dt_image = np.repeat(np.arange(dt_counts.shape[0]), dt_counts)
+    gt_key = gt_image * K + np.searchsorted(labels, gt_label)
+    dt_key = dt_image * K + np.searchsorted(labels, dt_label)
+    return labels, gt_key, dt_key
+
+
+def _groups(gt_key, dt_key, dt_score, max_det=None):
+    """
+    Group the ground truth and the detections by key, with the detections of every group
+    sorted by decreasing score and at most `max_det` of them.
+
+    Returns:
+        tuple: The G sorted keys, and arrays of shape (G, D) and (G, N) of the indices of \
+            the detections and the ground truth of every group, padded with -1.
+    """
+    keys = np.unique(np.concatenate((gt_key, dt_key)))
+    G = keys.shape[0]
+
+    dt_order, dt_rank = _ranks(dt_key, (np.arange(dt_key.shape[0]), -dt_score))
+    if max_det is not None:
+        keep = dt_rank < max_det
+        dt_order, dt_rank = dt_order[keep], dt_rank[keep]
+    dt_group = np.searchsorted(keys, dt_key[dt_order])
+    D = int(dt_rank.max()) + 1 if dt_rank.shape[0] > 0 else 0
+
+    gt_order, gt_rank = _ranks(gt_key, (np.arange(gt_key.shape[0]),))
+    gt_group = np.searchsorted(keys, gt_key[gt_order])
+    N = int(gt_rank.max()) + 1 if gt_rank.shape[0] > 0 else 0
+
+    dt_idx = _padded(dt_group, dt_rank, (G, D), dt_order, -1)
+    gt_idx = _padded(gt_group, gt_rank, (G, N), gt_order, -1)
+    return keys, dt_idx, gt_idx
+
+
+def _greedy_match(ious, n_dets, gt_ignore, gt_crowd, iou_thresholds):
+    """
+    Greedily match the detections of G groups to their ground truth at T IoU thresholds,
+    following the COCO rules.
+
+    The detections of every group are matched in decreasing order of score, so the matching
+    is done one rank at a time for all the groups and thresholds at once. Every detection
+    is matched to the available ground truth with the highest IoU (the last one on ties),
+    preferring ground truth which is not ignored. Crowd ground truth can be matched
+    several times.
+
+    Args:
+        ious: Array of shape (G, D, N) of the IoU of the detections (sorted by score) and \
+            the ground truth of every group, padded with negative values.
+        n_dets: Array of shape (G,) of the number of detections of every group.
+        gt_ignore: Boolean array of shape (G, N) of the ignored ground truth.
+        gt_crowd: Boolean array of shape (G, N) of the crowd ground truth.
+        iou_thresholds: Array of shape (T,) of IoU thresholds, or (T, G) for thresholds \
+            specific to every group.
+
+    Returns:
+        tuple: Arrays of shape (T, G, D) of the index of the ground truth matched to every \
+            detection (-1 if not matched), and whether the match is ignored.
+    """
+    G, D, N = ious.shape
+    T = len(iou_thresholds)
+    thresholds = np.minimum(np.asarray(iou_thresholds, dtype=np.float64), 1 - 1e-10)
+    thresholds = np.broadcast_to(thresholds.reshape(T, -1), (T, G))
+
+    # groups by decreasing number of detections, so the groups which still have a
+    # detection at a given rank come first
+    order = np.argsort(-n_dets, kind='stable')
+    ious, n_dets = ious[order], n_dets[order]
+    gt_ignore, gt_crowd = gt_ignore[order], gt_crowd[order]
+    thresholds = thresholds[:, order, np.newaxis]
+
+    gt_matched = np.zeros((T, G, N), dtype=bool)
+    dt_match = np.full((T, G, D), -1, dtype=np.intp)
+    dt_ignore = np.zeros((T, G, D), dtype=bool)
+
+    for r in range(D):
+        active = int(np.count_nonzero(n_dets > r))
+        iou = ious[np.newaxis, :active, r, :]
+        available = ~(gt_matched[:, :active] & ~gt_crowd[:active])
+        candidates = (iou >= thresholds[:, :active]) & available
+        regular = candidates & ~gt_ignore[:active]
+        pool = np.where(regular.any(axis=-1, keepdims=True), regular, candidates)
+
+        # best candidate, the last one on ties
+        score = np.where(pool, iou, -np.inf)
+        best = N - 1 - np.argmax(score[..., ::-1], axis=-1)
+
+        t, g = np.nonzero(pool.any(axis=-1))
+        m = best[t, g]
+        dt_match[t, g, r] = m
+        dt_ignore[t, g, r] = gt_ignore[g, m]
+        gt_matched[t, g, m] = True
+
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(G)
+    return dt_match[:, inverse], dt_ignore[:, inverse]
+
+
+def _precision_recall(scores, images, ranks, matched, ignored, n_gt, recall_thresholds):
+    """
+    Compute the interpolated precision and the recall of one class from its detections
+    over all the images.
+
+    Args:
+        scores, images, ranks: Arrays of shape (E,) of the score, image and rank within \
+            the image of every detection.
+        matched, ignored: Boolean arrays of shape (T, E) of the matched and ignored detections.
+        n_gt: Number of ground truth which are not ignored.
+        recall_thresholds: Array of shape (R,) of recall thresholds.
+
+    Returns:
+        tuple: Arrays of shape (T, R) of precision and (T,) of recall, \
+            filled with -1 if there is no ground truth.
+    """
+    T, R = matched.shape[0], len(recall_thresholds)
+    if n_gt == 0:
+        return np.full((T, R), -1.0), np.full(T, -1.0)
+
+    # detections of all the images, by decreasing score then by image and rank
+    order = np.lexsort((ranks, images, -scores))
+    matched, ignored = matched[:, order], ignored[:, order]
+
+    tp = np.cumsum(matched & ~ignored, axis=1, dtype=np.float64)
+    fp = np.cumsum(~matched & ~ignored, axis=1, dtype=np.float64)
+
+    recall = tp / n_gt
+    precision = tp / (fp + tp + np.spacing(1))
+    # make the precision monotonically decreasing
+    precision = np.maximum.accumulate(precision[:, ::-1], axis=1)[:, ::-1]
+
+    interpolated = np.zeros((T, R))
+    final_recall = np.zeros(T)
+    if order.shape[0] > 0:
+        final_recall = recall[:, -1]
+        for t in range(T):
+            inds = np.searchsorted(recall[t], recall_thresholds, side='left')
+            valid = inds < order.shape[0]
+            interpolated[t, valid] = precision[t, inds[valid]]
+
+    return interpolated, final_recall
+
+
+def _class_precision_recall(keys, K, dt_idx, dt_score, matched, ignored, n_gt,
+                            recall_thresholds):
+    """
+    Compute the precision and recall of every class from the matched detections of the
+    groups of every image and class.
+
+    Args:
+        keys: Array of shape (G,) of the keys `image * K + class` of the groups.
+        K: Number of classes.
+        dt_idx: Array of shape (G, D) of the indices of the detections of every group, \
+            padded with -1.
+        dt_score: Array of shape (E,) of the scores of the detections.
+        matched, ignored: Boolean arrays of shape (T, E) of the matched and \
+            ignored detections.
+        n_gt: Array of shape (K,) of the number of ground truth which are not ignored.
+        recall_thresholds: Array of shape (R,) of recall thresholds.
+
+    Returns:
+        tuple: Arrays of shape (T, R, K) of precision and (T, K) of recall.
+    """
+    T, R = matched.shape[0], len(recall_thresholds)
+    precision = np.empty((T, R, K))
+    recall = np.empty((T, K))
+
+    g, r = np.nonzero(dt_idx >= 0)
+    group_label, group_image = keys[g] % K, keys[g] // K
+    for k in range(K):
+        sel = group_label == k
+        gk, rk = g[sel], r[sel]
+        det = dt_idx[gk, rk]
+        precision[..., k], recall[..., k] = _precision_recall(
+            dt_score[det], group_image[sel], rk, matched[:, det], ignored[:, det], n_gt[k],
+            recall_thresholds)
+
+    return precision, recall
+
+
+def _mean(values):
+    values = values[values > -1]
+    return float(np.mean(values)) if values.size > 0 else -1.0
+
+
+def _frame_arrays(gt_counts, dt_counts, **arrays):
+    """
+    The arrays shared by the tasks handling blocks of images, with the offsets of the
+    ground truth and detections of every image.
+    """
+    arrays["gt_offsets"] = np.concatenate(([0], np.cumsum(gt_counts)))
+    arrays["dt_offsets"] = np.concatenate(([0], np.cumsum(dt_counts)))
+    return arrays
+
+
+def _frame_slices(arrays, start, stop):
+    """Slices of the ground truth and detections of the images [`start`, `stop`)."""
+    g0, g1 = arrays["gt_offsets"][[start, stop]]
+    d0, d1 = arrays["dt_offsets"][[start, stop]]
+    return slice(g0, g1), slice(d0, d1)
+
+
+def _gather(results, shape):
+    """
+    Scatter the matched and ignored flags of the detections returned by every task into
+    boolean arrays of `shape`, whose last axis is the detection index.
+    """
+    matched = np.zeros(shape, dtype=bool)
+    ignored = np.zeros(shape, dtype=bool)
+    for det, m, i in results:
+        matched[..., det] = m
+        ignored[..., det] = i
+    return matched, ignored
+
+
+def _coco_matches(arrays, start, stop, iou_thresholds, area_ranges, max_det):
+    """
+    Match the detections of the images [`start`, `stop`) to their ground truth with the
+    COCO rules, for every area range.
+
+    Returns:
+        tuple: The indices of the top `max_det` detections of every image and class, \
+            and boolean arrays of shape (A, T, E) of whether they are matched and ignored.
+    """
+    gts, dts = _frame_slices(arrays, start, stop)
+    gt, dt = arrays["gt"][gts], arrays["dt"][dts]
+    crowd, ignore = arrays["crowd"][gts], arrays["ignore"][gts]
+
+    _, dt_idx, gt_idx = _groups(arrays["gt_key"][gts], arrays["dt_key"][dts],
+                                arrays["dt_score"][dts], max_det=max_det)
+    n_dets = np.count_nonzero(dt_idx >= 0, axis=1)
+
+    dt_area = (dt[:, 2] - dt[:, 0] + 1) * (dt[:, 3] - dt[:, 1] + 1)
+    gt_area = (gt[:, 2] - gt[:, 0] + 1) * (gt[:, 3] - gt[:, 1] + 1)
+
+    # pairwise IoU of the detections and ground truth of every group
+    a = dt[dt_idx][:, :, np.newaxis, :]
+    b = gt[gt_idx][:, np.newaxis, :, :]
+    w = np.maximum(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]) + 1, 0)
+    h = np.maximum(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]) + 1, 0)
+    inter = w * h
+    area_a = dt_area[dt_idx][:, :, np.newaxis]
+    area_b = gt_area[gt_idx][:, np.newaxis, :]
+    union = np.where(crowd[gt_idx][:, np.newaxis, :], area_a, area_a + area_b - inter)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ious = inter / union
+    ious[~np.isfinite(ious)] = 0
+    ious[(dt_idx < 0)[:, :, np.newaxis] | (gt_idx < 0)[:, np.newaxis, :]] = -1
+
+    group_crowd = crowd[gt_idx] & (gt_idx >= 0)
+    valid = dt_idx >= 0
+    A, T = len(area_ranges), len(iou_thresholds)
+    matched = np.zeros((A, T, np.count_nonzero(valid)), dtype=bool)
+    ignored = np.zeros_like(matched)
+
+    for ai, (lo, hi) in enumerate(area_ranges):
+        group_ignore = (ignore | (gt_area < lo) | (gt_area > hi))[gt_idx] | (gt_idx < 0)
+
+        dt_match, dt_ignore = _greedy_match(ious, n_dets, group_ignore, group_crowd,
+                                            iou_thresholds)
+        outside = (dt_area[dt_idx] < lo) | (dt_area[dt_idx] > hi)
+        dt_ignore |= (dt_match < 0) & outside
+        matched[ai] = (dt_match >= 0)[:, valid]
+        ignored[ai] = dt_ignore[:, valid]
+
+    return dt_idx[valid] + dts.start, matched, ignored
+
+
+def evaluate_coco(gt_boxes, gt_labels, dt_boxes, dt_scores, dt_labels,
+                  gt_crowd=None, gt_ignore=None, iou_thresholds=IOU_THRESHOLDS,
+                  recall_thresholds=RECALL_THRESHOLDS, area_ranges=None, max_dets=MAX_DETS,
+                  workers=None):
+    """
+    Evaluate 2D detections with the COCO protocol.
+
+    The detections of every image and class are greedily matched to the ground truth at
+    several IoU thresholds, in decreasing order of score. Detections matched to crowd or
+    ignored ground truth, or unmatched and outside of the area range, are ignored.
+    The average precision (AP) is the precision interpolated at the recall thresholds
+    and averaged over them, and the average recall (AR) the maximum recall reached.
+
+    The matching is done for all the images and classes at once, one detection rank at a
+    time, or for blocks of images in parallel processes with `workers`, and the
+    precision-recall curve of every class is built from the detections of all
+    the images at once. Box areas and IoUs follow the pixel convention of
+    :py:class:`~bbox.bbox2d.BBox2D`.
+
+    Args:
+        gt_boxes (:py:class:`list` of :py:class:`BBox2DList`): Ground truth boxes of every image.
+        gt_labels (:py:class:`list`): Class label of every ground truth box of every image.
+        dt_boxes (:py:class:`list` of :py:class:`BBox2DList`): Detected boxes of every image.
+        dt_scores (:py:class:`list`): Score of every detection of every image.
+        dt_labels (:py:class:`list`): Class label of every detection of every image.
+        gt_crowd (:py:class:`list`, optional): Crowd flag of every ground truth box of \
+            every image. A detection can only overlap a crowd region by the area of the \
+            detection, and several detections can be matched to the same crowd region.
+        gt_ignore (:py:class:`list`, optional): Ignore flag of every ground truth box of \
+            every image.
+        iou_thresholds (:py:class:`ndarray`, optional): IoU thresholds \
+            (default is 0.5:0.05:0.95).
+        recall_thresholds (:py:class:`ndarray`, optional): Recall thresholds at which the \
+            precision is interpolated (default is 0:0.01:1).
+        area_ranges (:py:class:`dict`, optional): Named (min, max) ranges of box areas \
+            (default is :py:data:`AREA_RANGES`).
+        max_dets (:py:class:`tuple`, optional): Maximum numbers of detections per image and \
+            class (default is (1, 10, 100)).
+        workers (:py:class:`int`, optional): Number of processes matching blocks of images \
+            in parallel, see :py:func:`~bbox.parallel.parallel_map`. The results are the \
+            same as with a single process.
+
+    Returns:
+        :py:class:`dict`: With the following keys:
+
+        - "precision": Array of shape (T, R, K, A, M) of interpolated precision for every IoU \
+            threshold, recall threshold, class, area range and maximum number of detections, \
+            -1 for classes without ground truth.
+        - "recall": Array of shape (T, K, A, M) of recall.
+        - "labels": The K class labels.
+        - "stats": :py:class:`dict` of the standard COCO metrics "AP", "AP50", "AP75", \
+            "APs", "APm", "APl", "AR1", "AR10", "AR100", "ARs", "ARm" and "ARl", \
+            computed for the default IoU thresholds, area ranges and numbers of detections.
+
+    Raises:
+        ValueError: If the arguments do not have one element per image and box.
+    """
+    n_images = len(gt_boxes)
+    area_ranges = AREA_RANGES if area_ranges is None else area_ranges
+    iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64)
+    recall_thresholds = np.asarray(recall_thresholds, dtype=np.float64)
+    max_dets = tuple(sorted(max_dets))
+
+    gt, gt_counts = _flatten_boxes(gt_boxes, n_images, "gt_boxes")
+    dt, dt_counts = _flatten_boxes(dt_boxes, n_images, "dt_boxes")
+    dt_score = _concatenate(dt_scores, dt_counts, "dt_scores", dtype=np.float64)
+    crowd = _concatenate(gt_crowd, gt_counts, "gt_crowd", dtype=bool)
+    ignore = _concatenate(gt_ignore, gt_counts, "gt_ignore", dtype=bool) | crowd
+
+    labels, gt_key, dt_key = _group_keys(gt_labels, dt_labels, gt_counts, dt_counts)
+    K = labels.shape[0]
+
+    # match the detections of blocks of images separately
+    arrays = _frame_arrays(gt_counts, dt_counts, gt=gt, dt=dt, dt_score=dt_score, crowd=crowd,
+                           ignore=ignore, gt_key=gt_key, dt_key=dt_key)
+    tasks = [(start, stop, iou_thresholds, list(area_ranges.values()), max_dets[-1])
+             for start, stop in split(n_images, workers or 1, costs=gt_counts + dt_counts)]
+    matched, ignored = _gather(parallel_map(_coco_matches, arrays, tasks, workers=workers),
+                               (len(area_ranges), len(iou_thresholds), dt.shape[0]))
+
+    keys, dt_idx, _ = _groups(gt_key, dt_key, dt_score, max_det=max_dets[-1])
+    gt_area = (gt[:, 2] - gt[:, 0] + 1) * (gt[:, 3] - gt[:, 1] + 1)
+
+    T, R, A, M = len(iou_thresholds), len(recall_thresholds), len(area_ranges), len(max_dets)
+    precision = -np.ones((T, R, K, A, M))
+    recall = -np.ones((T, K, A, M))
+
+    for ai, (lo, hi) in enumerate(area_ranges.values()):
+        counted = ~ignore & (gt_area >= lo) & (gt_area <= hi)
+        n_gt = np.bincount(gt_key[counted] % max(K, 1), minlength=K)
+
+        for mi, max_det in enumerate(max_dets):
+            precision[..., ai, mi], recall[..., ai, mi] = _class_precision_recall(
+                keys, K, dt_idx[:, :max_det], dt_score, matched[ai], ignored[ai], n_gt,
+                recall_thresholds)
+
+    results = {
+        "precision": precision,
+        "recall": recall,
+        "labels": labels,
+        "stats": _coco_stats(precision, recall, iou_thresholds, list(area_ranges), max_dets),
+    }
+    return results
+
+
+def _coco_stats(precision, recall, iou_thresholds, area_names, max_dets):
+    """
+    The standard COCO summary metrics, -1 when they are not available.
+    """
+    def summarize(ap, iou=None, area="all", max_det=100):
+        if area not in area_names or max_det not in max_dets:
+            return -1.0
+        a, m = area_names.index(area), max_dets.index(max_det)
+        s = precision if ap else recall
+        if iou is not None:
+            t = np.flatnonzero(np.isclose(iou_thresholds, iou))
+            if t.size == 0:
+                return -1.0
+            s = s[t]
+        return _mean(s[..., a, m])
+
+    return {
+        "AP": summarize(True),
+        "AP50": summarize(True, iou=0.5),
+        "AP75": summarize(True, iou=0.75),
+        "APs": summarize(True, area="small"),
+        "APm": summarize(True, area="medium"),
+        "APl": summarize(True, area="large"),
+        "AR1": summarize(False, max_det=1),
+        "AR10": summarize(False, max_det=10),
+        "AR100": summarize(False),
+        "ARs": summarize(False, area="small"),
+        "ARm": summarize(False, area="medium"),
+        "ARl": summarize(False, area="large"),
+    }
+
+
+def _class_thresholds(labels, iou_thresholds):
+    if not isinstance(iou_thresholds, dict):
+        return np.full(labels.shape[0], float(iou_thresholds))
+    missing = [x for x in labels if x not in iou_thresholds]
+    if missing:
+        raise ValueError("No IoU threshold for the classes {0}".format(missing))
+    return np.array([iou_thresholds[x] for x in labels], dtype=np.float64)
+
+
+def _matches_3d(arrays, start, stop, K, thresholds, metrics):
+    """
+    Match the detections of the frames [`start`, `stop`) to their ground truth at the IoU
+    thresholds of their classes, for every metric.
+
+    Returns:
+        tuple: The indices of the detections, and boolean arrays of shape (len(metrics), 1, E) \
+            of whether they are matched and ignored.
+    """
+    gts, dts = _frame_slices(arrays, start, stop)
+    gt, dt = BBox3DList(arrays["gt"][gts]), BBox3DList(arrays["dt"][dts])
+
+    keys, dt_idx, gt_idx = _groups(arrays["gt_key"][gts], arrays["dt_key"][dts],
+                                   arrays["dt_score"][dts])
+    n_dets = np.count_nonzero(dt_idx >= 0, axis=1)
+    group_ignore = arrays["ignore"][gts][gt_idx] | (gt_idx < 0)
+    group_crowd = np.zeros(group_ignore.shape, dtype=bool)
+    group_thresholds = thresholds[keys % max(K, 1)][np.newaxis]
+
+    # all the pairs of detections and ground truth of the same frame and class
+    pairs = (dt_idx >= 0)[:, :, np.newaxis] & (gt_idx >= 0)[:, np.newaxis, :]
+    g, d, n = np.nonzero(pairs)
+
+    valid = dt_idx >= 0
+    matched = np.zeros((len(metrics), 1, np.count_nonzero(valid)), dtype=bool)
+    ignored = np.zeros_like(matched)
+
+    for i, metric in enumerate(metrics):
+        index, iou = jaccard_index_3d_candidates(dt, gt, dt_idx[g, d], gt_idx[g, n],
+                                                 bev=metric == "bev", centered=True)
+        ious = np.where(pairs, 0.0, -1.0)
+        ious[g[index], d[index], n[index]] = iou
+
+        dt_match, dt_ignore = _greedy_match(ious, n_dets, group_ignore, group_crowd,
+                                            group_thresholds)
+        matched[i] = (dt_match >= 0)[:, valid]
+        ignored[i] = dt_ignore[:, valid]
+
+    return dt_idx[valid] + dts.start, matched, ignored
+
+
+def evaluate_3d(gt_boxes, gt_labels, dt_boxes, dt_scores, dt_labels, gt_ignore=None,
+                iou_thresholds=None, recall_thresholds=KITTI_RECALL_THRESHOLDS,
+                metrics=("bev", "3d"), workers=None):
+    """
+    Evaluate 3D detections with the bird's eye view (BEV) and 3D average precision \
+        of the KITTI benchmark.
+
+    The detections of every frame and class are greedily matched to the ground truth in
+    decreasing order of score, at the IoU threshold of their class. Detections matched to
+    ignored ground truth (e.g. "DontCare" or too difficult objects) are ignored. The average
+    precision (AP) of every class is the precision interpolated at the recall thresholds
+    (40 points by default, as for KITTI) and averaged over them.
+
+    The IoUs of the boxes of all the frames are computed at once by the batched kernels of
+    :py:func:`~bbox.metrics.multi_jaccard_index_3d`, with the boxes extending by half their
+    height above and below their center, i.e. the IoU of a detection and a ground truth box is
+    the one given by :py:func:`~bbox.metrics.multi_jaccard_index_3d` with `centered=True`.
+    The matching is done for all the frames and classes at once, or for blocks of frames in
+    parallel processes with `workers`, and the precision-recall curve of every class is built
+    from the detections of all the frames at once.
+
+    **Note**: We follow the KITTI format and assume only yaw rotations (along z-axis).
+
+    Args:
+        gt_boxes (:py:class:`list` of :py:class:`BBox3DList`): Ground truth boxes of \
+            every frame.
+        gt_labels (:py:class:`list`): Class label of every ground truth box of every frame.
+        dt_boxes (:py:class:`list` of :py:class:`BBox3DList`): Detected boxes of every frame.
+        dt_scores (:py:class:`list`): Score of every detection of every frame.
+        dt_labels (:py:class:`list`): Class label of every detection of every frame.
+        gt_ignore (:py:class:`list`, optional): Ignore flag of every ground truth box of \
+            every frame.
+        iou_thresholds (:py:class:`float` or :py:class:`dict`, optional): IoU threshold, \
+            or :py:class:`dict` of the IoU threshold of every class label \
+            (default is :py:data:`KITTI_IOU_THRESHOLDS`).
+        recall_thresholds (:py:class:`ndarray`, optional): Recall thresholds at which the \
+            precision is interpolated (default is 1/40:1/40:1).
+        metrics (:py:class:`tuple`, optional): Metrics to compute, among "bev" and "3d".
+        workers (:py:class:`int`, optional): Number of processes matching blocks of frames \
+            in parallel, see :py:func:`~bbox.parallel.parallel_map`. The results are the \
+            same as with a single process.
+
+    Returns:
+        :py:class:`dict`: With the K class labels as "labels", their IoU thresholds as \
+            "iou_thresholds", and for every metric a :py:class:`dict` with the following keys:
+
+        - "precision": Array of shape (R, K) of interpolated precision for every recall \
+            threshold and class, -1 for classes without ground truth.
+        - "recall": Array of shape (K,) of recall.
+        - "AP": Array of shape (K,) of average precision.
+        - "mAP": Mean average precision over the classes with ground truth.
+
+    Raises:
+        ValueError: If the arguments do not have one element per frame and box, if a class \
+            has no IoU threshold or if a metric is unknown.
+    """
+    unknown = [m for m in metrics if m not in ("bev", "3d")]
+    if unknown:
+        raise ValueError("Unknown metrics {0}".format(unknown))
+
+    n_images = len(gt_boxes)
+    recall_thresholds = np.asarray(recall_thresholds, dtype=np.float64)
+
+    gt, gt_counts = _flatten_boxes_3d(gt_boxes, n_images, "gt_boxes")
+    dt, dt_counts = _flatten_boxes_3d(dt_boxes, n_images, "dt_boxes")
+    dt_score = _concatenate(dt_scores, dt_counts, "dt_scores", dtype=np.float64)
+    ignore = _concatenate(gt_ignore, gt_counts, "gt_ignore", dtype=bool)
+
+    labels, gt_key, dt_key = _group_keys(gt_labels, dt_labels, gt_counts, dt_counts)
+    K = labels.shape[0]
+    if iou_thresholds is None:
+        iou_thresholds = KITTI_IOU_THRESHOLDS
+    thresholds = _class_thresholds(labels, iou_thresholds)
+
+    # match the detections of blocks of frames separately
+    arrays = _frame_arrays(gt_counts, dt_counts, gt=gt.numpy(), dt=dt.numpy(),
+                           dt_score=dt_score, ignore=ignore, gt_key=gt_key, dt_key=dt_key)
+    tasks = [(start, stop, K, thresholds, tuple(metrics))
+             for start, stop in split(n_images, workers or 1, costs=gt_counts + dt_counts)]
+    matched, ignored = _gather(parallel_map(_matches_3d, arrays, tasks, workers=workers),
+                               (len(metrics), 1, len(dt)))
+
+    keys, dt_idx, _ = _groups(gt_key, dt_key, dt_score)
+    n_gt = np.bincount(gt_key[~ignore] % max(K, 1), minlength=K)
+
+    results = {"labels": labels, "iou_thresholds": thresholds}
+    for i, metric in enumerate(metrics):
+        precision, recall = _class_precision_recall(keys, K, dt_idx, dt_score, matched[i],
+                                                    ignored[i], n_gt, recall_thresholds)
+        precision, recall = precision[0], recall[0]
+
+        ap = np.where(n_gt > 0, precision.mean(axis=0), -1.0)
+        results[metric] = {"precision": precision, "recall": recall, "AP": ap,
+                           "mAP": _mean(ap)}
+
+    return results
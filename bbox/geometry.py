@@ -11,13 +11,15 @@ def get_plane(a, b, c):
     """
     Get plane equation from 3 points.
     Returns the coefficients of `ax + by + cz + d = 0`
+
+    The points may also be arrays of shape (..., 3), giving planes of shape (..., 4).
     """
     ab = b - a
     ac = c - a
 
     x = np.cross(ab, ac)
-    d = -np.dot(x, a)
-    pl = np.hstack((x, d))
+    d = -np.sum(x * a, axis=-1)
+    pl = np.concatenate((x, np.expand_dims(d, -1)), axis=-1)
     return pl
 
 
@@ -29,9 +31,11 @@ def point_plane_dist(pt, plane, signed=False):
     Plane is of the format [A, B, C, D], where the plane equation is Ax+By+Cz+D=0
     Point is of the form [x, y, z]
     `signed` flag indicates whether to return signed distance.
+
+    Points of shape (..., 3) and planes of shape (..., 4) are broadcast against each other.
     """
-    v = plane[0:3]
-    dist = (np.dot(v, pt) + plane[3]) / np.linalg.norm(v)
+    v = plane[..., 0:3]
+    dist = (np.einsum('...i,...i->...', v, pt) + plane[..., 3]) / np.linalg.norm(v, axis=-1)
 
     if signed:
         return dist
@@ -76,20 +80,10 @@ def is_separating_axis(o, p1, p2):
         p1: 2D array of points representing a polygon.
         p2: 2D array of points representing a polygon.
     """
-    min1, max1 = float('+inf'), float('-inf')
-    min2, max2 = float('+inf'), float('-inf')
-
-    for v in p1:
-        projection = np.dot(v, o)
-
-        min1 = min(min1, projection)
-        max1 = max(max1, projection)
-
-    for v in p2:
-        projection = np.dot(v, o)
-
-        min2 = min(min2, projection)
-        max2 = max(max2, projection)
+    projection1 = np.dot(p1, o)
+    projection2 = np.dot(p2, o)
+    min1, max1 = projection1.min(), projection1.max()
+    min2, max2 = projection2.min(), projection2.max()
 
     if max1 >= min2 and max2 >= min1:
         d = min(max2 - min1, max1 - min2)
@@ -115,23 +109,55 @@ def polygon_collision(p1, p2):
         p1: 2D array of points representing a polygon.
         p2: 2D array of points representing a polygon.
     """
-    edges = edges_of(p1)
-    edges += edges_of(p2)
-    orthogonals = [orthogonal(e) for e in edges]
+    p1 = np.asarray(p1)
+    p2 = np.asarray(p2)
 
-    push_vectors = []
-    for o in orthogonals:
-        separates, pv = is_separating_axis(o, p1, p2)
+    for p in (p1, p2):
+        N = len(p)
+        for i in range(N):
+            edge = p[(i + 1) % N] - p[i]
+            o = orthogonal(edge)
 
-        if separates:
-            # they do not collide and there is no push vector
-            return False
-        else:
-            push_vectors.append(pv)
+            projection1 = np.dot(p1, o)
+            projection2 = np.dot(p2, o)
+            # stop at the first separating axis, they do not collide
+            if projection1.max() < projection2.min() or projection2.max() < projection1.min():
+                return False
 
     return True
 
 
+def polygon_collision_batch(p1, p2):
+    """
+    Return a boolean mask of the pairs of polygons `p1[k]` and `p2[k]` which collide.
+
+    All the pairs are tested against all their separating axes at once, giving the same
+    result as :py:func:`polygon_collision` for every pair.
+
+    Args:
+        p1: Array of shape (K, V1, 2) of polygons.
+        p2: Array of shape (K, V2, 2) of polygons.
+
+    Returns:
+        Boolean array of shape (K,).
+    """
+    p1 = np.asarray(p1, dtype=float)
+    p2 = np.asarray(p2, dtype=float)
+    if p1.ndim != 3 or p2.ndim != 3 or p1.shape[0] != p2.shape[0]:
+        raise ValueError("polygons should be arrays of shape (K, V, 2) with the same K")
+
+    edges = np.concatenate((np.roll(p1, -1, axis=1) - p1, np.roll(p2, -1, axis=1) - p2), axis=1)
+    # the orthogonals of the edges are the candidate separating axes
+    axes = np.stack((-edges[..., 1], edges[..., 0]), axis=-1)
+
+    projection1 = np.einsum('kvd,kad->kva', p1, axes)
+    projection2 = np.einsum('kvd,kad->kva', p2, axes)
+    overlap = (projection1.max(axis=1) >= projection2.min(axis=1)) & \
+        (projection2.max(axis=1) >= projection1.min(axis=1))
+
+    return np.all(overlap, axis=1)
+
+
 def polygon_area(polygon):
     """
     Get the area of a polygon which is represented by a 2D array of points.
@@ -197,3 +223,315 @@ def polygon_intersection(poly1, poly2):
         e1 = e2
 
     return np.array(output_list)
+
+
+def interval_overlap_pairs(a_lo, a_hi, b_lo, b_hi):
+    """
+    Find all the pairs of overlapping closed intervals `[a_lo[i], a_hi[i]]` and \
+        `[b_lo[j], b_hi[j]]` using sort and sweep.
+
+    Two intervals overlap if and only if one of them starts inside the other, so the pairs
+    are found with binary searches over the sorted interval starts, without ever
+    building the dense N x M comparison. The cost is O((N + M) log(N + M) + K)
+    where K is the number of overlapping pairs.
+
+    Args:
+        a_lo: 1D array of the lower ends of the first set of intervals.
+        a_hi: 1D array of the upper ends of the first set of intervals.
+        b_lo: 1D array of the lower ends of the second set of intervals.
+        b_hi: 1D array of the upper ends of the second set of intervals.
+
+    Returns:
+        tuple: Index arrays `(i, j)` of the overlapping pairs, in no particular order.
+    """
+    def starts_inside(lo, hi, starts, side):
+        # for every interval [lo, hi], the sorted `starts` inside it
+        order = np.argsort(starts, kind='stable')
+        sorted_starts = starts[order]
+        begin = np.searchsorted(sorted_starts, lo, side=side)
+        end = np.searchsorted(sorted_starts, hi, side='right')
+        counts = np.maximum(end - begin, 0)
+
+        outer = np.repeat(np.arange(lo.shape[0]), counts)
+        # position of every pair within the run of its interval
+        offsets = np.arange(outer.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        inner = order[np.repeat(begin, counts) + offsets]
+        return outer, inner
+
+    a_lo, a_hi = np.asarray(a_lo), np.asarray(a_hi)
+    b_lo, b_hi = np.asarray(b_lo), np.asarray(b_hi)
+
+    # b starts inside a: a_lo <= b_lo <= a_hi
+    i1, j1 = starts_inside(a_lo, a_hi, b_lo, side='left')
+    # a starts inside b, strictly after b starts, so that no pair is counted twice
+    j2, i2 = starts_inside(b_lo, b_hi, a_lo, side='right')
+
+    return np.concatenate((i1, i2)), np.concatenate((j1, j2))
+
+
+def quaternion_rotation_matrix(q):
+    """
+    Get the rotation matrices of quaternions.
+    The quaternions are normalized to unit length first.
+
+    Args:
+        q: Array of shape (..., 4) of quaternions in (w, x, y, z) form.
+
+    Returns:
+        Array of shape (..., 3, 3) of rotation matrices.
+    """
+    q = np.asarray(q, dtype=float)
+    norm = np.linalg.norm(q, axis=-1, keepdims=True)
+    q = q / np.where(norm > 0, norm, 1)
+    w, x, y, z = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+
+    R = np.empty(q.shape[:-1] + (3, 3))
+    R[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    R[..., 0, 1] = 2 * (x * y - z * w)
+    R[..., 0, 2] = 2 * (x * z + y * w)
+    R[..., 1, 0] = 2 * (x * y + z * w)
+    R[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    R[..., 1, 2] = 2 * (y * z - x * w)
+    R[..., 2, 0] = 2 * (x * z - y * w)
+    R[..., 2, 1] = 2 * (y * z + x * w)
+    R[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+def _vertex_counts(shape, valid):
+    """
+    Number of valid vertices of each polygon, given the (K, V) `valid` mask of padded polygons.
+    Valid vertices are expected to come first.
+    """
+    if valid is None:
+        return np.full(shape[0], shape[1], dtype=np.intp)
+    return np.count_nonzero(valid, axis=-1)
+
+
+def _vertex_validity(counts, width):
+    return np.arange(width) < counts[:, None]
+
+
+def _previous_vertices(counts, width):
+    """
+    Index of the vertex preceding each vertex of K padded polygons with `counts` vertices.
+    """
+    prev = np.arange(width) - 1
+    return np.where(prev < 0, np.maximum(counts - 1, 0)[:, None], prev[None, :])
+
+
+def _clip_step(polygons, counts, e_inside, intersect):
+    """
+    One Sutherland-Hodgman step over K padded polygons, given which vertices are inside
+    the clipping boundary.
+
+    Only the polygons crossing the boundary are clipped, the polygons entirely inside it
+    are left untouched and the ones entirely outside of it become empty. For the crossing
+    polygons, `intersect(rows, e, s, prev)` gives the intersections of the boundary with
+    the lines from the previous vertices `s` (at indices `prev`) to the vertices `e`
+    of the polygons `rows`.
+    """
+    K, V, D = polygons.shape
+    n_inside = np.count_nonzero(e_inside & _vertex_validity(counts, V), axis=1)
+    rows = np.flatnonzero((n_inside > 0) & (n_inside < counts))
+    new_counts = np.where(n_inside == 0, 0, counts)
+
+    if rows.size == 0:
+        return polygons, new_counts
+
+    e = polygons[rows]
+    prev = _previous_vertices(counts[rows], V)
+    s = np.take_along_axis(e, prev[..., None], axis=1)
+    e_inside = e_inside[rows]
+    s_inside = np.take_along_axis(e_inside, prev, axis=1)
+
+    # every vertex e emits the intersection point if the (s, e) line crosses the boundary,
+    # followed by e itself if it is inside
+    candidates = np.stack((intersect(rows, e, s, prev), e), axis=2).reshape(-1, 2 * V, D)
+    keep = np.stack((e_inside != s_inside, e_inside), axis=2)
+    keep &= _vertex_validity(counts[rows], V)[..., None]
+    keep = keep.reshape(-1, 2 * V)
+
+    clipped_counts = np.count_nonzero(keep, axis=1)
+    new_counts[rows] = clipped_counts
+
+    width = int(new_counts.max())
+    output = np.zeros((K, width, D))
+    output[:, :min(V, width)] = polygons[:, :min(V, width)]
+    output[rows] = 0
+
+    r, c = np.nonzero(keep)
+    output[rows[r], np.cumsum(keep, axis=1)[r, c] - 1] = candidates[r, c]
+
+    return output, new_counts
+
+
+def polygon_intersection_batch(poly1, poly2, valid1=None, valid2=None):
+    """
+    Use the Sutherland-Hodgman algorithm to compute the intersections of K pairs of \
+        convex polygons at once.
+
+    The polygons are given as padded arrays, where the valid vertices of every polygon come
+    first and are flagged by an optional validity mask. All the pairs are clipped against
+    the same edge of their clipping polygon in a single vectorized step, giving the same
+    vertices as :py:func:`polygon_intersection` for every pair.
+
+    Args:
+        poly1: Array of shape (K, V1, 2) of subject polygons.
+        poly2: Array of shape (K, V2, 2) of clipping polygons.
+        valid1: Optional boolean array of shape (K, V1) of the valid vertices of `poly1`.
+        valid2: Optional boolean array of shape (K, V2) of the valid vertices of `poly2`.
+
+    Returns:
+        tuple: The intersection polygons as an array of shape (K, W, 2) and the boolean \
+            array of shape (K, W) of their valid vertices.
+    """
+    output = np.asarray(poly1, dtype=float)
+    poly2 = np.asarray(poly2, dtype=float)
+    if output.ndim != 3 or poly2.ndim != 3 or output.shape[0] != poly2.shape[0]:
+        raise ValueError("polygons should be arrays of shape (K, V, 2) with the same K")
+
+    counts = _vertex_counts(output.shape, valid1)
+    clip_counts = _vertex_counts(poly2.shape, valid2)
+
+    for j in range(poly2.shape[1]):
+        # e1 and e2 are the edge vertices for this edge in the clipping polygon
+        e2 = poly2[:, j]
+        e1 = poly2[np.arange(poly2.shape[0]), np.where(j == 0, np.maximum(clip_counts - 1, 0),
+                                                       j - 1)]
+
+        edge = (e2 - e1)[:, None, :]
+        e_inside = cross2d(edge, output - e1[:, None, :]) >= 0
+        # inactive clipping edges (padding of poly2) leave the subject polygon untouched
+        e_inside[j >= clip_counts] = True
+
+        def line_intersection(rows, e, s, _, e1=e1, e2=e2):
+            # line intersection of (s, e) with the edge (e1, e2)
+            dc = (e1 - e2)[rows, None, :]
+            dp = s - e
+            n1 = cross2d(e1, e2)[rows, None, None]
+            n2 = cross2d(s, e)[..., None]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                n3 = 1.0 / cross2d(dc, dp)[..., None]
+                return (n1 * dp - n2 * dc) * n3
+
+        output, counts = _clip_step(output, counts, e_inside, line_intersection)
+
+    return output, _vertex_validity(counts, output.shape[1])
+
+
+def polygon_clip_planes_batch(polygons, planes, valid=None, tolerance=0.0):
+    """
+    Clip K convex 3D polygons by the half-spaces behind a set of planes each, \
+        using the Sutherland-Hodgman algorithm.
+
+    A point is kept by a plane if its signed distance to the plane, as given by
+    :py:func:`point_plane_dist`, is at most the `tolerance` for that plane.
+
+    Args:
+        polygons: Array of shape (K, V, 3) of padded polygons.
+        planes: Array of shape (K, P, 4) of planes, see :py:func:`get_plane`.
+        valid: Optional boolean array of shape (K, V) of the valid vertices of `polygons`, \
+            which come first in every polygon.
+        tolerance: Scalar or array broadcastable to (K, P) of distances added to the planes.
+
+    Returns:
+        tuple: The clipped polygons as an array of shape (K, W, 3) and the boolean \
+            array of shape (K, W) of their valid vertices.
+    """
+    output = np.asarray(polygons, dtype=float)
+    planes = np.asarray(planes, dtype=float)
+    if output.ndim != 3 or planes.ndim != 3 or output.shape[0] != planes.shape[0]:
+        raise ValueError("polygons and planes should be arrays of shape (K, V, 3) and "
+                         "(K, P, 4) with the same K")
+
+    counts = _vertex_counts(output.shape, valid)
+    tolerance = np.broadcast_to(tolerance, planes.shape[0:2])
+
+    # polygons entirely outside of one of the planes are empty, and the polygons
+    # entirely inside all the planes are not clipped, so only the others are processed
+    dist = point_plane_dist(output[:, :, None, :], planes[:, None, :, :], signed=True) \
+        - tolerance[:, None, :]
+    inside = (dist <= 0) | ~_vertex_validity(counts, output.shape[1])[..., None]
+    outside = np.any(np.all(~inside, axis=1), axis=1)
+    rows = np.flatnonzero(~outside & ~np.all(inside, axis=(1, 2)))
+
+    result = np.zeros_like(output)
+    result_counts = np.where(outside, 0, counts)
+    result[~outside] = output[~outside]
+
+    output, counts = output[rows], counts[rows]
+    planes, tolerance = planes[rows], tolerance[rows]
+
+    for j in range(planes.shape[1]):
+        dist = point_plane_dist(output, planes[:, j, None, :], signed=True) \
+            - tolerance[:, j, None]
+
+        def plane_intersection(rows, e, s, prev, dist=dist):
+            # point where the line (s, e) crosses the plane
+            e_dist = dist[rows]
+            s_dist = np.take_along_axis(e_dist, prev, axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = (s_dist / (s_dist - e_dist))[..., None]
+                return s + t * (e - s)
+
+        output, counts = _clip_step(output, counts, dist <= 0, plane_intersection)
+
+    result_counts[rows] = counts
+    width = int(result_counts.max()) if result_counts.size > 0 else 0
+    if width > result.shape[1]:
+        result = np.concatenate(
+            (result, np.zeros((result.shape[0], width - result.shape[1], 3))), axis=1)
+    # the clipped polygons may keep padding beyond their vertices if a step left them untouched
+    width = min(output.shape[1], result.shape[1])
+    result[rows, :width] = output[:, :width]
+
+    return result, _vertex_validity(result_counts, result.shape[1])
+
+
+def polygon_area_batch(polygons, valid=None):
+    """
+    Get the areas of K padded polygons using the Shoelace Algorithm.
+    Planar polygons in 3D are supported as well, using the cross products of their vertices.
+
+    Args:
+        polygons: Array of shape (K, V, 2) or (K, V, 3) of polygons.
+        valid: Optional boolean array of shape (K, V) of the valid vertices of `polygons`, \
+            which come first in every polygon.
+
+    Returns:
+        Array of shape (K,) of the polygon areas.
+    """
+    polygons = np.asarray(polygons, dtype=float)
+    counts = _vertex_counts(polygons.shape, valid)
+    area = np.zeros(polygons.shape[0])
+
+    # polygons with less than 3 vertices have no area
+    rows = np.flatnonzero(counts >= 3)
+    polygons, counts = polygons[rows], counts[rows]
+    V = polygons.shape[1]
+
+    nxt = np.arange(V) + 1
+    nxt = np.where(nxt >= counts[:, None], 0, nxt[None, :])
+    following = np.take_along_axis(polygons, nxt[..., None], axis=1)
+
+    if polygons.shape[2] == 3:
+        # the first vertex is used as origin for accuracy
+        origin = polygons[:, 0:1]
+        terms = np.cross(polygons - origin, following - origin)
+    else:
+        terms = cross2d(polygons, following)
+    terms[~_vertex_validity(counts, V)] = 0
+
+    # sum the terms one vertex at a time, so that the area of a polygon does not depend
+    # on the padding of the batch it is in
+    total = np.zeros(terms.shape[:1] + terms.shape[2:])
+    for v in range(V):
+        total += terms[:, v]
+
+    if polygons.shape[2] == 3:
+        area[rows] = np.linalg.norm(total, axis=-1) / 2
+    else:
+        area[rows] = np.abs(total) / 2
+
+    return area
@@ -0,0 +1,175 @@
+"""
+Variants of the Intersection over Union (IoU) of 2D bounding boxes, used as regression losses
+and as matching costs.
+
+- The Generalized IoU (GIoU) subtracts from the IoU the fraction of the smallest box enclosing
+  both boxes which is not covered by their union. It is in (-1, 1], and negative for boxes
+  which do not overlap.
+- The Distance IoU (DIoU) subtracts from the IoU the squared distance between the box centers,
+  divided by the squared diagonal of the enclosing box. It is in (-1, 1].
+- The Complete IoU (CIoU) subtracts from the DIoU a penalty on the difference of the aspect
+  ratios of the boxes, weighted by how much the boxes already overlap.
+
+Every variant is available in two forms, which follow the +1 pixel convention of
+:py:func:`~bbox.metrics.jaccard_index_2d` and compute in the
+:py:func:`~bbox.metrics.accumulation_dtype` of the boxes unless `dtype` is given:
+
+- `giou_2d`, `diou_2d` and `ciou_2d` score pairs of boxes elementwise. Two
+  :py:class:`BBox2D` give a :py:class:`float`, and two :py:class:`BBox2DList` of the same
+  length N give an array of shape (N,), as does a :py:class:`BBox2D` with a list of N boxes.
+- `multi_giou_2d`, `multi_diou_2d` and `multi_ciou_2d` score all the pairs of boxes of two lists
+  into a matrix of shape (N, M). They take the same `tile_size`, `out` and `workers` arguments
+  as :py:func:`~bbox.metrics.multi_jaccard_index_2d`, with the same memory guarantees.
+"""
+
+# pylint: disable=invalid-name,missing-docstring
+
+import numpy as np
+
+from bbox.box_modes import XYXY
+
+from .bbox2d import BBox2D
+from .bbox2d_list import BBox2DList
+from .kernels import (complete_jaccard_index_xyxy, distance_jaccard_index_xyxy,
+                      generalized_jaccard_index_xyxy, pairwise_xyxy)
+from .metrics import accumulation_dtype
+
+
+def _paired_2d(func, a, b, dtype=None):
+    """
+    Evaluate the kernel `func` on the pairs of boxes (a[i], b[i]) of two lists of the same
+    length, on a single pair of :py:class:`BBox2D`, or on a :py:class:`BBox2D` paired with
+    every box of a list.
+    """
+    for x in (a, b):
+        if not isinstance(x, (BBox2D, BBox2DList)):
+            raise TypeError(
+                "Expected BBox2D or BBox2DList, got {0}".format(type(x).__name__))
+
+    if isinstance(a, BBox2D) and isinstance(b, BBox2D):
+        dtype = np.dtype(dtype) if dtype is not None else np.float64
+        return float(func(a.numpy(mode=XYXY).astype(dtype)[np.newaxis],
+                          b.numpy(mode=XYXY).astype(dtype)[np.newaxis])[0])
+
+    if isinstance(a, BBox2D) or isinstance(b, BBox2D):
+        # a single box is broadcast against every box of the list
+        dtype = accumulation_dtype((b if isinstance(a, BBox2D) else a).bboxes, dtype=dtype)
+    elif len(a) != len(b):
+        raise ValueError(
+            "Expected lists of the same length, got {0} and {1}".format(len(a), len(b)))
+    else:
+        dtype = accumulation_dtype(a.bboxes, b.bboxes, dtype=dtype)
+
+    a = a.numpy(mode=XYXY).astype(dtype)[np.newaxis] if isinstance(a, BBox2D) else \
+        a.numpy(mode=XYXY, dtype=dtype)
+    b = b.numpy(mode=XYXY).astype(dtype)[np.newaxis] if isinstance(b, BBox2D) else \
+        b.numpy(mode=XYXY, dtype=dtype)
+    return func(a, b)
+
+
+def _multi_2d(func, a, b, dtype=None, tile_size=None, out=None, workers=None):
+    """
+    Evaluate the kernel `func` on all the pairs of boxes of two lists.
+    """
+    dtype = accumulation_dtype(a.bboxes, b.bboxes, dtype=dtype)
+    return pairwise_xyxy(func, a.numpy(mode=XYXY, dtype=dtype), b.numpy(mode=XYXY, dtype=dtype),
+                         tile_size=tile_size, out=out, workers=workers)
+
+
+def giou_2d(a, b, dtype=None):
+    """
+    Compute the Generalized IoU (GIoU) of pairs of 2D bounding boxes.
+
+    Args:
+        a (:py:class:`BBox2D` or :py:class:`BBox2DList`): 2D bounding box, or list of N boxes.
+        b (:py:class:`BBox2D` or :py:class:`BBox2DList`): 2D bounding box, or list of N boxes.
+        dtype (data-type, optional): Type in which the GIoU is computed.
+
+    Returns:
+        :py:class:`float` for two boxes, or :py:class:`ndarray` of shape (N,) of the GIoU of \
+            (a[i], b[i]). A single box is paired with every box of a list.
+
+    Raises:
+        TypeError: If `a` or `b` is neither a :py:class:`BBox2D` nor a :py:class:`BBox2DList`.
+        ValueError: If the lists do not have the same length.
+    """
+    return _paired_2d(generalized_jaccard_index_xyxy, a, b, dtype=dtype)
+
+
+def diou_2d(a, b, dtype=None):
+    """
+    Compute the Distance IoU (DIoU) of pairs of 2D bounding boxes.
+
+    Args:
+        a (:py:class:`BBox2D` or :py:class:`BBox2DList`): 2D bounding box, or list of N boxes.
+        b (:py:class:`BBox2D` or :py:class:`BBox2DList`): 2D bounding box, or list of N boxes.
+        dtype (data-type, optional): Type in which the DIoU is computed.
+
+    Returns:
+        :py:class:`float` for two boxes, or :py:class:`ndarray` of shape (N,) of the DIoU of \
+            (a[i], b[i]). A single box is paired with every box of a list.
+
+    Raises:
+        TypeError: If `a` or `b` is neither a :py:class:`BBox2D` nor a :py:class:`BBox2DList`.
+        ValueError: If the lists do not have the same length.
+    """
+    return _paired_2d(distance_jaccard_index_xyxy, a, b, dtype=dtype)
+
+
+def ciou_2d(a, b, dtype=None):
+    """
+    Compute the Complete IoU (CIoU) of pairs of 2D bounding boxes.
+
+    Args:
+        a (:py:class:`BBox2D` or :py:class:`BBox2DList`): 2D bounding box, or list of N boxes.
+        b (:py:class:`BBox2D` or :py:class:`BBox2DList`): 2D bounding box, or list of N boxes.
+        dtype (data-type, optional): Type in which the CIoU is computed.
+
+    Returns:
+        :py:class:`float` for two boxes, or :py:class:`ndarray` of shape (N,) of the CIoU of \
+            (a[i], b[i]). A single box is paired with every box of a list.
+
+    Raises:
+        TypeError: If `a` or `b` is neither a :py:class:`BBox2D` nor a :py:class:`BBox2DList`.
+        ValueError: If the lists do not have the same length.
+    """
+    return _paired_2d(complete_jaccard_index_xyxy, a, b, dtype=dtype)
+
+
+def multi_giou_2d(a: BBox2DList, b: BBox2DList, dtype=None, tile_size=None, out=None,
+                  workers=None):
+    """
+    Compute the Generalized IoU (GIoU) of all the pairs of boxes of two sets of
+    2D bounding boxes. See :py:func:`~bbox.metrics.multi_jaccard_index_2d` for the arguments.
+
+    Returns:
+        :py:class:`ndarray`: GIoU Matrix of shape (N, M).
+    """
+    return _multi_2d(generalized_jaccard_index_xyxy, a, b, dtype=dtype, tile_size=tile_size,
+                     out=out, workers=workers)
+
+
+def multi_diou_2d(a: BBox2DList, b: BBox2DList, dtype=None, tile_size=None, out=None,
+                  workers=None):
+    """
+    Compute the Distance IoU (DIoU) of all the pairs of boxes of two sets of
+    2D bounding boxes. See :py:func:`~bbox.metrics.multi_jaccard_index_2d` for the arguments.
+
+    Returns:
+        :py:class:`ndarray`: DIoU Matrix of shape (N, M).
+    """
+    return _multi_2d(distance_jaccard_index_xyxy, a, b, dtype=dtype, tile_size=tile_size,
+                     out=out, workers=workers)
+
+
+def multi_ciou_2d(a: BBox2DList, b: BBox2DList, dtype=None, tile_size=None, out=None,
+                  workers=None):
+    """
+    Compute the Complete IoU (CIoU) of all the pairs of boxes of two sets of
+    2D bounding boxes. See :py:func:`~bbox.metrics.multi_jaccard_index_2d` for the arguments.
+
+    Returns:
+        :py:class:`ndarray`: CIoU Matrix of shape (N, M).
+    """
+    return _multi_2d(complete_jaccard_index_xyxy, a, b, dtype=dtype, tile_size=tile_size,
+                     out=out, workers=workers)
@@ -0,0 +1,281 @@
+"""
+Array kernels shared by the metrics, IoU variants, matching, evaluation and index modules.
+
+The 2D kernels take broadcastable arrays of XYXY box coordinates along their last axis and
+follow the +1 pixel convention of :py:func:`~bbox.metrics.jaccard_index_2d`. The 3D kernels
+take lists of yaw-only boxes. None of them validate their inputs, which is left to the
+functions of :py:mod:`bbox.metrics` and :py:mod:`bbox.iou_variants` built on them.
+"""
+
+# pylint: disable=invalid-name,missing-docstring,logging-fstring-interpolation
+
+import numpy as np
+from loguru import logger
+
+from bbox.geometry import (interval_overlap_pairs, polygon_area_batch, polygon_collision_batch,
+                           polygon_intersection_batch)
+
+from .bbox3d_list import BBox3DList
+from .parallel import parallel_map, split
+
+
+def intersection_union_xyxy(a, b):
+    """
+    Compute the intersection and union areas of 2D bounding boxes given as broadcastable
+    arrays `a` and `b` of XYXY coordinates along their last axis.
+    """
+    # work in place as much as possible to limit the number of temporaries
+    inter_w = np.minimum(a[..., 2], b[..., 2])
+    inter_w -= np.maximum(a[..., 0], b[..., 0])
+    inter_w += 1
+    np.maximum(inter_w, 0, out=inter_w)
+
+    inter_h = np.minimum(a[..., 3], b[..., 3])
+    inter_h -= np.maximum(a[..., 1], b[..., 1])
+    inter_h += 1
+    np.maximum(inter_h, 0, out=inter_h)
+
+    intersection = inter_w
+    intersection *= inter_h
+    del inter_h
+
+    a_area = (a[..., 2] - a[..., 0] + 1) * (a[..., 3] - a[..., 1] + 1)
+    b_area = (b[..., 2] - b[..., 0] + 1) * (b[..., 3] - b[..., 1] + 1)
+
+    union = a_area + b_area
+    union -= intersection
+
+    return intersection, union
+
+
+def jaccard_index_xyxy(a, b):
+    """
+    Compute the IoU of 2D bounding boxes given as broadcastable arrays `a` and `b`
+    of XYXY coordinates along their last axis.
+    """
+    intersection, union = intersection_union_xyxy(a, b)
+
+    iou = np.zeros_like(union)
+    np.divide(intersection, union, out=iou, where=union > 0)
+
+    # set nan and +/- inf to 0
+    iou[~np.isfinite(iou)] = 0
+
+    return iou
+
+
+def _iou_terms_xyxy(a, b):
+    """
+    Compute the IoU and union of 2D bounding boxes given as broadcastable arrays `a` and `b`
+    of XYXY coordinates along their last axis, with the width and height of their smallest
+    enclosing boxes.
+    """
+    intersection, union = intersection_union_xyxy(a, b)
+
+    iou = np.zeros_like(union)
+    np.divide(intersection, union, out=iou, where=union > 0)
+
+    enclosing_w = np.maximum(a[..., 2], b[..., 2]) - np.minimum(a[..., 0], b[..., 0]) + 1
+    enclosing_h = np.maximum(a[..., 3], b[..., 3]) - np.minimum(a[..., 1], b[..., 1]) + 1
+    return iou, union, enclosing_w, enclosing_h
+
+
+def _center_distance_penalty_xyxy(a, b, enclosing_w, enclosing_h):
+    """
+    Squared distance between the centers of the boxes `a` and `b`, normalized by the squared
+    diagonal of their smallest enclosing box.
+    """
+    dx = (a[..., 0] + a[..., 2] - b[..., 0] - b[..., 2]) / 2
+    dy = (a[..., 1] + a[..., 3] - b[..., 1] - b[..., 3]) / 2
+    diagonal = enclosing_w ** 2 + enclosing_h ** 2
+
+    penalty = np.zeros_like(diagonal)
+    np.divide(dx ** 2 + dy ** 2, diagonal, out=penalty, where=diagonal > 0)
+    return penalty
+
+
+def generalized_jaccard_index_xyxy(a, b):
+    """
+    Compute the Generalized IoU (GIoU) of 2D bounding boxes given as broadcastable arrays
+    `a` and `b` of XYXY coordinates, see :py:mod:`bbox.iou_variants`.
+    """
+    iou, union, enclosing_w, enclosing_h = _iou_terms_xyxy(a, b)
+    enclosing = enclosing_w * enclosing_h
+
+    gap = np.zeros_like(union)
+    np.divide(enclosing - union, enclosing, out=gap, where=enclosing > 0)
+
+    giou = iou - gap
+    # set nan and +/- inf to 0
+    giou[~np.isfinite(giou)] = 0
+
+    return giou
+
+
+def distance_jaccard_index_xyxy(a, b):
+    """
+    Compute the Distance IoU (DIoU) of 2D bounding boxes given as broadcastable arrays
+    `a` and `b` of XYXY coordinates, see :py:mod:`bbox.iou_variants`.
+    """
+    iou, _, enclosing_w, enclosing_h = _iou_terms_xyxy(a, b)
+
+    diou = iou - _center_distance_penalty_xyxy(a, b, enclosing_w, enclosing_h)
+    # set nan and +/- inf to 0
+    diou[~np.isfinite(diou)] = 0
+
+    return diou
+
+
+def complete_jaccard_index_xyxy(a, b):
+    """
+    Compute the Complete IoU (CIoU) of 2D bounding boxes given as broadcastable arrays
+    `a` and `b` of XYXY coordinates, see :py:mod:`bbox.iou_variants`.
+    """
+    iou, _, enclosing_w, enclosing_h = _iou_terms_xyxy(a, b)
+
+    a_ratio = np.arctan2(a[..., 2] - a[..., 0] + 1, a[..., 3] - a[..., 1] + 1)
+    b_ratio = np.arctan2(b[..., 2] - b[..., 0] + 1, b[..., 3] - b[..., 1] + 1)
+    v = (4 / np.pi ** 2) * (a_ratio - b_ratio) ** 2
+
+    # trade-off weight of the aspect ratio penalty
+    alpha = np.zeros_like(v)
+    np.divide(v, 1 - iou + v, out=alpha, where=(1 - iou + v) > 0)
+
+    ciou = iou - _center_distance_penalty_xyxy(a, b, enclosing_w, enclosing_h) - alpha * v
+    # set nan and +/- inf to 0
+    ciou[~np.isfinite(ciou)] = 0
+
+    return ciou
+
+
+def _tiled(func, a, b, out, tile_size=None):
+    """
+    Evaluate the pairwise function `func` between the rows of `a` and `b`,
+    one block of at most `tile_size` x `tile_size` pairs at a time, and write the
+    result into the (N, M) array `out`.
+    """
+    n, m = a.shape[0], b.shape[0]
+    if out.shape != (n, m):
+        raise ValueError(
+            "Invalid output shape. Expected {0}, got {1}".format((n, m), out.shape))
+
+    tile_n = max(n if tile_size is None else tile_size, 1)
+    tile_m = max(m if tile_size is None else tile_size, 1)
+
+    for i in range(0, n, tile_n):
+        a_tile = a[i:i + tile_n, np.newaxis, :]
+        for j in range(0, m, tile_m):
+            out[i:i + tile_n, j:j + tile_m] = func(a_tile, b[np.newaxis, j:j + tile_m, :])
+
+    return out
+
+
+def _tiled_rows(arrays, start, stop, tile_size, func):
+    _tiled(func, arrays["a"][start:stop], arrays["b"], arrays["out"][start:stop],
+           tile_size=tile_size)
+
+
+def pairwise_xyxy(func, a, b, tile_size=None, out=None, workers=None):
+    """
+    Evaluate the kernel `func` on all the pairs of rows of the XYXY arrays `a` (N, 4) and
+    `b` (M, 4), in tiles of at most `tile_size` x `tile_size` pairs, optionally in parallel
+    processes. See :py:func:`~bbox.metrics.multi_jaccard_index_2d` for the arguments.
+
+    Returns:
+        :py:class:`ndarray`: Matrix of shape (N, M), of the type of `a` unless `out` is given.
+
+    Raises:
+        ValueError: If `out` does not have shape (N, M).
+    """
+    if out is None:
+        out = np.empty((a.shape[0], b.shape[0]), dtype=a.dtype)
+
+    logger.debug(f"{func.__name__}: {a.shape[0]}x{b.shape[0]} boxes, tile_size={tile_size}")
+
+    if workers is None or workers <= 1:
+        return _tiled(func, a, b, out, tile_size=tile_size)
+
+    if out.shape != (a.shape[0], b.shape[0]):
+        raise ValueError(
+            "Invalid output shape. Expected {0}, got {1}".format((a.shape[0], b.shape[0]),
+                                                                 out.shape))
+    tasks = [(start, stop, tile_size, func) for start, stop in split(a.shape[0], workers)]
+    parallel_map(_tiled_rows, {"a": a, "b": b, "out": out}, tasks, workers=workers,
+                 outputs=("out",))
+    return out
+
+
+def bev_candidate_pairs(fa, fb):
+    """
+    Find the pairs of bird's eye view footprints `fa` (N, V, 2) and `fb` (M, V, 2)
+    whose axis-aligned bounding boxes overlap.
+    """
+    lo_a, hi_a = fa.min(axis=1), fa.max(axis=1)
+    lo_b, hi_b = fb.min(axis=1), fb.max(axis=1)
+
+    i, j = interval_overlap_pairs(lo_a[:, 0], hi_a[:, 0], lo_b[:, 0], hi_b[:, 0])
+    mask = (lo_a[i, 1] <= hi_b[j, 1]) & (lo_b[j, 1] <= hi_a[i, 1])
+    return i[mask], j[mask]
+
+
+def bev_intersection_area(fa, fb):
+    """
+    Compute the intersection areas of the pairs of convex footprints `fa[k]` and `fb[k]`.
+    """
+    intersection, valid = polygon_intersection_batch(fa, fb)
+    return polygon_area_batch(intersection, valid)
+
+
+def jaccard_index_3d_candidates(a: BBox3DList, b: BBox3DList, rows, cols, bev=False,
+                                centered=False):
+    """
+    Compute the IoU of the candidate pairs (`rows`, `cols`) of yaw-only 3D boxes of `a` and `b`,
+    or the IoU of their bird's eye view footprints if `bev` is True.
+    The vertical extent of the boxes is given by `centered`, see
+    :py:func:`~bbox.metrics.multi_jaccard_index_3d`.
+
+    Returns:
+        tuple: The indices of the candidate pairs which overlap, and their IoU.
+    """
+    fa = a.p[:, 0:4, 0:2]
+    fb = b.p[:, 0:4, 0:2]
+    rows = np.asarray(rows, dtype=np.intp)
+    cols = np.asarray(cols, dtype=np.intp)
+
+    # only boxes whose footprints' bounding boxes overlap can intersect
+    lo_a, hi_a = fa.min(axis=1), fa.max(axis=1)
+    lo_b, hi_b = fb.min(axis=1), fb.max(axis=1)
+    mask = np.all((lo_a[rows] <= hi_b[cols]) & (lo_b[cols] <= hi_a[rows]), axis=1)
+    index = np.flatnonzero(mask)
+
+    if bev:
+        height = np.ones(index.shape[0])
+        vol_a, vol_b = a.l * a.w, b.l * b.w
+    else:
+        r, c = rows[index], cols[index]
+        za = a.cz[r] + a.h[r] / 2 if centered else a.cz[r]
+        zb = b.cz[c] + b.h[c] / 2 if centered else b.cz[c]
+        zmax = np.minimum(za, zb)
+        zmin = np.maximum(za - a.h[r], zb - b.h[c])
+        height = np.maximum(0, zmax - zmin)
+        vol_a, vol_b = a.volume, b.volume
+
+    mask = height > 0
+    index, height = index[mask], height[mask]
+
+    # exact separating axis test before clipping the footprints
+    r, c = rows[index], cols[index]
+    mask = polygon_collision_batch(fa[r], fb[c])
+    index, height = index[mask], height[mask]
+
+    r, c = rows[index], cols[index]
+    inter_vol = bev_intersection_area(fa[r], fb[c]) * height
+    union_vol = vol_a[r] + vol_b[c] - inter_vol
+
+    iou = np.zeros_like(inter_vol)
+    np.divide(inter_vol, union_vol, out=iou, where=union_vol != 0)
+
+    # set nan and +/- inf to 0
+    iou[~np.isfinite(iou)] = 0
+
+    return index, np.round(iou, decimals=5)
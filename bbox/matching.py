@@ -0,0 +1,293 @@
+"""
+Assignment of 2D bounding boxes between two lists, e.g. of tracks and detections.
+
+The Hungarian method follows the shortest augmenting path formulation of
+[https://cp-algorithms.com/graph/hungarian-algorithm.html]
+"""
+
+# pylint: disable=invalid-name,missing-docstring
+
+import numpy as np
+
+from bbox.box_modes import XYXY
+from bbox.geometry import interval_overlap_pairs
+
+from .bbox2d_list import BBox2DList
+from .kernels import generalized_jaccard_index_xyxy, jaccard_index_xyxy
+from .metrics import multi_jaccard_index_2d_sparse
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+COSTS = ("iou", "giou", "center")
+METHODS = ("greedy", "hungarian")
+
+
+def _centers(boxes):
+    return (boxes[:, 0:2] + boxes[:, 2:4]) / 2
+
+
+def _candidates(bbl_a, bbl_b, cost, min_iou=None, max_distance=None):
+    """
+    Find the pairs of boxes of `bbl_a` and `bbl_b` which can be matched, and their score:
+    the IoU, the GIoU or the distance between the box centers.
+
+    Returns:
+        tuple: Index arrays `(rows, cols)` of the candidate pairs and their scores.
+    """
+    a = bbl_a.numpy(mode=XYXY, dtype=np.float64)
+    b = bbl_b.numpy(mode=XYXY, dtype=np.float64)
+    ca, cb = _centers(a), _centers(b)
+
+    if min_iou is not None:
+        # only overlapping boxes are compared
+        rows, cols, _ = multi_jaccard_index_2d_sparse(bbl_a, bbl_b, min_iou=min_iou,
+                                                      format=None)
+    elif max_distance is not None:
+        r = max_distance / 2
+        rows, cols = interval_overlap_pairs(ca[:, 0] - r, ca[:, 0] + r, cb[:, 0] - r, cb[:, 0] + r)
+    else:
+        rows, cols = np.divmod(np.arange(a.shape[0] * b.shape[0]), b.shape[0])
+
+    distance = np.linalg.norm(ca[rows] - cb[cols], axis=-1)
+    if max_distance is not None:
+        mask = distance < max_distance
+        rows, cols, distance = rows[mask], cols[mask], distance[mask]
+
+    if cost == "iou":
+        scores = jaccard_index_xyxy(a[rows], b[cols])
+    elif cost == "giou":
+        scores = generalized_jaccard_index_xyxy(a[rows], b[cols])
+    else:
+        scores = distance
+
+    return rows, cols, scores
+
+
+def _greedy(rows, cols, utility):
+    """
+    Greedily match the pairs by decreasing utility (then by row and column), by keeping at
+    every round all the pairs which come first for both their row and their column,
+    which are the pairs the sequential greedy assignment would select.
+    """
+    order = np.lexsort((cols, rows, -utility))
+    rows, cols = rows[order], cols[order]
+    rank = np.arange(rows.shape[0])
+
+    matched = []
+    while rank.shape[0] > 0:
+        best_row = np.full(rows.max() + 1, np.iinfo(np.intp).max)
+        best_col = np.full(cols.max() + 1, np.iinfo(np.intp).max)
+        np.minimum.at(best_row, rows, rank)
+        np.minimum.at(best_col, cols, rank)
+        selected = (best_row[rows] == rank) & (best_col[cols] == rank)
+        matched.append(rank[selected])
+
+        # drop the pairs sharing a row or a column with the selected pairs
+        row_used = np.zeros(rows.max() + 1, dtype=bool)
+        col_used = np.zeros(cols.max() + 1, dtype=bool)
+        row_used[rows[selected]] = True
+        col_used[cols[selected]] = True
+        keep = ~row_used[rows] & ~col_used[cols]
+        rows, cols, rank = rows[keep], cols[keep], rank[keep]
+
+    matched = np.sort(np.concatenate(matched)) if matched else np.zeros(0, dtype=np.intp)
+    return order[matched]
+
+
+def _hungarian(cost):
+    """
+    Solve the rectangular linear assignment problem of the (n, m) `cost` matrix with n <= m,
+    in O(n^2 m), assigning every row to a distinct column with the minimal total cost.
+
+    Returns:
+        :py:class:`ndarray`: The column assigned to every row.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    # row (1-based) assigned to every column, and previous column on the augmenting path
+    p = np.zeros(m + 1, dtype=np.intp)
+    way = np.zeros(m + 1, dtype=np.intp)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        # grow the shortest path tree from row i until it reaches a free column
+        while p[j0] != 0:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+
+            candidates = np.where(free, minv, np.inf)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+
+        # augment along the path
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    assignment = np.zeros(n, dtype=np.intp)
+    assignment[p[1:][p[1:] > 0] - 1] = np.flatnonzero(p[1:] > 0)
+    return assignment
+
+
+def _linear_assignment(utility):
+    """
+    Find the matching of rows and columns of the `utility` matrix with the maximal total
+    utility, using SciPy if available.
+
+    Returns:
+        tuple: Index arrays `(rows, cols)` of the matched pairs of positive utility.
+    """
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(utility, maximize=True)
+    elif utility.shape[0] <= utility.shape[1]:
+        rows = np.arange(utility.shape[0])
+        cols = _hungarian(-utility)
+    else:
+        cols = np.arange(utility.shape[1])
+        rows = _hungarian(-utility.T)
+
+    mask = utility[rows, cols] > 0
+    return rows[mask], cols[mask]
+
+
+def _components(rows, cols, n):
+    """
+    Label the connected components of the bipartite graph of the edges (`rows`, `cols`),
+    whose row vertices are numbered first and column vertices after the `n` rows.
+    """
+    u, v = rows, cols + n
+    labels = np.arange(n + (int(cols.max()) + 1 if cols.shape[0] > 0 else 0))
+    while True:
+        low = np.minimum(labels[u], labels[v])
+        new = labels.copy()
+        np.minimum.at(new, u, low)
+        np.minimum.at(new, v, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            return labels[u]
+        labels = new
+
+
+def _optimal(rows, cols, utility, n):
+    """
+    Find the matching of maximal total utility, solving every connected component of the
+    candidate graph separately.
+    """
+    component = _components(rows, cols, n)
+    n_rows = np.bincount(component[np.unique(rows, return_index=True)[1]])
+    n_cols = np.bincount(component[np.unique(cols, return_index=True)[1]])
+
+    # a component with a single row or column is solved by its best pair
+    simple = (n_rows[component] == 1) | (n_cols[component] == 1)
+    index = np.flatnonzero(simple)
+    order = np.lexsort((-utility[index], component[index]))
+    first = np.unique(component[index][order], return_index=True)[1]
+    matched = [index[order[first]]]
+
+    index = np.flatnonzero(~simple)
+    order = index[np.argsort(component[index], kind='stable')]
+    _, starts, counts = np.unique(component[order], return_index=True, return_counts=True)
+    for start, count in zip(starts, counts):
+        pairs = order[start:start + count]
+        _, r = np.unique(rows[pairs], return_inverse=True)
+        _, c = np.unique(cols[pairs], return_inverse=True)
+
+        dense = np.zeros((r.max() + 1, c.max() + 1))
+        dense[r, c] = utility[pairs]
+        pair_index = np.full(dense.shape, -1, dtype=np.intp)
+        pair_index[r, c] = pairs
+        mr, mc = _linear_assignment(dense)
+        matched.append(pair_index[mr, mc])
+
+    return np.sort(np.concatenate(matched))
+
+
+def match(a: BBox2DList, b: BBox2DList, method="greedy", min_iou=0.0, cost="iou",
+          max_distance=None):
+    """
+    Match the boxes of `a` to the boxes of `b`, e.g. tracks to detections, so that every box
+    is matched at most once.
+
+    Only the pairs whose IoU is greater than `min_iou` and whose centers are closer than
+    `max_distance` can be matched. These candidate pairs are found without building
+    the dense N x M matrix when `min_iou` or `max_distance` is given, and the Hungarian
+    method solves every connected component of the candidate pairs separately, so that
+    large frames are split into many small problems.
+
+    The pairs are scored by `cost`:
+
+    - "iou": The IoU of the boxes.
+    - "giou": The Generalized IoU of the boxes.
+    - "center": The distance between the box centers, where lower is better.
+
+    The "greedy" method matches the pairs from the best score to the worst. The "hungarian"
+    method maximizes the total utility of the matched pairs, which is the IoU, 1 + GIoU,
+    or `max_distance` minus the center distance (by default one more than the largest
+    candidate distance). It uses `scipy.optimize.linear_sum_assignment` if SciPy is installed
+    and an O(n^2 m) shortest augmenting path algorithm otherwise, where n <= m are the numbers
+    of boxes of the two lists.
+
+    Args:
+        a (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        b (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        method (:py:class:`str`): Either "greedy" or "hungarian" (default is "greedy").
+        min_iou (:py:class:`float`, optional): Only pairs with an IoU strictly greater than \
+            this, at least 0, can be matched (default is 0). If None, the IoU is not checked.
+        cost (:py:class:`str`): Score of the pairs, one of "iou", "giou" or "center" \
+            (default is "iou").
+        max_distance (:py:class:`float`, optional): Distance between the centers of the \
+            boxes below which they can be matched.
+
+    Returns:
+        tuple: Index arrays `(a_idx, b_idx)` of the matched pairs, sorted by `a_idx`, \
+            and the score of every matched pair.
+
+    Raises:
+        ValueError: If `method` or `cost` is unknown.
+    """
+    if method not in METHODS:
+        raise ValueError("Unknown method {0}, expected one of {1}".format(method, METHODS))
+    if cost not in COSTS:
+        raise ValueError("Unknown cost {0}, expected one of {1}".format(cost, COSTS))
+
+    rows, cols, scores = _candidates(a, b, cost, min_iou=min_iou, max_distance=max_distance)
+
+    if cost == "iou":
+        utility = scores
+    elif cost == "giou":
+        utility = 1 + scores
+    else:
+        limit = max_distance if max_distance is not None else \
+            (scores.max() + 1 if scores.shape[0] > 0 else 1)
+        utility = limit - scores
+
+    # pairs of zero utility are never better than leaving the boxes unmatched
+    positive = np.flatnonzero(utility > 0)
+    if method == "greedy":
+        selected = positive[_greedy(rows[positive], cols[positive], utility[positive])]
+    else:
+        selected = positive[_optimal(rows[positive], cols[positive], utility[positive],
+                                     len(a))]
+
+    order = np.argsort(rows[selected], kind='stable')
+    selected = selected[order]
+    return rows[selected], cols[selected], scores[selected]
@@ -1,15 +1,25 @@
 """Functions for metrics related to 2D and 3D bounding boxes."""
 
-# pylint: disable=invalid-name,missing-docstring,assignment-from-no-return,logging-fstring-interpolation
+# pylint: disable=invalid-name,missing-docstring,assignment-from-no-return,logging-fstring-interpolation,redefined-builtin
+
+from functools import partial
 
 import numpy as np
 from loguru import logger
 
-from bbox.geometry import polygon_area, polygon_collision, polygon_intersection
+from bbox.box_modes import XYXY
+from bbox.geometry import (get_plane, interval_overlap_pairs, polygon_area, polygon_area_batch,
+                           polygon_clip_planes_batch, polygon_collision, polygon_intersection)
 
 from .bbox2d import BBox2D
 from .bbox2d_list import BBox2DList
-from .bbox3d import BBox3D
+from .bbox3d import FACES, BBox3D
+from .bbox3d_list import BBox3DList
+from .kernels import (bev_candidate_pairs, bev_intersection_area, jaccard_index_3d_candidates,
+                      jaccard_index_xyxy, pairwise_xyxy)
+from .parallel import parallel_map, split
+from .rotated_bbox2d import RotatedBBox2D
+from .rotated_bbox2d_list import RotatedBBox2DList
 
 
 def iou_2d(a: BBox2D, b: BBox2D):
@@ -69,69 +79,171 @@ def jaccard_index_2d(a: BBox2D, b: BBox2D):
     return iou
 
 
-def multi_iou_2d(a: BBox2DList, b: BBox2DList):
+def accumulation_dtype(*arrays, dtype=None):
+    """
+    Get the floating point type in which metrics over `arrays` are computed.
+
+    Boxes stored as float64 or float32 are processed in their own precision, while
+    float16 and integer boxes are accumulated in float32 and float64 respectively,
+    so that areas do not overflow.
+
+    Args:
+        arrays (:py:class:`ndarray`): Arrays of box coordinates.
+        dtype (data-type, optional): Explicit accumulation type. Returned as is if provided.
+    """
+    if dtype is not None:
+        return np.dtype(dtype)
+    return np.result_type(*[x.dtype for x in arrays], np.float32)
+
+
+def multi_iou_2d(a: BBox2DList, b: BBox2DList, dtype=None, tile_size=None, out=None,
+                 workers=None):
     """
     Compute the Intersection over Union (IoU) of two sets of 2D bounding boxes.
 
     Alias for `multi_jaccard_index_2d`.
     """
-    return multi_jaccard_index_2d(a, b)
+    return multi_jaccard_index_2d(a, b, dtype=dtype, tile_size=tile_size, out=out,
+                                  workers=workers)
 
 
-def multi_jaccard_index_2d(a: BBox2DList, b: BBox2DList):
+def multi_jaccard_index_2d(a: BBox2DList, b: BBox2DList, dtype=None, tile_size=None, out=None,
+                           workers=None):
     """
     Compute the Jaccard Index (Intersection over Union) of two sets of 2D bounding boxes.
 
+    The IoU matrix is computed in blocks of `tile_size` x `tile_size` pairs, so the peak
+    memory used besides the output is proportional to `tile_size**2`.
+    The output can be a preallocated array or a :py:class:`numpy.memmap` for matrices
+    that do not fit in memory.
+
     Args:
         a (:py:class:`BBox2DList`): List of 2D bounding boxes.
         b (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        dtype (data-type, optional): Type in which the IoU is computed and returned. \
+            Defaults to :py:func:`accumulation_dtype` of the boxes.
+        tile_size (:py:class:`int`, optional): Maximum number of rows and columns computed \
+            at once. By default the whole matrix is computed in a single block.
+        out (:py:class:`ndarray`, optional): Array of shape (N, M) to write the result into.
+        workers (:py:class:`int`, optional): Number of processes computing blocks of rows \
+            in parallel, see :py:func:`~bbox.parallel.parallel_map`. If `out` is a \
+            :py:class:`numpy.memmap` of a whole file, the workers write their tiles into it \
+            directly. Otherwise the whole (N, M) result is built in shared memory before \
+            being copied into `out`.
 
     Returns:
         :py:class:`ndarray`: IoU Matrix
+
+    Raises:
+        ValueError: If `out` does not have shape (N, M).
     """
+    dtype = accumulation_dtype(a.bboxes, b.bboxes, dtype=dtype)
+    return pairwise_xyxy(jaccard_index_xyxy, a.numpy(mode=XYXY, dtype=dtype),
+                         b.numpy(mode=XYXY, dtype=dtype), tile_size=tile_size, out=out,
+                         workers=workers)
 
-    # We need to add a trailing dimension so that max/min gives us a (N,N) matrix
-    xA = np.maximum(a.x1[:, np.newaxis], b.x1[:, np.newaxis].T)
-    yA = np.maximum(a.y1[:, np.newaxis], b.y1[:, np.newaxis].T)
-    xB = np.minimum(a.x2[:, np.newaxis], b.x2[:, np.newaxis].T)
-    yB = np.minimum(a.y2[:, np.newaxis], b.y2[:, np.newaxis].T)
 
-    logger.debug(
-        "\nmulti_jaccard_index:\nxA\n{xA}\nyA\n{yA}\nxB\n{xB}\nyB\n{yB}")
+def _sparse_matrix(rows, cols, values, shape, format="coo"):
+    """
+    Pack the non-zero entries `values` at (`rows`, `cols`) into a `scipy.sparse` matrix
+    of the given `format`. If `format` is None or SciPy is not installed,
+    the tuple `(rows, cols, values)` is returned instead.
+    """
+    if format is None:
+        return rows, cols, values
 
-    inter_w = xB - xA + 1
-    inter_w[inter_w < 0] = 0
+    try:
+        from scipy import sparse  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        logger.debug("scipy is not available, returning (rows, cols, values)")
+        return rows, cols, values
 
-    inter_h = yB - yA + 1
-    inter_h[inter_h < 0] = 0
+    matrix = sparse.coo_matrix((values, (rows, cols)), shape=shape)
+    return matrix.asformat(format)
 
-    # maximum generates a (N,N) matrix which consumes a lot of memory
-    # thus we are aggressive about freeing memory up.
-    del xA
-    del yA
-    del xB
-    del yB
 
-    intersection = inter_w * inter_h
-    logger.debug(f"\nmulti_jaccard_index intersection:\n {intersection}")
+def _sparse_rows(arrays, start, stop, min_iou, chunk_size):
+    """
+    Find the pairs of the rows [`start`, `stop`) of `arrays["a"]` and the rows of
+    `arrays["b"]` whose IoU is greater than `min_iou`, `chunk_size` rows at a time.
+    """
+    a, b = arrays["a"], arrays["b"]
 
-    a_area = a.width[:, np.newaxis] * a.height[:, np.newaxis]
-    b_area = b.width[:, np.newaxis] * b.height[:, np.newaxis]
-    logger.debug(
-        f"\nmulti_jaccard_index:\n a_area:\n {a_area} \nb_area:\n {b_area}")
+    rows, cols, values = [], [], []
+    for begin in range(start, stop, max(chunk_size, 1)):
+        a_chunk = a[begin:min(begin + chunk_size, stop)]
 
-    union = a_area + b_area.T - intersection
+        # boxes span [x1, x2 + 1) since (x2, y2) is inclusive
+        i, j = interval_overlap_pairs(a_chunk[:, 0], a_chunk[:, 2] + 1, b[:, 0], b[:, 2] + 1)
+        iou = jaccard_index_xyxy(a_chunk[i], b[j])
 
-    iou = np.zeros_like(intersection)
+        mask = iou > min_iou
+        rows.append(i[mask] + begin)
+        cols.append(j[mask])
+        values.append(iou[mask])
 
-    iou[union > 0] = intersection[union > 0] / union[union > 0]
-    iou[union == 0] = np.nan
+    return rows, cols, values
 
-    # set nan and +/- inf to 0
-    iou[np.isinf(iou)] = 0
-    iou[np.isnan(iou)] = 0
 
-    return iou
+def multi_iou_2d_sparse(a: BBox2DList, b: BBox2DList, min_iou=0.0, dtype=None, format="coo",
+                        chunk_size=4096, workers=None):
+    """
+    Compute the sparse Intersection over Union (IoU) matrix of two sets of 2D bounding boxes.
+
+    Alias for `multi_jaccard_index_2d_sparse`.
+    """
+    return multi_jaccard_index_2d_sparse(a, b, min_iou=min_iou, dtype=dtype, format=format,
+                                         chunk_size=chunk_size, workers=workers)
+
+
+def multi_jaccard_index_2d_sparse(a: BBox2DList, b: BBox2DList, min_iou=0.0, dtype=None,
+                                  format="coo", chunk_size=4096, workers=None):
+    """
+    Compute the Jaccard Index (Intersection over Union) of two sets of 2D bounding boxes
+    as a sparse matrix, keeping only the pairs whose IoU is greater than `min_iou`.
+
+    Candidate pairs are found by sort and sweep over the x extents of the boxes
+    (see :py:func:`~bbox.geometry.interval_overlap_pairs`), so the dense N x M matrix
+    is never built and the IoU is only evaluated for boxes whose x ranges overlap.
+
+    Args:
+        a (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        b (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        min_iou (:py:class:`float`): Only pairs with an IoU strictly greater than this \
+            are kept (default is 0).
+        dtype (data-type, optional): Type in which the IoU is computed and returned. \
+            Defaults to :py:func:`accumulation_dtype` of the boxes.
+        format (:py:class:`str`, optional): Format of the `scipy.sparse` matrix to return, \
+            e.g. "coo" or "csr" (default is "coo"). If None, or if SciPy is not installed, \
+            the tuple of arrays `(rows, cols, values)` is returned.
+        chunk_size (:py:class:`int`): Number of boxes of `a` processed at once, which bounds \
+            the number of candidate pairs held in memory.
+        workers (:py:class:`int`, optional): Number of processes handling blocks of rows \
+            in parallel, see :py:func:`~bbox.parallel.parallel_map`.
+
+    Returns:
+        Sparse IoU matrix of shape (N, M), or `(rows, cols, values)` sorted by row and column.
+    """
+    dtype = accumulation_dtype(a.bboxes, b.bboxes, dtype=dtype)
+    a = a.numpy(mode=XYXY, dtype=dtype)
+    b = b.numpy(mode=XYXY, dtype=dtype)
+
+    tasks = [(start, stop, min_iou, chunk_size)
+             for start, stop in split(a.shape[0], workers or 1)]
+    results = parallel_map(_sparse_rows, {"a": a, "b": b}, tasks, workers=workers)
+    rows, cols, values = [], [], []
+    for r, c, v in results:
+        rows += r
+        cols += c
+        values += v
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+    cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.intp)
+    values = np.concatenate(values) if values else np.empty(0, dtype=dtype)
+
+    order = np.lexsort((cols, rows))
+    return _sparse_matrix(rows[order], cols[order], values[order],
+                          shape=(a.shape[0], b.shape[0]), format=format)
 
 
 def iou_3d(a: BBox3D, b: BBox3D):
@@ -188,3 +300,373 @@ def jaccard_index_3d(a: BBox3D, b: BBox3D):
         iou = 0
 
     return np.round(iou, decimals=5)
+
+
+def _pairs_matrix(rows, cols, values, shape, sparse=False, format="coo"):
+    """
+    Scatter the values of the pairs (`rows`, `cols`) into a dense matrix, or pack the
+    non-zero ones into a sparse matrix if `sparse` is True.
+    """
+    if sparse:
+        mask = values > 0
+        rows, cols, values = rows[mask], cols[mask], values[mask]
+        order = np.lexsort((cols, rows))
+        return _sparse_matrix(rows[order], cols[order], values[order], shape=shape,
+                              format=format)
+
+    out = np.zeros(shape)
+    out[rows, cols] = values
+    return out
+
+
+def _pairs_rows(arrays, start, stop, kernel, box_list):
+    rows, cols, values = kernel(box_list(arrays["a"][start:stop]), box_list(arrays["b"]))
+    return rows + start, cols, values
+
+
+def _parallel_pairs(kernel, a, b, workers=None):
+    """
+    Compute the candidate pairs of the box lists `a` and `b` and their values with the
+    pairwise `kernel`, over blocks of rows of `a` handled by `workers` processes.
+    """
+    if workers is None or workers <= 1:
+        return kernel(a, b)
+
+    tasks = [(start, stop, kernel, type(a)) for start, stop in split(len(a), workers)]
+    results = parallel_map(_pairs_rows, {"a": a.numpy(), "b": b.numpy()}, tasks,
+                           workers=workers)
+    if not results:
+        return kernel(a, b)
+    return tuple(np.concatenate(x) for x in zip(*results))
+
+
+def _jaccard_index_3d_pairs(a: BBox3DList, b: BBox3DList, centered=False):
+    """
+    Compute the IoU of all the pairs of yaw-only 3D boxes of `a` and `b` which may overlap.
+
+    Returns:
+        tuple: Index arrays `(rows, cols)` of the candidate pairs and their IoU.
+    """
+    rows, cols = bev_candidate_pairs(a.p[:, 0:4, 0:2], b.p[:, 0:4, 0:2])
+    index, iou = jaccard_index_3d_candidates(a, b, rows, cols, centered=centered)
+    return rows[index], cols[index], iou
+
+
+def multi_iou_3d(a: BBox3DList, b: BBox3DList, sparse=False, format="coo",
+                 workers=None, centered=False):
+    """
+    Compute the Intersection over Union (IoU) of two sets of 3D bounding boxes.
+
+    Alias for `multi_jaccard_index_3d`.
+    """
+    return multi_jaccard_index_3d(a, b, sparse=sparse, format=format, workers=workers,
+                                  centered=centered)
+
+
+def multi_jaccard_index_3d(a: BBox3DList, b: BBox3DList, sparse=False, format="coo",
+                           workers=None, centered=False):
+    """
+    Compute the Jaccard Index (Intersection over Union) of two sets of 3D bounding boxes.
+
+    By default `cz` is taken as the top of the boxes, so that the IoU of every pair is the
+    same as given by :py:func:`jaccard_index_3d`. With `centered=True`, the boxes extend by
+    half their height above and below `cz`, as their corners :py:attr:`BBox3D.p` do, which
+    gives the same IoU as :py:func:`jaccard_index_3d_exact` for yaw-only boxes. This is the
+    convention used by :py:func:`~bbox.evaluation.evaluate_3d`.
+
+    Pairs whose bird's eye view footprints have non-overlapping axis-aligned bounding boxes,
+    which do not overlap vertically or whose footprints do not collide, are pruned first
+    with vectorized tests, so that the polygon clipping is only performed for the remaining
+    pairs.
+
+    **Note**: We follow the KITTI format and assume only yaw rotations (along z-axis).
+
+    Args:
+        a (:py:class:`BBox3DList`): List of 3D bounding boxes.
+        b (:py:class:`BBox3DList`): List of 3D bounding boxes.
+        sparse (:py:class:`bool`): If True, return a sparse matrix of the non-zero IoUs \
+            (default is False).
+        format (:py:class:`str`, optional): Format of the sparse matrix, \
+            see :py:func:`multi_jaccard_index_2d_sparse`.
+        workers (:py:class:`int`, optional): Number of processes handling blocks of boxes \
+            of `a` in parallel, see :py:func:`~bbox.parallel.parallel_map`.
+        centered (:py:class:`bool`): If True, `cz` is the center of the boxes instead of \
+            their top (default is False).
+
+    Returns:
+        :py:class:`ndarray`: IoU Matrix of shape (N, M), or sparse matrix if `sparse` is True.
+    """
+    if not isinstance(a, BBox3DList):
+        a = BBox3DList(a)
+    if not isinstance(b, BBox3DList):
+        b = BBox3DList(b)
+
+    kernel = partial(_jaccard_index_3d_pairs, centered=centered)
+    rows, cols, iou = _parallel_pairs(kernel, a, b, workers=workers)
+    return _pairs_matrix(rows, cols, iou, (len(a), len(b)), sparse=sparse, format=format)
+
+
+def _box_planes(corners):
+    """
+    Get the unit outward planes of the faces of boxes with (K, 8, 3) `corners`.
+
+    Returns:
+        tuple: The faces as an array of shape (K, 6, 4, 3) and their planes (K, 6, 4).
+    """
+    faces = corners[:, FACES]
+    planes = get_plane(faces[..., 0, :], faces[..., 1, :], faces[..., 2, :])
+    planes /= np.linalg.norm(planes[..., 0:3], axis=-1, keepdims=True)
+    return faces, planes
+
+
+def _intersection_volume_3d(ca, cb):
+    """
+    Compute the intersection volumes of the pairs of arbitrarily rotated boxes with
+    (K, 8, 3) corners `ca` and `cb`, none of which may be flat.
+
+    The boundary of the intersection is made of the faces of each box clipped by the
+    half-spaces of the other box, so its volume follows from the divergence theorem as
+    a third of the sum over these faces of their area times their distance to the origin.
+    """
+    K = ca.shape[0]
+    if K == 0:
+        return np.zeros(0)
+
+    # use the centers of the first boxes as origin for accuracy
+    origin = ca.mean(axis=1, keepdims=True)
+    faces_a, planes_a = _box_planes(ca - origin)
+    faces_b, planes_b = _box_planes(cb - origin)
+
+    scale = np.maximum(np.abs(ca - origin).max(axis=(1, 2)), np.abs(cb - origin).max(axis=(1, 2)))
+    tol = 1e-12 * scale[:, None, None]
+
+    # A face lying on a face of the other box with the same orientation is counted once,
+    # by keeping it for the first box and discarding it for the second box
+    same = np.einsum('kfd,kjd->kfj', planes_b[..., 0:3], planes_a[..., 0:3]) > 1 - 1e-9
+    tol_a = np.broadcast_to(tol, (K, 6, 6))
+    tol_b = np.where(same, -tol, tol)
+
+    def clipped_areas(faces, planes, tolerance):
+        polygons, valid = polygon_clip_planes_batch(
+            faces.reshape(K * 6, 4, 3), np.repeat(planes, 6, axis=0),
+            tolerance=tolerance.reshape(K * 6, 6))
+        return polygon_area_batch(polygons, valid).reshape(K, 6)
+
+    area_a = clipped_areas(faces_a, planes_b, tol_a)
+    area_b = clipped_areas(faces_b, planes_a, tol_b)
+
+    # distance of the face planes to the origin
+    volume = (np.sum(-planes_a[..., 3] * area_a, axis=1) +
+              np.sum(-planes_b[..., 3] * area_b, axis=1)) / 3
+    return np.maximum(volume, 0)
+
+
+def _jaccard_index_3d_exact(ca, cb, vol_a, vol_b):
+    """
+    Compute the exact IoU of the pairs of boxes with (K, 8, 3) corners `ca` and `cb`,
+    and volumes `vol_a` and `vol_b`.
+    """
+    iou = np.zeros(ca.shape[0])
+    solid = (vol_a > 0) & (vol_b > 0)
+
+    inter_vol = _intersection_volume_3d(ca[solid], cb[solid])
+    union_vol = vol_a[solid] + vol_b[solid] - inter_vol
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        iou[solid] = inter_vol / union_vol
+
+    # set nan and +/- inf to 0
+    iou[~np.isfinite(iou)] = 0
+    return np.clip(iou, 0, 1)
+
+
+def iou_3d_exact(a: BBox3D, b: BBox3D):
+    """
+    Compute the exact Intersection over Union (IoU) of a pair of arbitrarily rotated
+    3D bounding boxes.
+
+    Alias for `jaccard_index_3d_exact`.
+    """
+    return jaccard_index_3d_exact(a, b)
+
+
+def jaccard_index_3d_exact(a: BBox3D, b: BBox3D):
+    """
+    Compute the exact Jaccard Index / Intersection over Union (IoU) of a pair of \
+        3D bounding boxes with arbitrary quaternion rotations.
+
+    Unlike :py:func:`jaccard_index_3d`, which assumes yaw-only rotations and measures the
+    vertical overlap from `cz` and `h` alone, this computes the volume of the intersection
+    of the two boxes by clipping the faces of each box with the half-spaces of the other.
+
+    Args:
+        a (:py:class:`BBox3D`): 3D bounding box.
+        b (:py:class:`BBox3D`): 3D bounding box.
+
+    Returns:
+        :py:class:`float`: The IoU of the 2 bounding boxes.
+    """
+    iou = _jaccard_index_3d_exact(a.p[np.newaxis], b.p[np.newaxis],
+                                  np.array([a.l * a.w * a.h]), np.array([b.l * b.w * b.h]))
+    return float(iou[0])
+
+
+def _jaccard_index_3d_exact_pairs(a: BBox3DList, b: BBox3DList):
+    """
+    Compute the exact IoU of all the pairs of 3D boxes of `a` and `b` whose axis-aligned
+    bounding boxes overlap.
+
+    Returns:
+        tuple: Index arrays `(rows, cols)` of the candidate pairs and their IoU.
+    """
+    pa, pb = a.p, b.p
+    lo_a, hi_a = pa.min(axis=1), pa.max(axis=1)
+    lo_b, hi_b = pb.min(axis=1), pb.max(axis=1)
+
+    rows, cols = interval_overlap_pairs(lo_a[:, 0], hi_a[:, 0], lo_b[:, 0], hi_b[:, 0])
+    mask = np.all((lo_a[rows, 1:] <= hi_b[cols, 1:]) & (lo_b[cols, 1:] <= hi_a[rows, 1:]),
+                  axis=1)
+    rows, cols = rows[mask], cols[mask]
+
+    iou = _jaccard_index_3d_exact(pa[rows], pb[cols], a.volume[rows], b.volume[cols])
+    return rows, cols, iou
+
+
+def multi_iou_3d_exact(a: BBox3DList, b: BBox3DList, sparse=False, format="coo",
+                       workers=None):
+    """
+    Compute the exact Intersection over Union (IoU) of two sets of arbitrarily rotated
+    3D bounding boxes.
+
+    Alias for `multi_jaccard_index_3d_exact`.
+    """
+    return multi_jaccard_index_3d_exact(a, b, sparse=sparse, format=format, workers=workers)
+
+
+def multi_jaccard_index_3d_exact(a: BBox3DList, b: BBox3DList, sparse=False, format="coo",
+                                 workers=None):
+    """
+    Compute the exact Jaccard Index (Intersection over Union) of two sets of 3D bounding boxes
+    with arbitrary quaternion rotations.
+    The IoU of every pair is the same as given by :py:func:`jaccard_index_3d_exact`.
+
+    Pairs whose axis-aligned bounding boxes do not overlap are pruned first, and the
+    faces of all the remaining pairs are clipped at once.
+
+    Args:
+        a (:py:class:`BBox3DList`): List of 3D bounding boxes.
+        b (:py:class:`BBox3DList`): List of 3D bounding boxes.
+        sparse (:py:class:`bool`): If True, return a sparse matrix of the non-zero IoUs \
+            (default is False).
+        format (:py:class:`str`, optional): Format of the sparse matrix, \
+            see :py:func:`multi_jaccard_index_2d_sparse`.
+        workers (:py:class:`int`, optional): Number of processes handling blocks of boxes \
+            of `a` in parallel, see :py:func:`~bbox.parallel.parallel_map`.
+
+    Returns:
+        :py:class:`ndarray`: IoU Matrix of shape (N, M), or sparse matrix if `sparse` is True.
+    """
+    if not isinstance(a, BBox3DList):
+        a = BBox3DList(a)
+    if not isinstance(b, BBox3DList):
+        b = BBox3DList(b)
+
+    rows, cols, iou = _parallel_pairs(_jaccard_index_3d_exact_pairs, a, b, workers=workers)
+    return _pairs_matrix(rows, cols, iou, (len(a), len(b)), sparse=sparse, format=format)
+
+
+def iou_rotated_2d(a: RotatedBBox2D, b: RotatedBBox2D):
+    """
+    Compute the Intersection over Union (IoU) of a pair of rotated 2D bounding boxes.
+
+    Alias for `jaccard_index_rotated_2d`.
+    """
+    return jaccard_index_rotated_2d(a, b)
+
+
+def jaccard_index_rotated_2d(a: RotatedBBox2D, b: RotatedBBox2D):
+    """
+    Compute the Jaccard Index / Intersection over Union (IoU) of a pair of \
+        rotated 2D bounding boxes.
+
+    Args:
+        a (:py:class:`RotatedBBox2D`): Rotated 2D bounding box.
+        b (:py:class:`RotatedBBox2D`): Rotated 2D bounding box.
+
+    Returns:
+        :py:class:`float`: The IoU of the 2 bounding boxes.
+    """
+    intersection_points = polygon_intersection(a.p, b.p)
+    # If intersection_points is empty, means the boxes don't intersect
+    if len(intersection_points) == 0:
+        return 0.0
+
+    inter_area = polygon_area(intersection_points)
+    union_area = a.area + b.area - inter_area
+
+    if union_area <= 0:
+        return 0.0
+
+    return inter_area / union_area
+
+
+def _jaccard_index_rotated_2d_pairs(a: RotatedBBox2DList, b: RotatedBBox2DList):
+    """
+    Compute the IoU of all the pairs of rotated 2D boxes of `a` and `b` whose axis-aligned
+    bounding boxes overlap.
+
+    Returns:
+        tuple: Index arrays `(rows, cols)` of the candidate pairs and their IoU.
+    """
+    pa, pb = a.p, b.p
+    rows, cols = bev_candidate_pairs(pa, pb)
+
+    inter_area = bev_intersection_area(pa[rows], pb[cols])
+    union_area = a.area[rows] + b.area[cols] - inter_area
+
+    iou = np.zeros_like(inter_area)
+    np.divide(inter_area, union_area, out=iou, where=union_area > 0)
+
+    return rows, cols, iou
+
+
+def multi_iou_rotated_2d(a: RotatedBBox2DList, b: RotatedBBox2DList, sparse=False,
+                         format="coo", workers=None):
+    """
+    Compute the Intersection over Union (IoU) of two sets of rotated 2D bounding boxes.
+
+    Alias for `multi_jaccard_index_rotated_2d`.
+    """
+    return multi_jaccard_index_rotated_2d(a, b, sparse=sparse, format=format, workers=workers)
+
+
+def multi_jaccard_index_rotated_2d(a: RotatedBBox2DList, b: RotatedBBox2DList, sparse=False,
+                                   format="coo", workers=None):
+    """
+    Compute the Jaccard Index (Intersection over Union) of two sets of rotated 2D bounding boxes.
+    The IoU of every pair is the same as given by :py:func:`jaccard_index_rotated_2d`.
+
+    The pairs are first pruned by testing whether the axis-aligned bounding boxes of their
+    corners overlap, and only the remaining pairs are clipped exactly, all at once.
+
+    Args:
+        a (:py:class:`RotatedBBox2DList`): List of rotated 2D bounding boxes.
+        b (:py:class:`RotatedBBox2DList`): List of rotated 2D bounding boxes.
+        sparse (:py:class:`bool`): If True, return a sparse matrix of the non-zero IoUs \
+            (default is False).
+        format (:py:class:`str`, optional): Format of the sparse matrix, \
+            see :py:func:`multi_jaccard_index_2d_sparse`. If None, the tuple \
+            `(rows, cols, values)` of the non-zero IoUs is returned.
+        workers (:py:class:`int`, optional): Number of processes handling blocks of boxes \
+            of `a` in parallel, see :py:func:`~bbox.parallel.parallel_map`.
+
+    Returns:
+        :py:class:`ndarray`: IoU Matrix of shape (N, M), or sparse matrix if `sparse` is True.
+    """
+    if not isinstance(a, RotatedBBox2DList):
+        a = RotatedBBox2DList(a)
+    if not isinstance(b, RotatedBBox2DList):
+        b = RotatedBBox2DList(b)
+
+    rows, cols, iou = _parallel_pairs(_jaccard_index_rotated_2d_pairs, a, b, workers=workers)
+    return _pairs_matrix(rows, cols, iou, (len(a), len(b)), sparse=sparse, format=format)
@@ -0,0 +1,128 @@
+"""
+Parallel evaluation over a pool of processes.
+
+The input arrays are copied once into shared memory blocks, which every worker process maps
+when it starts, so that only small task descriptions and partial results go through pickling.
+Output arrays backed by a file, i.e. :py:class:`numpy.memmap`, are mapped by the workers
+directly instead.
+"""
+
+# pylint: disable=invalid-name,missing-docstring
+
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+import numpy as np
+
+# shared memory blocks (None for files) and arrays mapped by the current worker process
+_shared = {}
+
+
+def _attach(descriptors):
+    """Initialize a worker process by mapping the shared arrays."""
+    _detach()
+    for key, (name, shape, dtype, offset) in descriptors.items():
+        if offset is None:
+            block = shared_memory.SharedMemory(name=name)
+            _shared[key] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+        else:
+            _shared[key] = (None, np.memmap(name, dtype=dtype, mode="r+", offset=offset,
+                                            shape=shape))
+    # close the shared memory blocks when the worker process exits
+    util.Finalize(None, _detach, exitpriority=0)
+
+
+def _detach():
+    blocks = [block for block, _ in _shared.values() if block is not None]
+    _shared.clear()
+    for block in blocks:
+        block.close()
+
+
+def _call(func, args):
+    return func({key: array for key, (_, array) in _shared.items()}, *args)
+
+
+def split(n, chunks, costs=None):
+    """
+    Split the range [0, n) into at most `chunks` contiguous ranges, \
+        of about the same total cost.
+
+    Args:
+        n (:py:class:`int`): Number of elements.
+        chunks (:py:class:`int`): Maximum number of ranges.
+        costs (:py:class:`ndarray`, optional): Array of shape (n,) of the cost of every \
+            element. By default all the elements have the same cost.
+
+    Returns:
+        :py:class:`list`: The `(start, stop)` tuples of the non-empty ranges.
+    """
+    costs = np.ones(n) if costs is None else np.asarray(costs, dtype=np.float64)
+    cumulative = np.cumsum(costs + 1e-9)
+    targets = np.linspace(0, cumulative[-1] if n > 0 else 0, max(chunks, 1) + 1)[1:-1]
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(cumulative, targets), [n])))
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _file_backed(array):
+    """Whether `array` is a writeable, C-contiguous :py:class:`numpy.memmap` of a whole file."""
+    return isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap) and \
+        array.filename is not None and array.mode in ("r+", "w+") and array.flags.c_contiguous
+
+
+def parallel_map(func, arrays, tasks, workers=None, outputs=()):
+    """
+    Call `func(arrays, *args)` for the arguments `args` of every task, \
+        using a pool of `workers` processes.
+
+    The arrays are passed to the workers through :py:mod:`multiprocessing.shared_memory`.
+    The workers can also write into the arrays named in `outputs`. An output which is a
+    :py:class:`numpy.memmap` of a whole file is written by the workers directly, without
+    any copy, while the other outputs are built in shared memory and copied back.
+    `func` should be a module level function, and `tasks` and the results small.
+    Without `workers`, or with a single worker, the tasks run in the current process
+    and give the same results.
+
+    Args:
+        func (callable): Function of a :py:class:`dict` of arrays and of the task arguments.
+        arrays (:py:class:`dict`): Named arrays shared by all the tasks.
+        tasks (:py:class:`list`): Tuple of arguments of every task.
+        workers (:py:class:`int`, optional): Number of processes.
+        outputs (:py:class:`tuple`, optional): Names of the arrays written by the tasks.
+
+    Returns:
+        :py:class:`list`: The results of the tasks, in order.
+    """
+    tasks = list(tasks)
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        return [func(arrays, *args) for args in tasks]
+
+    blocks, descriptors, views = [], {}, {}
+    try:
+        for key, array in arrays.items():
+            if key in outputs and _file_backed(array):
+                array.flush()
+                descriptors[key] = (array.filename, array.shape, array.dtype.str, array.offset)
+                continue
+            array = np.asarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            views[key] = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            views[key][...] = array
+            descriptors[key] = (block.name, array.shape, array.dtype.str, None)
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_attach,
+                                 initargs=(descriptors,)) as pool:
+            results = list(pool.map(_call, [func] * len(tasks), tasks))
+
+        for key in outputs:
+            if key in views:
+                arrays[key][...] = views[key]
+    finally:
+        views.clear()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return results
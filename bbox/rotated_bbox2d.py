@@ -0,0 +1,209 @@
+"""Rotated 2D bounding box module."""
+
+# pylint: disable=invalid-name,missing-docstring
+
+from copy import deepcopy
+
+import numpy as np
+
+# Corners of a box of unit size centered at the origin, in counterclockwise order.
+CORNERS = np.array([[0.5, 0.5],
+                    [-0.5, 0.5],
+                    [-0.5, -0.5],
+                    [0.5, -0.5]])
+
+
+def rotated_box_corners(centers, sizes, theta):
+    """
+    Compute the corners of rotated 2D boxes.
+
+    Args:
+        centers: Array of shape (..., 2) of box centers.
+        sizes: Array of shape (..., 2) of box (width, height).
+        theta: Array of shape (...) of counterclockwise rotation angles in radians.
+
+    Returns:
+        Array of shape (..., 4, 2) of the box corners in counterclockwise order.
+    """
+    centers = np.asarray(centers, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    theta = np.asarray(theta, dtype=float)
+
+    cos, sin = np.cos(theta)[..., None], np.sin(theta)[..., None]
+    local = CORNERS * sizes[..., None, :]
+    x = cos * local[..., 0] - sin * local[..., 1]
+    y = sin * local[..., 0] + cos * local[..., 1]
+
+    return np.stack((x, y), axis=-1) + centers[..., None, :]
+
+
+class RotatedBBox2D:
+    """
+    Class to represent a rotated (oriented) 2D bounding box.
+
+    Unlike :py:class:`~bbox.bbox2d.BBox2D`, the box lives in continuous coordinates,
+    so its area is exactly `w * h`.
+
+    Args:
+        x: Sequence of length 5 representing (cx, cy, w, h, theta), where `theta` is the \
+            counterclockwise rotation of the box about its center in radians.
+
+    Raises:
+        ValueError: If `x` is not of length 5, or if the width or height is not positive.
+        TypeError: If `x` is not of type {list, tuple, numpy.ndarray, RotatedBBox2D}
+    """
+
+    def __init__(self, x):
+        # Copy constructor makes the constructor idempotent
+        if isinstance(x, RotatedBBox2D):
+            x = x.numpy()
+
+        elif isinstance(x, (list, tuple, np.ndarray)):
+            x = np.asarray(x).flatten()
+            if x.size != 5:
+                raise ValueError(
+                    "Invalid input length. Input should have 5 elements.")
+
+        else:
+            raise TypeError(
+                "Expected input to constructor to be a 5 element "
+                "list, tuple, numpy ndarray, or RotatedBBox2D object.")
+
+        self._cx = float(x[0])
+        self._cy = float(x[1])
+        # validated by the setters
+        self.width = x[2]
+        self.height = x[3]
+        self._theta = float(x[4])
+
+    def __eq__(self, x):
+        if not isinstance(x, RotatedBBox2D):
+            return False
+        return np.array_equal(self.numpy(), x.numpy())
+
+    def __repr__(self):
+        return "RotatedBBox2D([{0}, {1}, {2}, {3}, {4}])".format(
+            self._cx, self._cy, self._w, self._h, self._theta)
+
+    @property
+    def cx(self):
+        """
+        :py:class:`float`: X coordinate of the center.
+        """
+        return self._cx
+
+    @cx.setter
+    def cx(self, x):
+        self._cx = float(x)
+
+    @property
+    def cy(self):
+        """
+        :py:class:`float`: Y coordinate of the center.
+        """
+        return self._cy
+
+    @cy.setter
+    def cy(self, y):
+        self._cy = float(y)
+
+    @property
+    def width(self):
+        """
+        :py:class:`float`: Width of the box, along its rotated x axis.
+        """
+        return self._w
+
+    @width.setter
+    def width(self, w):
+        if w <= 0:
+            raise ValueError(
+                "Invalid width value. Width cannot be non-positive.")
+        self._w = float(w)
+
+    @property
+    def w(self):
+        """
+        :py:class:`float`: Syntactic sugar for width.
+        """
+        return self.width
+
+    @w.setter
+    def w(self, w):
+        self.width = w
+
+    @property
+    def height(self):
+        """
+        :py:class:`float`: Height of the box, along its rotated y axis.
+        """
+        return self._h
+
+    @height.setter
+    def height(self, h):
+        if h <= 0:
+            raise ValueError(
+                "Invalid height value. Height cannot be non-positive.")
+        self._h = float(h)
+
+    @property
+    def h(self):
+        """
+        :py:class:`float`: Syntactic sugar for height.
+        """
+        return self.height
+
+    @h.setter
+    def h(self, h):
+        self.height = h
+
+    @property
+    def theta(self):
+        """
+        :py:class:`float`: Counterclockwise rotation of the box in radians.
+        """
+        return self._theta
+
+    @theta.setter
+    def theta(self, theta):
+        self._theta = float(theta)
+
+    @property
+    def center(self):
+        """
+        :py:class:`ndarray`: Center of the box.
+        """
+        return np.array([self._cx, self._cy])
+
+    @property
+    def area(self):
+        """
+        :py:class:`float`: Area of the box.
+        """
+        return self._w * self._h
+
+    @property
+    def p(self):
+        """
+        Attribute to access the corners of the box in counterclockwise order.
+
+        Returns:
+            :py:class:`ndarray` of float: Array of shape (4, 2).
+        """
+        return rotated_box_corners(self.center, [self._w, self._h], self._theta)
+
+    def aabb(self):
+        """
+        Return the axis-aligned bounding box of the box corners as (x1, y1, x2, y2).
+        """
+        p = self.p
+        return np.hstack((p.min(axis=0), p.max(axis=0)))
+
+    def copy(self):
+        return deepcopy(self)
+
+    def numpy(self):
+        """
+        Return the box as a numpy array of (cx, cy, w, h, theta).
+        """
+        return np.asarray([self._cx, self._cy, self._w, self._h, self._theta])
@@ -0,0 +1,177 @@
+"""Rotated 2D bounding box list module."""
+
+# pylint: disable=invalid-name,missing-docstring
+
+from copy import deepcopy
+
+import numpy as np
+
+from bbox.rotated_bbox2d import RotatedBBox2D, rotated_box_corners
+
+
+class RotatedBBox2DList:
+    """
+    Class to represent a list of rotated 2D bounding boxes.
+
+    The boxes are stored in a (N, 5) array of (cx, cy, w, h, theta) rows, so that operations
+    over all the boxes are vectorized.
+
+    Args:
+        arr: Sequence of :py:class:`RotatedBBox2D`, or :py:class:`ndarray` of shape (N, 5) \
+            where each row is (cx, cy, w, h, theta).
+
+    Raises:
+        ValueError: If `arr` is an array of invalid dimensions, or if a box has a \
+            non-positive width or height.
+        TypeError: If `arr` is not of type {list, numpy.ndarray, RotatedBBox2DList}.
+    """
+
+    def __init__(self, arr):
+        if isinstance(arr, RotatedBBox2DList):
+            arr = arr.numpy()
+
+        elif isinstance(arr, list):
+            if not all(isinstance(x, RotatedBBox2D) for x in arr):
+                raise TypeError(
+                    "Element of input is of invalid type. Elements must be all RotatedBBox2D")
+            arr = np.asarray([x.numpy() for x in arr], dtype=float).reshape(-1, 5)
+
+        elif isinstance(arr, np.ndarray):
+            if arr.ndim == 1 and arr.shape[0] == 5:
+                arr = arr[np.newaxis, :]
+            if arr.ndim != 2 or arr.shape[1] != 5:
+                raise ValueError(
+                    "Invalid dimensions. Expected 2D array of size Nx5. "
+                    "Got {0}".format(arr.shape))
+
+        else:
+            raise TypeError(
+                "Invalid input type. Please use a list or a numpy array.")
+
+        arr = np.array(arr, dtype=float)
+        # same validation as the setters of RotatedBBox2D
+        if np.any(arr[:, 2] <= 0):
+            raise ValueError(
+                "Invalid width value. Width cannot be non-positive.")
+        if np.any(arr[:, 3] <= 0):
+            raise ValueError(
+                "Invalid height value. Height cannot be non-positive.")
+
+        self.bboxes = arr
+
+    def __eq__(self, x):
+        if not isinstance(x, RotatedBBox2DList):
+            return False
+        return np.array_equal(self.bboxes, x.bboxes)
+
+    def __len__(self):
+        return self.bboxes.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return RotatedBBox2D(self.bboxes[key])
+
+        return RotatedBBox2DList(self.bboxes[key])
+
+    def __repr__(self):
+        return "RotatedBBox2DList({0})".format(repr(self.bboxes))
+
+    @property
+    def shape(self):
+        """
+        :py:class:`tuple`: Shape (N, 5) of the array representation of the boxes.
+        """
+        return self.bboxes.shape
+
+    @property
+    def cx(self):
+        """
+        :py:class:`ndarray`: X coordinates of the centers.
+        """
+        return self.bboxes[:, 0]
+
+    @property
+    def cy(self):
+        """
+        :py:class:`ndarray`: Y coordinates of the centers.
+        """
+        return self.bboxes[:, 1]
+
+    @property
+    def w(self):
+        """
+        :py:class:`ndarray`: Widths of the boxes.
+        """
+        return self.bboxes[:, 2]
+
+    @property
+    def width(self):
+        """
+        :py:class:`ndarray`: Widths of the boxes.
+        """
+        return self.w
+
+    @property
+    def h(self):
+        """
+        :py:class:`ndarray`: Heights of the boxes.
+        """
+        return self.bboxes[:, 3]
+
+    @property
+    def height(self):
+        """
+        :py:class:`ndarray`: Heights of the boxes.
+        """
+        return self.h
+
+    @property
+    def theta(self):
+        """
+        :py:class:`ndarray`: Counterclockwise rotations of the boxes in radians.
+        """
+        return self.bboxes[:, 4]
+
+    @property
+    def area(self):
+        """
+        :py:class:`ndarray`: Areas of the boxes.
+        """
+        return self.w * self.h
+
+    @property
+    def p(self):
+        """
+        Attribute to access the corners of all the boxes, in the same order as \
+            :py:attr:`RotatedBBox2D.p`.
+
+        Returns:
+            :py:class:`ndarray` of float: Array of shape (N, 4, 2).
+        """
+        return rotated_box_corners(self.bboxes[:, 0:2], self.bboxes[:, 2:4], self.bboxes[:, 4])
+
+    def aabb(self):
+        """
+        Return the axis-aligned bounding boxes of the boxes as a (N, 4) array of \
+            (x1, y1, x2, y2) rows.
+        """
+        p = self.p
+        return np.hstack((p.min(axis=1), p.max(axis=1)))
+
+    def tolist(self):
+        """
+        Return the boxes as a `list` of :py:class:`RotatedBBox2D`.
+        """
+        return [self[i] for i in range(len(self))]
+
+    def copy(self):
+        """
+        Return a deep copy of this bounding box list.
+        """
+        return deepcopy(self)
+
+    def numpy(self):
+        """
+        Return np.ndarray of shape (N, 5) where each row is (cx, cy, w, h, theta).
+        """
+        return self.bboxes.copy()
@@ -14,16 +14,181 @@ import numpy as np
 from bbox.box_modes import XYXY
 
 from .bbox2d_list import BBox2DList
+from .metrics import accumulation_dtype, multi_jaccard_index_rotated_2d
+from .rotated_bbox2d_list import RotatedBBox2DList
 
 
-def nms(bbl, scores, thresh):
+def _overlap(box, area, boxes, areas):
+    """
+    Compute the overlap (IoU) of `box` with each of `boxes`, given their areas.
+    """
+    xx1 = np.maximum(box[0], boxes[:, 0])
+    yy1 = np.maximum(box[1], boxes[:, 1])
+    xx2 = np.minimum(box[2], boxes[:, 2])
+    yy2 = np.minimum(box[3], boxes[:, 3])
+
+    w = np.maximum(0.0, xx2 - xx1 + 1)
+    h = np.maximum(0.0, yy2 - yy1 + 1)
+    inter = w * h
+
+    return inter / (area + areas - inter)
+
+
+def _nms_greedy(boxes, areas, order, thresh, groups=None, max_output=None):
+    """
+    Classic greedy NMS, comparing every kept box to all the remaining boxes.
+    If `groups` is given, boxes only suppress boxes of the same group.
+    """
+    keep = []
+    while order.size > 0 and len(keep) != max_output:
+        i = order[0]
+        keep.append(int(i))
+
+        overlap = _overlap(boxes[i], areas[i], boxes[order[1:]], areas[order[1:]])
+
+        if groups is None:
+            idx = np.where(overlap <= thresh)[0]
+        else:
+            idx = np.where((overlap <= thresh) | (groups[order[1:]] != groups[i]))[0]
+        order = order[idx + 1]
+
+    return keep
+
+
+def _nms_sweep(boxes, areas, order, thresh, groups=None, max_output=None):
+    """
+    Greedy NMS which only compares a kept box to the boxes whose x extents overlap it,
+    found by binary search over the boxes sorted by x1 (within each group if `groups` is given).
+    Gives the same result as :py:func:`_nms_greedy`.
+    """
+    if thresh < 0:
+        # even non-overlapping boxes are suppressed, so every pair has to be compared
+        return _nms_greedy(boxes, areas, order, thresh, groups=groups, max_output=max_output)
+
+    n = boxes.shape[0]
+    x1, x2 = boxes[:, 0], boxes[:, 2]
+    if groups is None:
+        groups = np.zeros(n, dtype=np.intp)
+
+    # position of each box in `order`, boxes filtered out of `order` are never candidates
+    rank = np.full(n, -1, dtype=np.intp)
+    rank[order] = np.arange(order.shape[0])
+
+    # segmented sort: boxes sorted by x1 within contiguous runs of each group
+    by_x1 = np.lexsort((x1, groups))
+    sorted_x1 = x1[by_x1]
+    sorted_groups = groups[by_x1]
+    group_start = np.searchsorted(sorted_groups, groups, side='left')
+    group_end = np.searchsorted(sorted_groups, groups, side='right')
+
+    # the widest box bounds how far to the left of a box an overlapping box can start
+    span = np.max(x2 - x1)
+
+    # boxes without a positive area can have a nan or inf overlap even with boxes
+    # they do not intersect, so they are compared against every kept box.
+    degenerate = np.flatnonzero(~(areas > 0))
+
+    suppressed = np.zeros(n, dtype=bool)
+    keep = []
+    for i in order:
+        if len(keep) == max_output:
+            break
+        if suppressed[i]:
+            continue
+        keep.append(int(i))
+
+        if areas[i] > 0:
+            # overlapping boxes satisfy x1[i] - span - 1 < x1 < x2[i] + 1,
+            # we search with an extra margin to be safe from rounding
+            start, end = group_start[i], group_end[i]
+            segment = sorted_x1[start:end]
+            lo = start + np.searchsorted(segment, x1[i] - span - 2, side='left')
+            hi = start + np.searchsorted(segment, x2[i] + 2, side='right')
+            candidates = np.concatenate((by_x1[lo:hi], degenerate))
+        else:
+            candidates = order
+
+        candidates = candidates[(rank[candidates] > rank[i]) & ~suppressed[candidates] &
+                                (groups[candidates] == groups[i])]
+        overlap = _overlap(boxes[i], areas[i], boxes[candidates], areas[candidates])
+        suppressed[candidates[~(overlap <= thresh)]] = True
+
+    return keep
+
+
+def _candidates(scores, score_thresh=None, pre_nms_topk=None):
+    """
+    Indices of the boxes to run NMS on, in decreasing order of score.
+    """
+    if score_thresh is None and (pre_nms_topk is None or pre_nms_topk >= scores.shape[0]):
+        return scores.argsort()[::-1]
+
+    if score_thresh is None:
+        idx = np.arange(scores.shape[0])
+    else:
+        idx = np.flatnonzero(scores > score_thresh)
+
+    if pre_nms_topk is not None and pre_nms_topk < idx.shape[0]:
+        # select the top-k in linear time, only these need to be sorted
+        top = np.argpartition(-scores[idx], max(pre_nms_topk - 1, 0))[:pre_nms_topk]
+        idx = idx[top]
+
+    return idx[scores[idx].argsort()[::-1]]
+
+
+def _nms(bbl, scores, thresh, dtype, method, groups=None,
+         pre_nms_topk=None, score_thresh=None, max_output=None):
+    if not isinstance(scores, (list, np.ndarray)):
+        raise ValueError("`scores` should be a list of numpy array")
+
+    # convert to numpy array if it is a list
+    scores = np.asarray(scores)
+
+    if not scores.shape[0] == bbl.shape[0]:
+        raise ValueError(
+            "box list and scores should have the same number of elements.")
+
+    boxes = bbl.numpy(mode=XYXY, dtype=accumulation_dtype(bbl.bboxes, dtype=dtype))
+
+    areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+    order = _candidates(scores, score_thresh=score_thresh, pre_nms_topk=pre_nms_topk)
+
+    if method == "greedy":
+        keep = _nms_greedy(boxes, areas, order, thresh, groups=groups, max_output=max_output)
+    elif method == "sweep":
+        keep = _nms_sweep(boxes, areas, order, thresh, groups=groups, max_output=max_output)
+    else:
+        raise ValueError("Invalid NMS method {0}".format(method))
+
+    return np.array(keep).astype(int)
+
+
+def nms(bbl, scores, thresh, dtype=None, method="greedy",
+        pre_nms_topk=None, score_thresh=None, max_output=None):
     """
     Perform fast non-maximum suppression on a set of bounding boxes \
         given their associated confidences.
 
+    Two methods are available, which return exactly the same boxes:
+
+    - "greedy" compares every kept box against all the remaining boxes.
+    - "sweep" sorts the boxes by their x coordinate and only compares a kept box \
+        against the boxes whose x extents overlap it. This is much faster for large \
+        numbers of boxes spread over the image.
+
     Args:
         bbl (:py:class:`BBox2DList`): List of 2D bounding boxes.
         scores (:py:class:`list` or :py:class:`ndarray`): Scores for each bounding box.
+        thresh (:py:class:`float`): Boxes overlapping a kept box by more than this IoU \
+            are suppressed.
+        dtype (data-type, optional): Type in which overlaps are computed. \
+            Defaults to :py:func:`~bbox.metrics.accumulation_dtype` of the boxes.
+        method (:py:class:`str`): NMS algorithm, either "greedy" or "sweep" (default is "greedy").
+        pre_nms_topk (:py:class:`int`, optional): Only the `pre_nms_topk` highest scoring \
+            boxes are considered.
+        score_thresh (:py:class:`float`, optional): Only boxes with a score greater than \
+            this are considered.
+        max_output (:py:class:`int`, optional): Stop once this many boxes are kept.
 
     Raises:
         ValueError: If arguments are of incorrect type or size.
@@ -31,39 +196,272 @@ def nms(bbl, scores, thresh):
     if bbl.shape[0] == 0:
         return np.array([]).astype(int)
 
+    return _nms(bbl, scores, thresh, dtype, method, pre_nms_topk=pre_nms_topk,
+                score_thresh=score_thresh, max_output=max_output)
+
+
+def batched_nms(bbl, scores, group_ids, thresh, dtype=None, method="sweep",
+                pre_nms_topk=None, score_thresh=None, max_output=None):
+    """
+    Perform non-maximum suppression independently for several groups of bounding boxes \
+        (e.g. one group per image and class) in a single call.
+
+    Boxes only suppress boxes of the same group, so the result is the same as running
+    :py:func:`nms` on each group separately, but without the overhead of one call per group.
+    With the "sweep" method, the boxes are sorted by group and x coordinate at once and
+    each kept box is only compared to the overlapping boxes of its own group.
+
+    Args:
+        bbl (:py:class:`BBox2DList`): List of 2D bounding boxes of all groups.
+        scores (:py:class:`list` or :py:class:`ndarray`): Scores for each bounding box.
+        group_ids (:py:class:`list` or :py:class:`ndarray`): Group label of each bounding box.
+        thresh (:py:class:`float`): Boxes overlapping a kept box by more than this IoU \
+            are suppressed.
+        dtype (data-type, optional): Type in which overlaps are computed. \
+            Defaults to :py:func:`~bbox.metrics.accumulation_dtype` of the boxes.
+        method (:py:class:`str`): NMS algorithm, either "greedy" or "sweep" (default is "sweep").
+        pre_nms_topk (:py:class:`int`, optional): Only the `pre_nms_topk` highest scoring \
+            boxes over all groups are considered.
+        score_thresh (:py:class:`float`, optional): Only boxes with a score greater than \
+            this are considered.
+        max_output (:py:class:`int`, optional): Stop once this many boxes are kept over all groups.
+
+    Returns:
+        :py:class:`ndarray`: Indices of the kept boxes in `bbl`, in decreasing order of score.
+
+    Raises:
+        ValueError: If arguments are of incorrect type or size.
+    """
+    if bbl.shape[0] == 0:
+        return np.array([]).astype(int)
+
+    group_ids = np.asarray(group_ids)
+    if not group_ids.shape == (bbl.shape[0],):
+        raise ValueError(
+            "box list and group ids should have the same number of elements.")
+
+    # map arbitrary labels to contiguous integers
+    _, groups = np.unique(group_ids, return_inverse=True)
+
+    return _nms(bbl, scores, thresh, dtype, method, groups=groups.reshape(-1),
+                pre_nms_topk=pre_nms_topk, score_thresh=score_thresh, max_output=max_output)
+
+
+def rotated_nms(bbl, scores, thresh, pre_nms_topk=None, score_thresh=None, max_output=None):
+    """
+    Perform non-maximum suppression on a set of rotated 2D bounding boxes \
+        given their associated confidences.
+
+    The overlaps are only computed for the pairs of boxes whose axis-aligned bounding boxes
+    overlap, with all the candidate pairs clipped at once, and the greedy suppression then
+    walks over this sparse overlap graph.
+
+    Args:
+        bbl (:py:class:`RotatedBBox2DList`): List of rotated 2D bounding boxes.
+        scores (:py:class:`list` or :py:class:`ndarray`): Scores for each bounding box.
+        thresh (:py:class:`float`): Boxes overlapping a kept box by more than this IoU \
+            are suppressed.
+        pre_nms_topk (:py:class:`int`, optional): Only the `pre_nms_topk` highest scoring \
+            boxes are considered.
+        score_thresh (:py:class:`float`, optional): Only boxes with a score greater than \
+            this are considered.
+        max_output (:py:class:`int`, optional): Stop once this many boxes are kept.
+
+    Returns:
+        :py:class:`ndarray`: Indices of the kept boxes in `bbl`, in decreasing order of score.
+
+    Raises:
+        ValueError: If arguments are of incorrect type or size.
+    """
+    if not isinstance(bbl, RotatedBBox2DList):
+        bbl = RotatedBBox2DList(bbl)
+
+    if not isinstance(scores, (list, np.ndarray)):
+        raise ValueError("`scores` should be a list of numpy array")
+    scores = np.asarray(scores)
+
+    if not scores.shape[0] == bbl.shape[0]:
+        raise ValueError(
+            "box list and scores should have the same number of elements.")
+
+    order = _candidates(scores, score_thresh=score_thresh, pre_nms_topk=pre_nms_topk)
+    if order.size == 0 or max_output == 0:
+        return np.array([]).astype(int)
+    if thresh < 0:
+        # every box overlaps every other box by more than `thresh`
+        return order[:1].astype(int)
+
+    # overlaps in rank space, only the lower ranked box of a pair can be suppressed
+    ranked = bbl[order]
+    rows, cols, iou = multi_jaccard_index_rotated_2d(ranked, ranked, sparse=True, format=None)
+    mask = (rows < cols) & (iou > thresh)
+    rows, cols = rows[mask], cols[mask]
+
+    idx = np.argsort(rows, kind='stable')
+    rows, cols = rows[idx], cols[idx]
+    starts = np.searchsorted(rows, np.arange(order.shape[0] + 1))
+
+    suppressed = np.zeros(order.shape[0], dtype=bool)
+    keep = []
+    for i in range(order.shape[0]):
+        if suppressed[i]:
+            continue
+        keep.append(int(order[i]))
+        if len(keep) == max_output:
+            break
+        suppressed[cols[starts[i]:starts[i + 1]]] = True
+
+    return np.array(keep).astype(int)
+
+
+def soft_nms(bbl, scores, iou_thresh=0.3, sigma=0.5, score_thresh=0.001, method="linear",
+             dtype=None):
+    """
+    Perform Soft-NMS on a set of bounding boxes given their associated confidences.
+
+    Instead of discarding the boxes overlapping a selected box, their scores are decayed:
+
+    - "linear": scores of boxes with an IoU `o > iou_thresh` are multiplied by `1 - o`.
+    - "gaussian": scores of all boxes are multiplied by `exp(-o**2 / sigma)`.
+
+    Boxes whose score falls to `score_thresh` or below are discarded.
+
+    Reference: Bodla et al., "Soft-NMS -- Improving Object Detection With One Line of Code".
+
+    Args:
+        bbl (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        scores (:py:class:`list` or :py:class:`ndarray`): Scores for each bounding box.
+        iou_thresh (:py:class:`float`): IoU above which scores are decayed with the linear method.
+        sigma (:py:class:`float`): Spread of the gaussian decay.
+        score_thresh (:py:class:`float`): Boxes with a (decayed) score below this are discarded.
+        method (:py:class:`str`): Decay function, either "linear" or "gaussian" \
+            (default is "linear").
+        dtype (data-type, optional): Type in which overlaps are computed. \
+            Defaults to :py:func:`~bbox.metrics.accumulation_dtype` of the boxes.
+
+    Returns:
+        tuple: Indices of the kept boxes in order of selection, and their decayed scores.
+
+    Raises:
+        ValueError: If arguments are of incorrect type or size.
+    """
+    if method not in ("linear", "gaussian"):
+        raise ValueError("Invalid Soft-NMS method {0}".format(method))
+
     if not isinstance(scores, (list, np.ndarray)):
         raise ValueError("`scores` should be a list of numpy array")
 
-    # convert to numpy array if it is a list
-    scores = np.asarray(scores)
+    scores = np.array(scores, dtype=float)
 
     if not scores.shape[0] == bbl.shape[0]:
         raise ValueError(
             "box list and scores should have the same number of elements.")
 
-    areas = bbl.w * bbl.h
-    order = scores.argsort()[::-1]
+    boxes = bbl.numpy(mode=XYXY, dtype=accumulation_dtype(bbl.bboxes, dtype=dtype))
+    areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+
+    remaining = np.flatnonzero(scores > score_thresh)
 
     keep = []
-    while order.size > 0:
-        i = order[0]
+    while remaining.size > 0:
+        best = np.argmax(scores[remaining])
+        i = remaining[best]
         keep.append(int(i))
+        remaining = np.delete(remaining, best)
 
-        xx1 = np.maximum(bbl.x1[i], bbl.x1[order[1:]])
-        yy1 = np.maximum(bbl.y1[i], bbl.y1[order[1:]])
-        xx2 = np.minimum(bbl.x2[i], bbl.x2[order[1:]])
-        yy2 = np.minimum(bbl.y2[i], bbl.y2[order[1:]])
+        overlap = _overlap(boxes[i], areas[i], boxes[remaining], areas[remaining])
 
-        w = np.maximum(0.0, xx2 - xx1 + 1)
-        h = np.maximum(0.0, yy2 - yy1 + 1)
-        inter = w * h
+        if method == "linear":
+            decay = np.where(overlap > iou_thresh, 1 - overlap, 1)
+        else:
+            decay = np.exp(-(overlap * overlap) / sigma)
 
-        overlap = inter / (areas[i] + areas[order[1:]] - inter)
+        scores[remaining] *= decay
+        remaining = remaining[scores[remaining] > score_thresh]
 
-        idx = np.where(overlap <= thresh)[0]
-        order = order[idx + 1]
+    keep = np.array(keep).astype(int)
+    return keep, scores[keep]
 
-    return np.array(keep).astype(int)
+
+def weighted_box_fusion(bbl, scores, iou_thresh=0.55, score_thresh=0.0, n_models=None,
+                        dtype=None):
+    """
+    Perform Weighted Box Fusion (WBF) on a set of bounding boxes given their associated \
+        confidences, e.g. the concatenated predictions of an ensemble of models.
+
+    Boxes are processed in decreasing order of score. Each box is added to the cluster
+    whose fused box it overlaps most with an IoU greater than `iou_thresh`, or starts a new
+    cluster. The fused box of a cluster is the average of its boxes weighted by their scores,
+    and its score is the average score of the cluster.
+
+    Reference: Solovyev et al., "Weighted boxes fusion: Ensembling boxes from different \
+        object detection models".
+
+    Args:
+        bbl (:py:class:`BBox2DList`): List of 2D bounding boxes.
+        scores (:py:class:`list` or :py:class:`ndarray`): Scores for each bounding box.
+        iou_thresh (:py:class:`float`): IoU with a fused box above which a box joins its cluster.
+        score_thresh (:py:class:`float`): Boxes with a score not greater than this are ignored.
+        n_models (:py:class:`int`, optional): Number of models in the ensemble. If given, \
+            the score of a cluster with `n` boxes is scaled by `min(n, n_models) / n_models`.
+        dtype (data-type, optional): Type in which overlaps and fused boxes are computed. \
+            Defaults to :py:func:`~bbox.metrics.accumulation_dtype` of the boxes.
+
+    Returns:
+        tuple: The fused boxes as a :py:class:`BBox2DList` stored as `dtype`, so that \
+            the averaged coordinates of integer boxes are not truncated, and their scores, \
+            in decreasing order of score.
+
+    Raises:
+        ValueError: If arguments are of incorrect type or size.
+    """
+    if not isinstance(scores, (list, np.ndarray)):
+        raise ValueError("`scores` should be a list of numpy array")
+
+    scores = np.asarray(scores, dtype=float)
+
+    if not scores.shape[0] == bbl.shape[0]:
+        raise ValueError(
+            "box list and scores should have the same number of elements.")
+
+    dtype = accumulation_dtype(bbl.bboxes, dtype=dtype)
+    boxes = bbl.numpy(mode=XYXY, dtype=dtype)
+    areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+
+    order = np.argsort(-scores, kind='stable')
+    order = order[scores[order] > score_thresh]
+
+    # running sums of each cluster, a cluster is created for every box in the worst case
+    n = order.shape[0]
+    fused = np.empty((n, 4), dtype=dtype)
+    fused_areas = np.empty(n, dtype=dtype)
+    weighted_sum = np.zeros((n, 4), dtype=dtype)
+    score_sum = np.zeros(n)
+    count = np.zeros(n, dtype=int)
+
+    n_clusters = 0
+    for i in order:
+        overlap = _overlap(boxes[i], areas[i], fused[:n_clusters], fused_areas[:n_clusters])
+
+        if n_clusters > 0 and np.max(overlap) > iou_thresh:
+            c = np.argmax(overlap)
+        else:
+            c = n_clusters
+            n_clusters += 1
+
+        weighted_sum[c] += scores[i] * boxes[i]
+        score_sum[c] += scores[i]
+        count[c] += 1
+
+        fused[c] = weighted_sum[c] / score_sum[c]
+        fused_areas[c] = (fused[c, 2] - fused[c, 0] + 1) * (fused[c, 3] - fused[c, 1] + 1)
+
+    fused_scores = score_sum[:n_clusters] / count[:n_clusters]
+    if n_models is not None:
+        fused_scores *= np.minimum(count[:n_clusters], n_models) / n_models
+
+    order = np.argsort(-fused_scores, kind='stable')
+    return BBox2DList(fused[order], mode=XYXY, dtype=dtype), fused_scores[order]
 
 
 def aspect_ratio(bbox, ratios):
@@ -0,0 +1,129 @@
+"""Unit tests for bbox2d_index"""
+
+import numpy as np
+import pytest
+
+from bbox import BBox2D, BBox2DIndex, BBox2DList
+from bbox.box_modes import XYXY
+from bbox.metrics import multi_jaccard_index_2d
+
+
+def random_boxes(n, rng):
+    boxes = np.hstack((rng.uniform(0, 500, size=(n, 2)), rng.uniform(1, 60, size=(n, 2))))
+    return BBox2DList(boxes)
+
+
+def brute_force_pairs(queries, bboxes, thresh=0.0, alive=None):
+    iou = multi_jaccard_index_2d(queries, BBox2DList(bboxes, mode=XYXY))
+    if alive is not None:
+        iou[:, ~alive] = 0
+    return np.nonzero(iou > thresh), iou
+
+
+class TestBBox2DIndex(object):
+    @classmethod
+    def setup_class(cls):
+        rng = np.random.default_rng(0)
+        cls.bbl = random_boxes(1000, rng)
+        cls.queries = random_boxes(200, rng)
+        cls.points = rng.uniform(-10, 560, size=(500, 2))
+
+    def test_query_overlaps(self):
+        index = BBox2DIndex(self.bbl)
+        assert len(index) == len(self.bbl)
+
+        q, b = index.query_overlaps(self.queries)
+        (rows, cols), _ = brute_force_pairs(self.queries, self.bbl.bboxes)
+        assert len(q) > 0
+        assert np.array_equal(q, rows)
+        assert np.array_equal(b, cols)
+
+    def test_cell_size(self):
+        (rows, cols), _ = brute_force_pairs(self.queries, self.bbl.bboxes)
+        for cell_size in (1, 17, (200, 5), 1000):
+            index = BBox2DIndex(self.bbl, cell_size=cell_size)
+            q, b = index.query_overlaps(self.queries)
+            assert np.array_equal(q, rows)
+            assert np.array_equal(b, cols)
+
+        with pytest.raises(ValueError):
+            BBox2DIndex(self.bbl, cell_size=0)
+
+    def test_cell_size_kept_on_rebuild(self):
+        rng = np.random.default_rng(2)
+        index = BBox2DIndex(self.bbl, cell_size=(200, 5))
+
+        # many insertions trigger an automatic rebuild
+        index.insert(random_boxes(2000, rng))
+        assert np.array_equal(index.cell_size, [200, 5])
+        index.rebuild()
+        assert np.array_equal(index.cell_size, [200, 5])
+
+        index.rebuild(cell_size=10)
+        index.rebuild(self.bbl)
+        assert np.array_equal(index.cell_size, [10, 10])
+
+    def test_query_point(self):
+        index = BBox2DIndex(self.bbl)
+        p, b = index.query_point(self.points)
+
+        expected = np.array([[BBox2D(box).contains(point) for box in self.bbl.numpy()]
+                             for point in self.points])
+        rows, cols = np.nonzero(expected)
+        assert np.array_equal(p, rows)
+        assert np.array_equal(b, cols)
+
+    def test_query_iou_above(self):
+        index = BBox2DIndex(self.bbl)
+        q, b, iou = index.query_iou_above(self.queries, 0.2)
+
+        (rows, cols), expected = brute_force_pairs(self.queries, self.bbl.bboxes, thresh=0.2)
+        assert np.array_equal(q, rows)
+        assert np.array_equal(b, cols)
+        assert np.allclose(iou, expected[rows, cols])
+
+    def test_incremental_update(self):
+        rng = np.random.default_rng(1)
+        index = BBox2DIndex(self.bbl)
+
+        ids = index.insert(random_boxes(50, rng))
+        assert np.array_equal(ids, np.arange(1000, 1050))
+        index.update([0, 3, 1020], random_boxes(3, rng))
+        index.update(5, BBox2D([2000, 2000, 10, 10]))
+        index.remove([1, 2, 1001])
+        assert len(index) == 1047
+
+        alive = np.ones(1050, dtype=bool)
+        alive[[1, 2, 1001]] = False
+        (rows, cols), _ = brute_force_pairs(self.queries, index.bboxes, alive=alive)
+        q, b = index.query_overlaps(self.queries)
+        assert np.array_equal(q, rows)
+        assert np.array_equal(b, cols)
+
+        # many updates trigger a rebuild, which gives the same results
+        index.update(np.arange(100, 1000), random_boxes(900, rng))
+        (rows, cols), _ = brute_force_pairs(self.queries, index.bboxes, alive=alive)
+        q, b = index.query_overlaps(self.queries)
+        assert np.array_equal(q, rows)
+        assert np.array_equal(b, cols)
+
+        index.rebuild()
+        q, b = index.query_overlaps(self.queries)
+        assert np.array_equal(q, rows)
+        assert np.array_equal(b, cols)
+
+        with pytest.raises(IndexError):
+            index.update(1, BBox2D([0, 0, 10, 10]))
+        with pytest.raises(ValueError):
+            index.update([3, 4], BBox2D([0, 0, 10, 10]))
+
+    def test_rebuild_new_list(self):
+        index = BBox2DIndex(BBox2DList([]))
+        assert len(index) == 0
+        q, b = index.query_overlaps(self.queries)
+        assert q.shape == b.shape == (0,)
+
+        index.rebuild(self.bbl)
+        assert len(index) == len(self.bbl)
+        q, _ = index.query_overlaps(self.queries)
+        assert len(q) > 0
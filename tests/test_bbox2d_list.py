@@ -47,6 +47,27 @@ class TestBBox2DList(object):
         with pytest.raises(ValueError):
             BBox2DList(np.random.rand(10, 1, 4))
 
+    def test_init_matches_bbox2d(self):
+        arrays = [np.random.randint(0, 1024, size=(50, 4)),
+                  np.random.rand(50, 4) * 1024,
+                  np.random.rand(50, 4).astype(np.float32)]
+        for arr in arrays:
+            for mode in (XYWH, XYXY):
+                expected = np.asarray(
+                    [BBox2D(x, mode=mode).numpy(mode=XYXY) for x in arr])
+                assert np.array_equal(
+                    BBox2DList(arr, mode=mode).bboxes, expected)
+                assert np.array_equal(
+                    BBox2DList(list(arr), mode=mode).bboxes, expected)
+
+    def test_init_invalid_mode(self):
+        with pytest.raises(ValueError):
+            BBox2DList(np.ones((3, 4)), mode=2)
+
+    def test_init_invalid_element_length(self):
+        with pytest.raises(ValueError):
+            BBox2DList([[1, 2, 3, 4], [1, 2, 3]])
+
     def test_box_shapes(self):
         n = 10
         l = [BBox2D(np.random.randint(0, 1024, size=4)) for _ in range(n)]
@@ -285,3 +306,97 @@ class TestBBox2DList(object):
         bbl = BBox2DList([[0, 0, 1, 1], [5, 5, 5, 5]])
         assert repr(
             bbl) == "array([[0., 0., 1., 1.],\n       [5., 5., 5., 5.]])"
+
+    def test_from_buffer_view(self):
+        arr = np.random.rand(10, 4).astype(np.float32)
+        bbl = BBox2DList.from_buffer(arr)
+        assert bbl.bboxes.dtype == np.float32
+        assert np.shares_memory(bbl.bboxes, arr)
+
+        # modifications are visible in both directions
+        arr[0, 0] = -1
+        assert bbl.x1[0] == -1
+        bbl.x1 = np.zeros(10)
+        assert np.all(arr[:, 0] == 0)
+
+    def test_from_buffer_memoryview(self):
+        arr = np.arange(40, dtype=np.float64)
+        bbl = BBox2DList.from_buffer(memoryview(arr))
+        assert bbl.shape == (10, 4)
+        assert np.shares_memory(bbl.bboxes, arr)
+        assert np.array_equal(bbl.bboxes, arr.reshape(10, 4))
+
+    def test_from_buffer_readonly(self):
+        arr = np.random.rand(10, 4)
+        bbl = BBox2DList.from_buffer(arr, readonly=True)
+        with pytest.raises(ValueError):
+            bbl.x1 = np.zeros(10)
+        # the caller's array is still writeable
+        arr[0, 0] = 5
+        assert bbl.x1[0] == 5
+
+    def test_from_buffer_copy(self):
+        arr = np.random.randint(0, 100, size=(10, 4)).astype(float)
+        bbl = BBox2DList.from_buffer(arr, mode=XYWH, copy=True)
+        assert not np.shares_memory(bbl.bboxes, arr)
+        assert bbl == BBox2DList(arr, mode=XYWH)
+
+    def test_from_buffer_invalid(self):
+        with pytest.raises(ValueError):
+            BBox2DList.from_buffer(np.random.rand(10, 4), mode=XYWH)
+        with pytest.raises(ValueError):
+            BBox2DList.from_buffer(np.random.rand(10, 3))
+        with pytest.raises(ValueError):
+            BBox2DList.from_buffer(np.random.rand(8, 4)[::2].ravel()[::3])
+
+    def test_dtype(self):
+        arr = np.random.randint(0, 1024, size=(10, 4))
+        for dtype in (np.float32, np.float16, np.int32):
+            bbl = BBox2DList(arr, dtype=dtype)
+            assert bbl.dtype == dtype
+            assert bbl.numpy().dtype == dtype
+            assert bbl.numpy(mode=XYXY, dtype=np.float64).dtype == np.float64
+            assert BBox2DList(bbl).dtype == dtype
+            assert bbl.append([1, 2, 3, 4]).dtype == dtype
+            assert bbl.insert([1, 2, 3, 4], 0).dtype == dtype
+            assert bbl.delete(0).dtype == dtype
+            assert bbl.mul(2).dtype == dtype
+            assert bbl.mul(2, dtype=np.float64).dtype == np.float64
+            assert bbl.mul(0.5).dtype == np.result_type(dtype, np.float16)
+            assert np.array_equal(bbl.numpy(dtype=np.float64),
+                                  BBox2DList(arr).numpy())
+
+    def test_mul_int_dtype(self):
+        bbl = BBox2DList([[0, 0, 5, 5]], mode=XYXY, dtype=np.int32)
+        assert np.array_equal(bbl.mul(0.5).numpy(mode=XYXY), [[0, 0, 2.5, 2.5]])
+
+    def test_default_dtype(self):
+        assert BBox2DList(np.ones((3, 4), dtype=np.float32)).dtype == np.float64
+        assert BBox2DList([]).dtype == np.float64
+
+    def test_contains_points(self):
+        boxes = [BBox2D(np.random.randint(0, 1024, size=4)) for _ in range(self.n)]
+        bbl = BBox2DList(boxes)
+        points = np.random.randint(0, 1500, size=(300, 2))
+        # points on the box boundaries
+        points[:self.n] = bbl.numpy(mode=XYXY)[:, 2:4]
+
+        expected = np.array([[box.contains(point) for point in points] for box in boxes])
+        inside = bbl.contains_points(points)
+        assert inside.shape == (self.n, 300)
+        assert np.array_equal(inside, expected)
+
+        for tile_size in (None, 1, 7, 64):
+            assert np.array_equal(bbl.contains_points(points, tile_size=tile_size),
+                                  expected)
+            rows, cols = bbl.contains_points(points, sparse=True, tile_size=tile_size)
+            assert np.array_equal(rows, np.nonzero(expected)[0])
+            assert np.array_equal(cols, np.nonzero(expected)[1])
+
+        assert bbl.contains_points([5, 5]).shape == (self.n, 1)
+
+    def test_contains_points_invalid(self):
+        with pytest.raises(ValueError):
+            self.bbl.contains_points(np.zeros((5, 3)))
+        rows, cols = BBox2DList([]).contains_points(np.zeros((5, 2)), sparse=True)
+        assert rows.shape == cols.shape == (0,)
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from bbox import BBox2D, BBox2DList, BBox2DListBuilder
+from bbox.box_modes import XYXY, XYWH
+
+
+class TestBBox2DListBuilder(object):
+    @classmethod
+    def setup_class(cls):
+        cls.boxes = np.random.randint(0, 1024, size=(100, 4))
+
+    def test_append(self):
+        builder = BBox2DListBuilder(capacity=1)
+        for x in self.boxes:
+            builder.append(x)
+
+        assert len(builder) == len(self.boxes)
+        assert builder.capacity == 128
+        assert builder.build() == BBox2DList(self.boxes)
+
+    def test_append_types(self):
+        builder = BBox2DListBuilder()
+        builder.append([3, 7, 10, 16], mode=XYXY)
+        builder.append((3, 7, 8, 10))
+        builder.append(BBox2D([3, 7, 8, 10]))
+        bbl = builder.build()
+        assert np.array_equal(bbl.bboxes, [[3, 7, 10, 16]] * 3)
+
+    def test_append_invalid(self):
+        builder = BBox2DListBuilder()
+        with pytest.raises(TypeError):
+            builder.append("3, 7, 10, 16")
+        with pytest.raises(ValueError):
+            builder.append((1, 2, 3))
+        with pytest.raises(ValueError):
+            builder.append(["abc", "7", 10, 16])
+
+    def test_extend(self):
+        builder = BBox2DListBuilder(capacity=0)
+        builder.extend(self.boxes[:50])
+        builder.extend(BBox2DList(self.boxes[50:]))
+        assert builder.build() == BBox2DList(self.boxes)
+
+    def test_insert(self):
+        builder = BBox2DListBuilder()
+        builder.extend(self.boxes)
+        builder.insert([1, 2, 3, 4], 10)
+        builder.insert([5, 6, 7, 8], -1)
+        bbl = BBox2DList(self.boxes).insert([1, 2, 3, 4], 10)
+        bbl = bbl.insert([5, 6, 7, 8], -1)
+        assert builder.build() == bbl
+
+    def test_build_no_copy(self):
+        builder = BBox2DListBuilder()
+        builder.extend(self.boxes)
+        bbl = builder.build()
+        assert np.shares_memory(bbl.bboxes, builder._buffer)
+
+        # further modifications of the builder do not change the built list
+        builder.insert([1, 2, 3, 4], 0)
+        builder.append([1, 2, 3, 4])
+        assert bbl == BBox2DList(self.boxes)
+        assert len(builder) == len(self.boxes) + 2
+
+        builder.clear()
+        builder.append([1, 2, 3, 4])
+        assert bbl == BBox2DList(self.boxes)
+        assert len(builder) == 1
+
+    def test_dtype(self):
+        builder = BBox2DListBuilder(dtype=np.float32)
+        builder.extend(self.boxes)
+        bbl = builder.build()
+        assert bbl.dtype == np.float32
+        assert bbl == BBox2DList(self.boxes, dtype=np.float32)
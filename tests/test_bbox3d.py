@@ -7,6 +7,7 @@ import pytest
 from PIL import Image, ImageDraw
 
 from bbox import BBox3D
+from bbox.bbox3d import box_corners
 from bbox.metrics import iou_3d, jaccard_index_3d
 
 
@@ -73,6 +74,59 @@ class TestBBox3d(unittest.TestCase):
 
         assert np.allclose(self.box.p, points)
 
+    def test_points_quaternion_rotate(self):
+        """Corners should match rotating each corner with the quaternion."""
+        for _ in range(10):
+            box = BBox3D(*np.random.rand(6) * 10, q=np.random.randn(4))
+            q = box._q.normalised
+            for i, sign in enumerate([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                                      [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]]):
+                x = np.array(sign) * np.array([box.l, box.w, box.h]) / 2
+                assert np.allclose(box.p[i], box.center + q.rotate(x))
+
+    def test_box_corners_batched(self):
+        boxes = [BBox3D(*np.random.rand(6) * 10, q=np.random.randn(4)) for _ in range(5)]
+        centers = np.array([b.center for b in boxes])
+        sizes = np.array([[b.l, b.w, b.h] for b in boxes])
+        rotations = np.array([b.rotation_matrix for b in boxes])
+
+        p = box_corners(centers, sizes, rotations)
+        assert p.shape == (5, 8, 3)
+        for i, b in enumerate(boxes):
+            assert np.allclose(p[i], b.p)
+
+    def test_corners_cache(self):
+        box = self.box.copy()
+        assert box.p is box.p
+        assert box.rotation_matrix is box.rotation_matrix
+        with pytest.raises(ValueError):
+            box.p[0, 0] = 0
+        with pytest.raises(ValueError):
+            box.center[0] = 5
+
+        # the box does not alias the array it was given
+        center = np.array([1.0, 2.0, 3.0])
+        box.center = center
+        center[0] = 5
+        assert box.cx == 1
+
+    def test_corners_cache_invalidation(self):
+        box = self.box.copy()
+        setters = [("cx", 1.0), ("cy", 2.0), ("cz", 3.0), ("l", 4.0), ("w", 5.0), ("h", 6.0),
+                   ("length", 1.5), ("width", 2.5), ("height", 3.5),
+                   ("center", np.array([7.0, 8.0, 9.0])),
+                   ("q", [0.7071067811865476, 0, 0, 0.7071067811865476])]
+        for attr, value in setters:
+            p = box.p
+            setattr(box, attr, value)
+            assert not np.allclose(box.p, p)
+
+            expected = BBox3D(*box.center, length=box.l, width=box.w, height=box.h, q=box.q)
+            assert np.allclose(box.p, expected.p)
+
+        assert np.array_equal(box.center, [7, 8, 9])
+        assert (box.cx, box.cy, box.cz) == (7, 8, 9)
+
     def test_center(self):
         center = np.array(
             [-49.19743041908411, 12.38666074615689, 0.782056864653507])
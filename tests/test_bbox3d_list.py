@@ -0,0 +1,95 @@
+"""Unit tests for bbox3d_list"""
+
+import numpy as np
+import pytest
+
+from bbox import BBox3D, BBox3DList
+
+
+class TestBBox3DList(object):
+    @classmethod
+    def setup_class(cls):
+        cls.n = 10
+        cls.l = [BBox3D(*np.random.rand(6) * 10, euler_angles=np.random.rand(3).tolist())
+                 for _ in range(cls.n)]
+        cls.bbl = BBox3DList(cls.l)
+
+    def test_null(self):
+        bbl = BBox3DList([])
+        assert len(bbl) == 0
+        assert bbl.shape == (0, 10)
+        assert bbl.p.shape == (0, 8, 3)
+
+    def test_len(self):
+        assert len(self.bbl) == self.n
+
+    def test_init(self):
+        assert BBox3DList(self.bbl) == self.bbl
+        assert BBox3DList(self.bbl.numpy()) == self.bbl
+        assert BBox3DList(self.bbl.numpy()[0]).shape == (1, 10)
+
+    def test_init_invalid(self):
+        with pytest.raises(TypeError):
+            BBox3DList("1, 2, 3")
+        with pytest.raises(TypeError):
+            BBox3DList([1, 2, 3])
+        with pytest.raises(ValueError):
+            BBox3DList(np.zeros((3, 9)))
+
+    def test_from_arrays(self):
+        bbl = BBox3DList.from_arrays(self.bbl.centers, self.bbl.sizes, self.bbl.quaternions)
+        assert bbl == self.bbl
+
+        bbl = BBox3DList.from_arrays(np.zeros((4, 3)), np.ones((4, 3)))
+        assert np.array_equal(bbl.q, np.tile([1, 0, 0, 0], (4, 1)))
+
+        with pytest.raises(ValueError):
+            BBox3DList.from_arrays(np.zeros((4, 3)), np.ones((3, 3)))
+
+    def test_attributes(self):
+        for i, box in enumerate(self.l):
+            assert self.bbl.cx[i] == box.cx
+            assert self.bbl.cy[i] == box.cy
+            assert self.bbl.cz[i] == box.cz
+            assert self.bbl.l[i] == box.l
+            assert self.bbl.w[i] == box.w
+            assert self.bbl.h[i] == box.h
+            assert np.array_equal(self.bbl.q[i], box.q)
+            assert np.isclose(self.bbl.volume[i], box.l * box.w * box.h)
+
+    def test_corners(self):
+        p = self.bbl.p
+        assert p.shape == (self.n, 8, 3)
+        for i, box in enumerate(self.l):
+            assert np.allclose(p[i], box.p)
+
+    def test_getitem(self):
+        box = self.bbl[3]
+        assert isinstance(box, BBox3D)
+        assert np.allclose(box.p, self.l[3].p)
+
+        bbl = self.bbl[2:5]
+        assert isinstance(bbl, BBox3DList)
+        assert len(bbl) == 3
+        assert np.array_equal(bbl.p, self.bbl.p[2:5])
+
+        assert len(self.bbl[self.bbl.cx > 5]) == np.sum(self.bbl.cx > 5)
+
+    def test_mul(self):
+        bbl = self.bbl * 2
+        assert np.allclose(bbl.p, self.bbl.p * 2)
+        bbl = 2 * self.bbl
+        assert np.allclose(bbl.p, self.bbl.p * 2)
+
+        with pytest.raises(ValueError):
+            self.bbl * "2"
+
+    def test_tolist(self):
+        boxes = self.bbl.tolist()
+        assert len(boxes) == self.n
+        assert BBox3DList(boxes) == self.bbl
+
+    def test_copy(self):
+        bbl = self.bbl.copy()
+        bbl.centers[0] = 0
+        assert bbl != self.bbl
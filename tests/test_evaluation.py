@@ -0,0 +1,299 @@
+"""Tests for evaluation."""
+
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+import pytest
+
+from bbox import BBox2DList, BBox3DList
+from bbox.evaluation import KITTI_RECALL_THRESHOLDS, evaluate_3d, evaluate_coco
+from bbox.metrics import multi_jaccard_index_3d
+
+
+def random_dataset(seed, n_images=30, n_classes=3):
+    rng = np.random.default_rng(seed)
+    gt_boxes, gt_labels, gt_crowd, dt_boxes, dt_scores, dt_labels = [], [], [], [], [], []
+    for _ in range(n_images):
+        n = rng.integers(0, 10)
+        gt = np.hstack((rng.integers(0, 400, (n, 2)), rng.integers(4, 150, (n, 2))))
+        labels = rng.integers(0, n_classes, n)
+
+        m = rng.integers(0, 20)
+        dt = np.hstack((rng.integers(0, 400, (m, 2)), rng.integers(4, 150, (m, 2))))
+        dt_label = rng.integers(0, n_classes, m)
+        if n > 0:
+            # most detections are close to a ground truth box
+            src = rng.integers(0, n, m)
+            close = rng.random(m) < 0.7
+            dt[close] = np.maximum(gt[src[close]] + rng.integers(-10, 10, (close.sum(), 4)),
+                                   [0, 0, 1, 1])
+            dt_label[close] = labels[src[close]]
+
+        gt_boxes.append(BBox2DList(gt))
+        gt_labels.append(labels)
+        gt_crowd.append(rng.random(n) < 0.1)
+        dt_boxes.append(BBox2DList(dt))
+        dt_scores.append(np.round(rng.random(m), 2))
+        dt_labels.append(dt_label)
+
+    return gt_boxes, gt_labels, gt_crowd, dt_boxes, dt_scores, dt_labels
+
+
+def test_perfect_detections():
+    gt = [BBox2DList(np.array([[0, 0, 50, 50], [100, 100, 20, 20]])),
+          BBox2DList(np.array([[10, 10, 200, 100]]))]
+    labels = [np.array([0, 1]), np.array([1])]
+    scores = [np.array([0.9, 0.8]), np.array([0.7])]
+
+    results = evaluate_coco(gt, labels, gt, scores, labels)
+    stats = results["stats"]
+    assert stats["AP"] == 1
+    assert stats["AP50"] == 1
+    assert stats["AR100"] == 1
+    # there are no medium boxes of class 1
+    assert np.isclose(stats["APm"], 1)
+    assert results["precision"].shape == (10, 101, 2, 4, 3)
+    assert np.all(results["precision"][:, :, 1, 2] == -1)
+
+
+def test_false_positive():
+    gt = [BBox2DList(np.array([[0, 0, 50, 50]]))]
+    dt = [BBox2DList(np.array([[0, 0, 50, 50], [200, 200, 50, 50]]))]
+    labels = [np.array([0])]
+
+    # a false positive ranked first halves the precision
+    results = evaluate_coco(gt, labels, dt, [np.array([0.5, 0.9])], [np.array([0, 0])])
+    assert np.allclose(results["stats"]["AP"], 0.5)
+    assert np.allclose(results["stats"]["AR1"], 0)
+    assert np.allclose(results["stats"]["AR10"], 1)
+
+    # ranked last it does not change the precision
+    results = evaluate_coco(gt, labels, dt, [np.array([0.9, 0.5])], [np.array([0, 0])])
+    assert np.allclose(results["stats"]["AP"], 1)
+
+
+def test_crowd_and_ignore():
+    gt = [BBox2DList(np.array([[0, 0, 50, 50], [100, 100, 300, 300]]))]
+    labels = [np.array([0, 0])]
+    # two detections inside the crowd region
+    dt = [BBox2DList(np.array([[0, 0, 50, 50], [110, 110, 50, 50], [200, 200, 50, 50]]))]
+    scores = [np.array([0.5, 0.9, 0.8])]
+    dt_labels = [np.array([0, 0, 0])]
+
+    results = evaluate_coco(gt, labels, dt, scores, dt_labels, gt_crowd=[[False, True]])
+    assert np.allclose(results["stats"]["AP"], 1)
+
+    results = evaluate_coco(gt, labels, dt, scores, dt_labels)
+    assert results["stats"]["AP"] < 0.5
+
+    results = evaluate_coco(gt, labels, dt, scores, dt_labels, gt_ignore=[[True, False]])
+    assert np.allclose(results["stats"]["AP"], 0)
+
+
+def test_invalid_inputs():
+    gt = [BBox2DList(np.array([[0, 0, 50, 50]]))]
+    with pytest.raises(ValueError):
+        evaluate_coco(gt, [np.array([0, 1])], gt, [np.array([0.5])], [np.array([0])])
+    with pytest.raises(ValueError):
+        evaluate_coco(gt, [np.array([0])], gt + gt, [np.array([0.5])], [np.array([0])])
+    with pytest.raises(ValueError):
+        evaluate_coco(gt, [np.array([0])], gt, [np.array([0.5])], [np.array([0])],
+                      gt_crowd=[[True, False]])
+
+
+def test_empty():
+    empty = [BBox2DList([])]
+    results = evaluate_coco(empty, [[]], empty, [[]], [[]])
+    assert results["stats"]["AP"] == -1
+
+
+def test_pycocotools():
+    """
+    Compare with the official implementation, using boxes of integer sizes so that
+    the continuous boxes of COCO have the same areas and IoUs.
+    """
+    pytest.importorskip("pycocotools")
+    from pycocotools.coco import COCO
+    from pycocotools.cocoeval import COCOeval
+
+    gt_boxes, gt_labels, gt_crowd, dt_boxes, dt_scores, dt_labels = random_dataset(0)
+
+    annotations, detections = [], []
+    for i in range(len(gt_boxes)):
+        for box, label, crowd in zip(gt_boxes[i].numpy(), gt_labels[i], gt_crowd[i]):
+            annotations.append({"id": len(annotations) + 1, "image_id": i,
+                                "category_id": int(label), "bbox": box.tolist(),
+                                "area": float(box[2] * box[3]), "iscrowd": int(crowd)})
+        for box, score, label in zip(dt_boxes[i].numpy(), dt_scores[i], dt_labels[i]):
+            detections.append({"image_id": i, "category_id": int(label),
+                               "bbox": box.tolist(), "score": float(score)})
+
+    with redirect_stdout(io.StringIO()):
+        coco = COCO()
+        coco.dataset = {"images": [{"id": i} for i in range(len(gt_boxes))],
+                        "annotations": annotations,
+                        "categories": [{"id": k} for k in range(3)]}
+        coco.createIndex()
+        coco_eval = COCOeval(coco, coco.loadRes(detections), "bbox")
+        coco_eval.evaluate()
+        coco_eval.accumulate()
+        coco_eval.summarize()
+
+    results = evaluate_coco(gt_boxes, gt_labels, dt_boxes, dt_scores, dt_labels,
+                            gt_crowd=gt_crowd)
+    assert np.allclose(results["precision"], coco_eval.eval["precision"])
+    assert np.allclose(results["recall"], coco_eval.eval["recall"])
+    assert np.allclose(list(results["stats"].values()), coco_eval.stats)
+
+
+def yaw_boxes(centers, sizes, yaw):
+    yaw = np.asarray(yaw, dtype=float)
+    q = np.stack((np.cos(yaw / 2), 0 * yaw, 0 * yaw, np.sin(yaw / 2)), axis=1)
+    return BBox3DList.from_arrays(centers, sizes, q)
+
+
+def random_dataset_3d(seed, n_frames=20):
+    rng = np.random.default_rng(seed)
+    names = np.array(["Car", "Pedestrian"])
+    gt_boxes, gt_labels, gt_ignore, dt_boxes, dt_scores, dt_labels = [], [], [], [], [], []
+    for _ in range(n_frames):
+        n, m = rng.integers(0, 8), rng.integers(0, 12)
+        centers = np.c_[rng.uniform(0, 30, (n, 2)), rng.uniform(-1, 1, n)]
+        sizes = rng.uniform(1, 4, (n, 3))
+        yaw = rng.uniform(-np.pi, np.pi, n)
+        labels = rng.choice(names, n)
+
+        src = rng.integers(0, max(n, 1), m)
+        if n > 0:
+            dt = yaw_boxes(centers[src] + rng.normal(0, 0.2, (m, 3)),
+                           sizes[src] * rng.uniform(0.9, 1.1, (m, 3)),
+                           yaw[src] + rng.normal(0, 0.1, m))
+            dt_label = labels[src]
+        else:
+            dt = yaw_boxes(np.zeros((m, 3)), np.ones((m, 3)), np.zeros(m))
+            dt_label = rng.choice(names, m)
+
+        gt_boxes.append(yaw_boxes(centers, sizes, yaw))
+        gt_labels.append(labels)
+        gt_ignore.append(rng.random(n) < 0.2)
+        dt_boxes.append(dt)
+        dt_scores.append(np.round(rng.random(m), 2))
+        dt_labels.append(dt_label)
+
+    return gt_boxes, gt_labels, dt_boxes, dt_scores, dt_labels, gt_ignore
+
+
+def reference_ap_3d(gt_boxes, gt_labels, dt_boxes, dt_scores, dt_labels, gt_ignore,
+                    label, thresh, recall_thresholds):
+    """
+    Average precision of one class, matching every frame separately with the IoUs of
+    `multi_jaccard_index_3d` for centered boxes.
+    """
+    records, n_gt = [], 0
+    for f, (gt, dt) in enumerate(zip(gt_boxes, dt_boxes)):
+        ious = multi_jaccard_index_3d(dt, gt, centered=True)
+        gi = np.flatnonzero(gt_labels[f] == label)
+        di = np.flatnonzero(dt_labels[f] == label)
+        di = di[np.lexsort((di, -dt_scores[f][di]))]
+        n_gt += np.sum(~gt_ignore[f][gi])
+        used = np.zeros(len(gi), dtype=bool)
+        for rank, d in enumerate(di):
+            best, best_j, best_ignore = -1, -1, True
+            for j, g in enumerate(gi):
+                iou = ious[d, g]
+                if used[j] or iou < thresh:
+                    continue
+                ignore = gt_ignore[f][g]
+                if (best_ignore and not ignore) or (ignore == best_ignore and iou >= best):
+                    best, best_j, best_ignore = iou, j, ignore
+            if best_j >= 0:
+                used[best_j] = True
+            records.append((-dt_scores[f][d], f, rank, best_j >= 0 and not best_ignore,
+                            best_j < 0))
+
+    records.sort(key=lambda x: x[0:3])
+    tp = np.cumsum([x[3] for x in records])
+    fp = np.cumsum([x[4] for x in records])
+    recall = tp / n_gt
+    precision = np.maximum.accumulate((tp / np.maximum(tp + fp, 1))[::-1])[::-1]
+    inds = np.searchsorted(recall, recall_thresholds)
+    return np.mean([precision[i] if i < len(recall) else 0 for i in inds])
+
+
+def test_evaluate_3d_perfect():
+    gt = [yaw_boxes([[0, 0, 0], [10, 0, 0]], [[4, 2, 1.5], [1, 1, 2]], [0.3, 0]),
+          yaw_boxes([[5, 5, 1]], [[4, 2, 1.5]], [1.0])]
+    labels = [np.array(["Car", "Pedestrian"]), np.array(["Car"])]
+    scores = [np.array([0.9, 0.8]), np.array([0.7])]
+
+    results = evaluate_3d(gt, labels, gt, scores, labels)
+    assert list(results["labels"]) == ["Car", "Pedestrian"]
+    assert np.allclose(results["iou_thresholds"], [0.7, 0.5])
+    for metric in ("bev", "3d"):
+        assert np.allclose(results[metric]["AP"], 1)
+        assert np.allclose(results[metric]["recall"], 1)
+        assert results[metric]["precision"].shape == (40, 2)
+        assert np.isclose(results[metric]["mAP"], 1)
+
+
+def test_evaluate_3d_thresholds():
+    gt = [yaw_boxes([[0, 0, 0]], [[4, 2, 1.5]], [0])]
+    # BEV IoU of 0.6, and no vertical overlap
+    dt = [yaw_boxes([[1, 0, 2]], [[4, 2, 1.5]], [0])]
+    labels = [np.array(["Car"])]
+    scores = [np.array([0.5])]
+
+    results = evaluate_3d(gt, labels, dt, scores, labels)
+    assert np.allclose(results["bev"]["AP"], 0)
+    assert np.allclose(results["3d"]["AP"], 0)
+
+    results = evaluate_3d(gt, labels, dt, scores, labels, iou_thresholds={"Car": 0.5},
+                          metrics=("bev",))
+    assert np.allclose(results["bev"]["AP"], 1)
+    assert "3d" not in results
+
+    results = evaluate_3d(gt, labels, dt, scores, labels, iou_thresholds=0.5)
+    assert np.allclose(results["3d"]["AP"], 0)
+
+    # boxes of different heights overlap vertically around their centers
+    dt = [yaw_boxes([[0, 0, 0.5]], [[4, 2, 1]], [0])]
+    gt = [yaw_boxes([[0, 0, 0]], [[4, 2, 2]], [0])]
+    assert np.allclose(multi_jaccard_index_3d(dt[0], gt[0], centered=True), 0.5)
+    assert np.allclose(multi_jaccard_index_3d(dt[0], gt[0]), 0.2)
+    results = evaluate_3d(gt, labels, dt, scores, labels, iou_thresholds=0.45, metrics=("3d",))
+    assert np.allclose(results["3d"]["AP"], 1)
+    results = evaluate_3d(gt, labels, dt, scores, labels, iou_thresholds=0.55, metrics=("3d",))
+    assert np.allclose(results["3d"]["AP"], 0)
+
+    with pytest.raises(ValueError):
+        evaluate_3d(gt, labels, dt, scores, labels, iou_thresholds={"Pedestrian": 0.5})
+    with pytest.raises(ValueError):
+        evaluate_3d(gt, labels, dt, scores, labels, metrics=("2d",))
+
+
+def test_evaluate_3d_reference():
+    data = random_dataset_3d(0)
+    thresholds = {"Car": 0.5, "Pedestrian": 0.25}
+    results = evaluate_3d(*data[:5], gt_ignore=data[5], iou_thresholds=thresholds,
+                          metrics=("3d",))
+
+    for k, label in enumerate(results["labels"]):
+        expected = reference_ap_3d(*data, label, thresholds[label], KITTI_RECALL_THRESHOLDS)
+        assert np.isclose(results["3d"]["AP"][k], expected)
+
+
+def test_workers():
+    data = random_dataset(1, n_images=60)
+    serial = evaluate_coco(*data[0:2], *data[3:6], gt_crowd=data[2])
+    parallel = evaluate_coco(*data[0:2], *data[3:6], gt_crowd=data[2], workers=2)
+    assert np.array_equal(serial["precision"], parallel["precision"])
+    assert np.array_equal(serial["recall"], parallel["recall"])
+    assert serial["stats"] == parallel["stats"]
+
+    data = random_dataset_3d(1, n_frames=60)
+    serial = evaluate_3d(*data[:5], gt_ignore=data[5], iou_thresholds=0.3)
+    parallel = evaluate_3d(*data[:5], gt_ignore=data[5], iou_thresholds=0.3, workers=2)
+    for metric in ("bev", "3d"):
+        assert np.array_equal(serial[metric]["precision"], parallel[metric]["precision"])
+        assert np.array_equal(serial[metric]["AP"], parallel[metric]["AP"])
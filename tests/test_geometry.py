@@ -7,7 +7,9 @@ import numpy as np
 import pytest
 from bbox import BBox3D
 from bbox.geometry import get_plane, point_plane_dist, polygon_area, polygon_intersection, \
-    polygon_collision, edges_of, orthogonal, is_separating_axis
+    polygon_collision, edges_of, orthogonal, is_separating_axis, interval_overlap_pairs, \
+    polygon_intersection_batch, polygon_area_batch, polygon_collision_batch, \
+    polygon_clip_planes_batch
 
 
 def clip(subject_polygon, clip_polygon):
@@ -63,6 +65,19 @@ def test_point_plane_dist():
     assert point_plane_dist(pt, plane, signed=True) == -25/3
 
 
+def test_plane_batch():
+    points = np.random.rand(5, 3, 3)
+    planes = get_plane(points[:, 0], points[:, 1], points[:, 2])
+    assert planes.shape == (5, 4)
+    for i in range(5):
+        assert np.allclose(planes[i], get_plane(*points[i]))
+
+    dist = point_plane_dist(points[:, None, 0], planes[None, :], signed=True)
+    assert dist.shape == (5, 5)
+    assert np.allclose(np.diag(dist), 0)
+    assert np.isclose(dist[1, 2], point_plane_dist(points[1, 0], planes[2], signed=True))
+
+
 def test_polygon_area():
     polygon = np.array([[-3, -2], [-1, 4], [6, 1], [3, 10], [-4, 9]])
     assert polygon_area(polygon) == 60
@@ -78,6 +93,49 @@ def test_polygon_intersection():
     assert np.array_equal(i1, i2)
 
 
+
+def random_quadrilaterals(n, rng):
+    centers = rng.uniform(0, 5, size=(n, 1, 2))
+    sizes = rng.uniform(0.5, 3, size=(n, 1, 2))
+    theta = rng.uniform(-np.pi, np.pi, size=n)
+    corners = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]]) / 2 * sizes
+    rotations = np.stack((np.stack((np.cos(theta), -np.sin(theta)), axis=-1),
+                          np.stack((np.sin(theta), np.cos(theta)), axis=-1)), axis=-2)
+    return np.einsum('kij,kvj->kvi', rotations, corners) + centers
+
+
+def test_polygon_intersection_batch():
+    rng = np.random.default_rng(0)
+    a = random_quadrilaterals(200, rng)
+    b = random_quadrilaterals(200, rng)
+
+    polygons, valid = polygon_intersection_batch(a, b)
+    areas = polygon_area_batch(polygons, valid)
+    assert polygons.shape[1] <= 8
+
+    for k in range(a.shape[0]):
+        expected = polygon_intersection(a[k], b[k]).reshape(-1, 2)
+        assert np.allclose(polygons[k][valid[k]], expected)
+        expected_area = polygon_area(expected) if expected.shape[0] > 0 else 0
+        assert np.isclose(areas[k], expected_area)
+
+
+def test_polygon_intersection_batch_padded():
+    square = np.array([[0, 0], [2, 0], [2, 2], [0, 2]], dtype=float)
+    triangle = np.array([[1, 1], [3, 1], [1, 3], [0, 0]], dtype=float)
+    valid = np.array([True, True, True, False])
+
+    polygons, mask = polygon_intersection_batch(triangle[None], square[None], valid1=valid[None])
+    expected = polygon_intersection(triangle[:3], square)
+    assert np.allclose(polygons[0][mask[0]], expected)
+
+    polygons, mask = polygon_intersection_batch(square[None], triangle[None], valid2=valid[None])
+    expected = polygon_intersection(square, triangle[:3])
+    assert np.allclose(polygons[0][mask[0]], expected)
+
+    assert np.allclose(polygon_area_batch(triangle[None], valid[None]), polygon_area(triangle[:3]))
+
+
 # Ensure 100% test coverage
 def test_is_separating_axis():
     # randomly generated values
@@ -103,3 +161,65 @@ def test_polygon_no_collision():
     p1, p2 = a.p[0:4, 0:2], b.p[0:4, 0:2]
 
     assert not polygon_collision(p1, p2)
+
+
+def test_interval_overlap_pairs():
+    a_lo = np.random.randint(0, 100, size=50)
+    a_hi = a_lo + np.random.randint(0, 20, size=50)
+    b_lo = np.random.randint(0, 100, size=70)
+    b_hi = b_lo + np.random.randint(0, 20, size=70)
+    # include touching and identical intervals
+    b_lo[:3], b_hi[:3] = a_hi[:3], a_hi[:3] + 1
+    b_lo[3:6], b_hi[3:6] = a_lo[3:6], a_hi[3:6]
+
+    i, j = interval_overlap_pairs(a_lo, a_hi, b_lo, b_hi)
+    pairs = set(zip(i.tolist(), j.tolist()))
+    assert len(pairs) == len(i)
+
+    overlap = (a_lo[:, None] <= b_hi[None, :]) & (b_lo[None, :] <= a_hi[:, None])
+    assert pairs == set(zip(*[x.tolist() for x in np.nonzero(overlap)]))
+
+
+def test_interval_overlap_pairs_empty():
+    i, j = interval_overlap_pairs(np.empty(0), np.empty(0), np.arange(3), np.arange(3))
+    assert i.shape == (0,) and j.shape == (0,)
+
+
+def test_polygon_collision_batch():
+    rng = np.random.default_rng(1)
+    a = random_quadrilaterals(500, rng)
+    b = random_quadrilaterals(500, rng)
+
+    collide = polygon_collision_batch(a, b)
+    assert collide.shape == (500,)
+    assert collide.any() and not collide.all()
+    assert np.array_equal(collide, [polygon_collision(x, y) for x, y in zip(a, b)])
+
+
+def test_polygon_collision_batch_invalid():
+    with pytest.raises(ValueError):
+        polygon_collision_batch(np.zeros((2, 4, 2)), np.zeros((3, 4, 2)))
+
+
+def test_polygon_clip_planes_batch():
+    square = np.array([[0, 0, 1], [2, 0, 1], [2, 2, 1], [0, 2, 1]], dtype=float)
+    # keep x <= 1, y <= 3, and everything below z = 2
+    planes = np.array([[1, 0, 0, -1], [0, 1, 0, -3], [0, 0, 1, -2]], dtype=float)
+
+    polygons, valid = polygon_clip_planes_batch(square[None], planes[None])
+    assert np.allclose(polygons[0][valid[0]], [[0, 0, 1], [1, 0, 1], [1, 2, 1], [0, 2, 1]])
+    assert np.allclose(polygon_area_batch(polygons, valid), 2)
+
+    # polygons outside of a plane are empty, and tolerances move the planes
+    polygons, valid = polygon_clip_planes_batch(
+        np.stack((square, square + 5)), np.stack((planes, planes)), tolerance=[[0.5, 0, 0]])
+    assert np.allclose(polygon_area_batch(polygons, valid), [3, 0])
+    assert not valid[1].any()
+
+
+def test_polygon_area_batch_3d():
+    rng = np.random.default_rng(2)
+    polygons = random_quadrilaterals(20, rng)
+    rotation = np.linalg.qr(rng.normal(size=(3, 3)))[0]
+    polygons_3d = np.concatenate((polygons, np.ones((20, 4, 1))), axis=-1) @ rotation.T
+    assert np.allclose(polygon_area_batch(polygons_3d), polygon_area_batch(polygons))
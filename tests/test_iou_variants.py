@@ -0,0 +1,111 @@
+"""Tests for iou_variants."""
+
+import numpy as np
+import pytest
+
+from bbox import BBox2DList
+from bbox.box_modes import XYXY
+from bbox.iou_variants import (ciou_2d, diou_2d, giou_2d, multi_ciou_2d, multi_diou_2d,
+                               multi_giou_2d)
+from bbox.metrics import multi_jaccard_index_2d
+
+
+def naive_iou_variants(boxA, boxB):
+    """GIoU, DIoU and CIoU of 2 XYXY boxes, with the +1 pixel convention."""
+    wa, ha = boxA[2] - boxA[0] + 1, boxA[3] - boxA[1] + 1
+    wb, hb = boxB[2] - boxB[0] + 1, boxB[3] - boxB[1] + 1
+    inter = max(min(boxA[2], boxB[2]) - max(boxA[0], boxB[0]) + 1, 0) * \
+        max(min(boxA[3], boxB[3]) - max(boxA[1], boxB[1]) + 1, 0)
+    union = wa * ha + wb * hb - inter
+    iou = inter / union
+
+    ew = max(boxA[2], boxB[2]) - min(boxA[0], boxB[0]) + 1
+    eh = max(boxA[3], boxB[3]) - min(boxA[1], boxB[1]) + 1
+    giou = iou - (ew * eh - union) / (ew * eh)
+
+    dx = (boxA[0] + boxA[2]) / 2 - (boxB[0] + boxB[2]) / 2
+    dy = (boxA[1] + boxA[3]) / 2 - (boxB[1] + boxB[3]) / 2
+    diou = iou - (dx ** 2 + dy ** 2) / (ew ** 2 + eh ** 2)
+
+    v = 4 / np.pi ** 2 * (np.arctan(wb / hb) - np.arctan(wa / ha)) ** 2
+    alpha = v / (1 - iou + v) if (1 - iou + v) > 0 else 0
+    return giou, diou, diou - alpha * v
+
+
+def test_iou_variants_2d():
+    rng = np.random.default_rng(5)
+    bboxes = np.hstack((rng.integers(0, 200, (60, 2)), rng.integers(1, 60, (60, 2))))
+    a, b = BBox2DList(bboxes[:30]), BBox2DList(bboxes[30:])
+    xa, xb = a.numpy(mode=XYXY), b.numpy(mode=XYXY)
+
+    variants = (giou_2d, diou_2d, ciou_2d)
+    multi_variants = (multi_giou_2d, multi_diou_2d, multi_ciou_2d)
+    paired = [func(a, b) for func in variants]
+    matrices = [func(a, b) for func in multi_variants]
+
+    for i in range(30):
+        expected = naive_iou_variants(xa[i], xb[i])
+        assert np.allclose([p[i] for p in paired], expected)
+        assert np.allclose([func(a[i], b[i]) for func in variants], expected)
+        for j in range(30):
+            assert np.allclose([m[i, j] for m in matrices], naive_iou_variants(xa[i], xb[j]))
+
+    for p, m in zip(paired, matrices):
+        assert np.array_equal(p, np.diag(m))
+
+    iou = multi_jaccard_index_2d(a, b)
+    giou, diou, ciou = matrices
+    assert np.all(giou <= iou + 1e-12) and np.all(giou > -1)
+    assert np.all(diou <= iou + 1e-12) and np.all(diou > -1)
+    assert np.all(ciou <= diou + 1e-12)
+
+    # identical boxes
+    for func in variants:
+        assert np.allclose(func(a, a), 1)
+        assert func(a[0], a[0]) == 1
+
+    with pytest.raises(ValueError):
+        giou_2d(a, BBox2DList(bboxes[:10]))
+
+
+def test_iou_variants_2d_mixed():
+    rng = np.random.default_rng(6)
+    bboxes = np.hstack((rng.integers(0, 200, (20, 2)), rng.integers(1, 60, (20, 2))))
+    a = BBox2DList(bboxes)
+
+    # a single box is paired with every box of the list
+    for k, func in enumerate((giou_2d, diou_2d, ciou_2d)):
+        multi = (multi_giou_2d, multi_diou_2d, multi_ciou_2d)[k](a, a)
+        assert np.array_equal(func(a[3], a), multi[3])
+        assert np.array_equal(func(a, a[3]), multi[:, 3])
+        assert func(a[3], a).shape == (20,)
+
+    small = BBox2DList(bboxes, dtype=np.float32)
+    assert giou_2d(a[0], small).dtype == np.float32
+    assert giou_2d(a[0], small, dtype=np.float64).dtype == np.float64
+
+    with pytest.raises(TypeError):
+        giou_2d(a, bboxes)
+    with pytest.raises(TypeError):
+        ciou_2d(list(a), a[0])
+
+
+def test_multi_iou_variants_2d_tiled(tmp_path):
+    a = BBox2DList(np.random.randint(low=0, high=500, size=(103, 4)))
+    b = BBox2DList(np.random.randint(low=0, high=500, size=(71, 4)))
+
+    for func in (multi_giou_2d, multi_diou_2d, multi_ciou_2d):
+        gt = func(a, b)
+        for tile_size in (1, 16, 1000):
+            assert np.array_equal(func(a, b, tile_size=tile_size), gt)
+        assert np.array_equal(func(a, b, tile_size=32, workers=2), gt)
+
+        out = np.memmap(tmp_path / "iou.dat", dtype=np.float64, mode="w+", shape=(103, 71))
+        assert func(a, b, tile_size=16, out=out) is out
+        assert np.array_equal(out, gt)
+
+        a32, b32 = BBox2DList(a.bboxes, dtype=np.float32), BBox2DList(b.bboxes, dtype=np.float32)
+        assert func(a32, b32).dtype == np.float32
+
+        with pytest.raises(ValueError):
+            func(a, b, out=np.empty((71, 103)))
@@ -0,0 +1,43 @@
+"""Tests for kernels."""
+
+import numpy as np
+import pytest
+
+from bbox import BBox2DList, BBox3DList
+from bbox.box_modes import XYXY
+from bbox.kernels import (bev_candidate_pairs, jaccard_index_3d_candidates, jaccard_index_xyxy,
+                          pairwise_xyxy)
+from bbox.metrics import jaccard_index_2d, jaccard_index_3d, multi_jaccard_index_3d
+
+
+def test_jaccard_index_xyxy():
+    rng = np.random.default_rng(0)
+    xy = rng.integers(0, 100, size=(30, 2))
+    boxes = BBox2DList(np.hstack((xy, xy + rng.integers(1, 40, size=(30, 2)))), mode=XYXY)
+    a = boxes.numpy(mode=XYXY, dtype=np.float64)
+
+    expected = np.array([[jaccard_index_2d(x, y) for y in boxes] for x in boxes])
+    assert np.allclose(jaccard_index_xyxy(a[:, np.newaxis], a[np.newaxis]), expected)
+    assert np.allclose(jaccard_index_xyxy(a, a[::-1]), np.diag(expected[:, ::-1]))
+
+    assert np.array_equal(pairwise_xyxy(jaccard_index_xyxy, a, a, tile_size=7),
+                          jaccard_index_xyxy(a[:, np.newaxis], a[np.newaxis]))
+    with pytest.raises(ValueError):
+        pairwise_xyxy(jaccard_index_xyxy, a, a, out=np.empty((30, 29)))
+
+
+def test_jaccard_index_3d_candidates():
+    rng = np.random.default_rng(1)
+    yaw = rng.uniform(-np.pi, np.pi, 40)
+    q = np.stack((np.cos(yaw / 2), 0 * yaw, 0 * yaw, np.sin(yaw / 2)), axis=1)
+    boxes = BBox3DList.from_arrays(rng.uniform(0, 10, (40, 3)), rng.uniform(1, 4, (40, 3)), q)
+
+    rows, cols = bev_candidate_pairs(boxes.p[:, 0:4, 0:2], boxes.p[:, 0:4, 0:2])
+    index, iou = jaccard_index_3d_candidates(boxes, boxes, rows, cols)
+    assert np.allclose(iou, [jaccard_index_3d(boxes[r], boxes[c])
+                             for r, c in zip(rows[index], cols[index])])
+
+    index, iou = jaccard_index_3d_candidates(boxes, boxes, rows, cols, centered=True)
+    expected = multi_jaccard_index_3d(boxes, boxes, centered=True)
+    assert np.array_equal(iou, expected[rows[index], cols[index]])
+    assert np.count_nonzero(expected) == len(index)
@@ -0,0 +1,135 @@
+"""Tests for matching."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from bbox import BBox2DList
+from bbox.box_modes import XYXY
+from bbox.matching import _greedy, _hungarian, match
+from bbox.metrics import multi_jaccard_index_2d
+
+
+def random_boxes(n, rng, extent=200):
+    return np.hstack((rng.uniform(0, extent, (n, 2)), rng.uniform(10, 50, (n, 2))))
+
+
+def test_hungarian():
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        n, m = sorted(int(x) for x in rng.integers(1, 7, 2))
+        cost = rng.integers(0, 5, (n, m)).astype(float)
+        assignment = _hungarian(cost)
+
+        best = min(cost[np.arange(n), list(p)].sum()
+                   for p in itertools.permutations(range(m), n))
+        assert np.unique(assignment).shape[0] == n
+        assert cost[np.arange(n), assignment].sum() == best
+
+
+def test_greedy():
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        pairs = np.unique(rng.integers(0, 8, (30, 2)), axis=0)
+        rows, cols = pairs[:, 0], pairs[:, 1]
+        utility = rng.integers(1, 4, rows.shape[0]).astype(float)
+
+        # sequential greedy assignment
+        expected, used_rows, used_cols = [], set(), set()
+        for i in np.lexsort((cols, rows, -utility)):
+            if rows[i] not in used_rows and cols[i] not in used_cols:
+                used_rows.add(rows[i])
+                used_cols.add(cols[i])
+                expected.append(i)
+
+        assert sorted(expected) == sorted(_greedy(rows, cols, utility).tolist())
+
+
+def test_match_perfect():
+    rng = np.random.default_rng(2)
+    boxes = random_boxes(50, rng, extent=2000)
+    a = BBox2DList(boxes)
+    b = BBox2DList(boxes[::-1] + rng.normal(0, 1, (50, 4)))
+
+    for method in ("greedy", "hungarian"):
+        for cost in ("iou", "giou", "center"):
+            rows, cols, scores = match(a, b, method=method, cost=cost)
+            assert np.array_equal(rows, np.arange(50))
+            assert np.array_equal(cols, np.arange(50)[::-1])
+            assert scores.shape == (50,)
+
+
+def test_match_hungarian_optimal():
+    rng = np.random.default_rng(3)
+    for _ in range(30):
+        a = BBox2DList(random_boxes(int(rng.integers(1, 6)), rng, extent=60))
+        b = BBox2DList(random_boxes(int(rng.integers(1, 6)), rng, extent=60))
+        iou = multi_jaccard_index_2d(a, b)
+        n, m = iou.shape
+
+        rows, cols, scores = match(a, b, method="hungarian", min_iou=0.1)
+        assert np.allclose(scores, iou[rows, cols])
+        assert np.all(scores > 0.1)
+        assert np.unique(rows).shape == rows.shape and np.unique(cols).shape == cols.shape
+
+        # brute force over the assignments of the smaller side
+        gated = np.where(iou > 0.1, iou, 0)
+        if n <= m:
+            best = max(gated[np.arange(n), list(p)].sum()
+                       for p in itertools.permutations(range(m), n))
+        else:
+            best = max(gated[list(p), np.arange(m)].sum()
+                       for p in itertools.permutations(range(n), m))
+        assert np.isclose(scores.sum(), best)
+
+        # greedy never does better
+        _, _, greedy_scores = match(a, b, method="greedy", min_iou=0.1)
+        assert greedy_scores.sum() <= best + 1e-9
+
+
+def test_match_gating():
+    a = BBox2DList(np.array([[0, 0, 10, 10], [100, 100, 10, 10]]))
+    b = BBox2DList(np.array([[20, 0, 10, 10], [102, 100, 10, 10]]))
+
+    rows, cols, _ = match(a, b)
+    assert rows.tolist() == [1] and cols.tolist() == [1]
+
+    # non overlapping boxes can be matched by GIoU or center distance without IoU gating
+    rows, cols, scores = match(a, b, method="hungarian", cost="giou", min_iou=None)
+    assert rows.tolist() == [0, 1] and cols.tolist() == [0, 1]
+    assert scores[0] < 0
+
+    rows, cols, scores = match(a, b, cost="center", min_iou=None, max_distance=25)
+    assert rows.tolist() == [0, 1] and cols.tolist() == [0, 1]
+    assert np.allclose(scores, [20, 2])
+
+    rows, cols, _ = match(a, b, cost="center", min_iou=None, max_distance=10)
+    assert rows.tolist() == [1] and cols.tolist() == [1]
+
+    rows, cols, scores = match(a, BBox2DList([]))
+    assert rows.shape == cols.shape == scores.shape == (0,)
+
+    with pytest.raises(ValueError):
+        match(a, b, method="auction")
+    with pytest.raises(ValueError):
+        match(a, b, cost="diou")
+
+
+def test_match_scipy():
+    pytest.importorskip("scipy")
+    rng = np.random.default_rng(4)
+    a = BBox2DList(random_boxes(40, rng))
+    b = BBox2DList(random_boxes(40, rng))
+
+    _, _, scores = match(a, b, method="hungarian", min_iou=0.05)
+    cost = -np.where(multi_jaccard_index_2d(a, b) > 0.05, multi_jaccard_index_2d(a, b), 0)
+    assert np.isclose(scores.sum(), -cost[np.arange(40), _hungarian(cost)].sum())
+
+
+def test_match_xyxy_lists():
+    a = BBox2DList(np.array([[0, 0, 9, 9]]), mode=XYXY)
+    b = BBox2DList(np.array([[0, 0, 10, 10]]))
+    rows, cols, scores = match(a, b)
+    assert rows.tolist() == [0] and cols.tolist() == [0]
+    assert np.isclose(scores[0], 1)
@@ -6,10 +6,15 @@ import pendulum
 import pytest
 from loguru import logger
 from matplotlib.patches import Polygon
+from pyquaternion import Quaternion
 
-from bbox import BBox2D, BBox2DList, BBox3D
+from bbox import BBox2D, BBox2DList, BBox3D, BBox3DList, RotatedBBox2DList
+from bbox.geometry import polygon_area, polygon_intersection
 from bbox.metrics import (jaccard_index_2d, jaccard_index_3d,
-                          multi_jaccard_index_2d)
+                          multi_jaccard_index_2d, multi_jaccard_index_2d_sparse,
+                          multi_jaccard_index_3d, jaccard_index_rotated_2d,
+                          multi_jaccard_index_rotated_2d, jaccard_index_3d_exact,
+                          multi_jaccard_index_3d_exact)
 
 
 def naive_intersection_over_union(boxA, boxB):
@@ -95,6 +100,66 @@ def test_multi_jaccard_index_2d():
     assert np.array_equal(gt_iou, iou)
 
 
+def test_multi_jaccard_index_2d_dtype():
+    bboxes = np.random.randint(low=0, high=500, size=(50, 4))
+    gt_iou = multi_jaccard_index_2d(BBox2DList(bboxes), BBox2DList(bboxes))
+
+    for dtype, acc_dtype in ((np.float32, np.float32), (np.float16, np.float32),
+                             (np.int32, np.float64)):
+        bbl = BBox2DList(bboxes, dtype=dtype)
+        iou = multi_jaccard_index_2d(bbl, bbl)
+        assert iou.dtype == acc_dtype
+        assert np.allclose(iou, gt_iou, atol=1e-6)
+
+    bbl = BBox2DList(bboxes, dtype=np.float16)
+    assert multi_jaccard_index_2d(bbl, bbl, dtype=np.float64).dtype == np.float64
+
+
+def test_multi_jaccard_index_2d_tiled(tmp_path):
+    a = BBox2DList(np.random.randint(low=0, high=500, size=(103, 4)))
+    b = BBox2DList(np.random.randint(low=0, high=500, size=(71, 4)))
+    gt_iou = multi_jaccard_index_2d(a, b)
+
+    for tile_size in (1, 16, 50, 1000):
+        assert np.array_equal(multi_jaccard_index_2d(a, b, tile_size=tile_size), gt_iou)
+
+    out = np.memmap(tmp_path / "iou.dat", dtype=np.float64, mode="w+", shape=(103, 71))
+    iou = multi_jaccard_index_2d(a, b, tile_size=16, out=out)
+    assert iou is out
+    assert np.array_equal(out, gt_iou)
+
+    out = np.memmap(tmp_path / "iou_workers.dat", dtype=np.float64, mode="w+", shape=(103, 71))
+    assert multi_jaccard_index_2d(a, b, tile_size=16, out=out, workers=2) is out
+    assert np.array_equal(out, gt_iou)
+
+    with pytest.raises(ValueError):
+        multi_jaccard_index_2d(a, b, out=np.empty((71, 103)))
+
+
+def test_multi_jaccard_index_2d_sparse():
+    bboxes = np.random.randint(low=0, high=1000, size=(300, 4))
+    bboxes[:, 2:] = np.random.randint(low=1, high=100, size=(300, 2))
+    a = BBox2DList(bboxes[:200])
+    b = BBox2DList(bboxes[100:])
+    gt_iou = multi_jaccard_index_2d(a, b)
+
+    for min_iou in (0, 0.3):
+        rows, cols, values = multi_jaccard_index_2d_sparse(
+            a, b, min_iou=min_iou, format=None, chunk_size=17)
+        gt_rows, gt_cols = np.nonzero(gt_iou > min_iou)
+        assert np.array_equal(rows, gt_rows)
+        assert np.array_equal(cols, gt_cols)
+        assert np.array_equal(values, gt_iou[gt_rows, gt_cols])
+
+
+def test_multi_jaccard_index_2d_sparse_scipy():
+    pytest.importorskip("scipy")
+    a = BBox2DList(np.random.randint(low=0, high=500, size=(100, 4)))
+    iou = multi_jaccard_index_2d_sparse(a, a, format="csr")
+    assert iou.format == "csr"
+    assert np.array_equal(iou.toarray(), multi_jaccard_index_2d(a, a))
+
+
 @pytest.mark.filterwarnings("ignore:.*true_divide")
 def test_multi_jaccard_index_2d_performance():
     """
@@ -261,6 +326,169 @@ def test_invalid_jaccard_index_3d():
     assert jaccard_index_3d(bb, bb) == 0
 
 
+def random_bbox3d_list(n, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 10, size=(n, 3))
+    sizes = rng.uniform(0.5, 4, size=(n, 3))
+    yaw = rng.uniform(-np.pi, np.pi, size=n)
+    quaternions = np.zeros((n, 4))
+    quaternions[:, 0] = np.cos(yaw / 2)
+    quaternions[:, 3] = np.sin(yaw / 2)
+    return BBox3DList.from_arrays(centers, sizes, quaternions)
+
+
+def test_multi_jaccard_index_3d():
+    a = random_bbox3d_list(40, seed=1)
+    b = random_bbox3d_list(30, seed=2)
+
+    iou = multi_jaccard_index_3d(a, b)
+    assert iou.shape == (40, 30)
+    assert np.count_nonzero(iou) > 0
+
+    expected = np.array([[jaccard_index_3d(x, y) for y in b] for x in a])
+    assert np.allclose(iou, expected)
+
+    # lists of BBox3D are accepted as well
+    assert np.array_equal(multi_jaccard_index_3d(list(a), list(b)), iou)
+
+
+def test_multi_jaccard_index_3d_sparse():
+    a = random_bbox3d_list(40, seed=3)
+    dense = multi_jaccard_index_3d(a, a)
+    rows, cols, values = multi_jaccard_index_3d(a, a, sparse=True, format=None)
+
+    assert np.all(values > 0)
+    sparse = np.zeros_like(dense)
+    sparse[rows, cols] = values
+    assert np.array_equal(sparse, dense)
+    assert np.allclose(np.diag(dense), 1)
+
+
+def test_multi_jaccard_index_3d_centered():
+    a = random_bbox3d_list(40, seed=7)
+    b = random_bbox3d_list(30, seed=8)
+
+    iou = multi_jaccard_index_3d(a, b, centered=True)
+    assert np.count_nonzero(iou) > 0
+    assert np.allclose(iou, multi_jaccard_index_3d_exact(a, b), atol=1e-5)
+
+    # centered boxes are the boxes raised by half their height with `cz` as their top
+    def raised(x):
+        return BBox3DList.from_arrays(np.c_[x.cx, x.cy, x.cz + x.h / 2], np.c_[x.l, x.w, x.h],
+                                      x.q)
+
+    assert np.array_equal(multi_jaccard_index_3d(raised(a), raised(b)), iou)
+    assert np.array_equal(multi_jaccard_index_3d(a, b, centered=True, workers=2), iou)
+
+
+def random_rotated_bbox2d_list(n, seed=0):
+    rng = np.random.default_rng(seed)
+    boxes = np.hstack((rng.uniform(0, 50, size=(n, 2)), rng.uniform(1, 10, size=(n, 2)),
+                       rng.uniform(-np.pi, np.pi, size=(n, 1))))
+    return RotatedBBox2DList(boxes)
+
+
+def test_multi_jaccard_index_rotated_2d():
+    a = random_rotated_bbox2d_list(60, seed=1)
+    b = random_rotated_bbox2d_list(50, seed=2)
+
+    iou = multi_jaccard_index_rotated_2d(a, b)
+    assert iou.shape == (60, 50)
+    assert np.count_nonzero(iou) > 0
+
+    expected = np.array([[jaccard_index_rotated_2d(x, y) for y in b] for x in a])
+    assert np.allclose(iou, expected)
+
+    rows, cols, values = multi_jaccard_index_rotated_2d(a, b, sparse=True, format=None)
+    sparse = np.zeros_like(iou)
+    sparse[rows, cols] = values
+    assert np.array_equal(sparse, iou)
+
+
+def test_jaccard_index_rotated_2d_axis_aligned():
+    a = RotatedBBox2DList(np.array([[0, 0, 2, 2, 0], [1, 0, 2, 2, np.pi]]))
+    iou = multi_jaccard_index_rotated_2d(a, a)
+    assert np.allclose(iou, [[1, 1 / 3], [1 / 3, 1]])
+
+
+def test_jaccard_index_3d_exact():
+    a = BBox3D(0, 0, 0, 2, 2, 2)
+    assert np.isclose(jaccard_index_3d_exact(a, a), 1)
+    assert np.isclose(jaccard_index_3d_exact(a, BBox3D(1, 0, 0, 2, 2, 2)), 1 / 3)
+    assert np.isclose(jaccard_index_3d_exact(a, BBox3D(0.5, 0.5, 0.5, 1, 1, 1)), 1 / 8)
+    assert np.isclose(jaccard_index_3d_exact(a, BBox3D(2, 0, 0, 2, 2, 2)), 0)
+    assert jaccard_index_3d_exact(a, BBox3D(5, 0, 0, 2, 2, 2)) == 0
+    assert jaccard_index_3d_exact(a, BBox3D(0, 0, 0, 2, 2, 0)) == 0
+
+    # a cube rotated by 45 degrees about z inside a larger cube
+    b = BBox3D(0, 0, 0, 1, 1, 1, euler_angles=[0, 0, np.pi / 4])
+    assert np.isclose(jaccard_index_3d_exact(a, b), 1 / 8)
+
+
+def test_jaccard_index_3d_exact_yaw():
+    """
+    For yaw-only rotations the intersection is the BEV intersection times the vertical overlap.
+    """
+    a = random_bbox3d_list(30, seed=4)
+    b = random_bbox3d_list(30, seed=5)
+    iou = multi_jaccard_index_3d_exact(a, b)
+
+    bev = np.zeros_like(iou)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            points = polygon_intersection(x.p[0:4, 0:2], y.p[0:4, 0:2])
+            if len(points) > 0:
+                bev[i, j] = polygon_area(points)
+    zmax = np.minimum(a.cz[:, None] + a.h[:, None] / 2, b.cz + b.h / 2)
+    zmin = np.maximum(a.cz[:, None] - a.h[:, None] / 2, b.cz - b.h / 2)
+    inter = bev * np.maximum(zmax - zmin, 0)
+    expected = inter / (a.volume[:, None] + b.volume - inter)
+
+    assert np.count_nonzero(iou) > 0
+    assert np.allclose(iou, expected)
+
+
+def test_multi_jaccard_index_3d_exact():
+    rng = np.random.default_rng(6)
+    centers = rng.uniform(0, 5, size=(25, 3))
+    sizes = rng.uniform(0.5, 3, size=(25, 3))
+    a = BBox3DList.from_arrays(centers, sizes, rng.normal(size=(25, 4)))
+
+    iou = multi_jaccard_index_3d_exact(a, a)
+    assert np.allclose(np.diag(iou), 1)
+    assert np.allclose(iou, iou.T)
+    assert np.isclose(iou[3, 7], jaccard_index_3d_exact(a[3], a[7]))
+
+    # the IoU does not change when rotating all the boxes together
+    rotation = Quaternion(axis=[1, 2, 3], angle=0.7)
+    rotated = BBox3DList.from_arrays(centers @ rotation.rotation_matrix.T, sizes,
+                                     [(rotation * Quaternion(q)).elements for q in a.q])
+    assert np.allclose(multi_jaccard_index_3d_exact(rotated, rotated), iou)
+
+    rows, cols, values = multi_jaccard_index_3d_exact(a, a, sparse=True, format=None)
+    assert np.array_equal(iou[rows, cols], values)
+
+
+def test_jaccard_index_3d_exact_random_rotations():
+    """Overlapping boxes with arbitrary rotations, whose clipping leaves some polygons untouched."""
+    a = BBox3D(0.8182, 0.7515, 0.2895, length=2.3521, width=2.7005, height=1.9724,
+               q=[-0.9330, -0.1452, 0.0306, -0.3280])
+    b = BBox3D(0.3038, 0.5010, 0.3601, length=1.1283, width=1.2946, height=1.2760,
+               q=[-0.3684, 0.1761, 0.6960, 0.5907])
+    # Monte Carlo estimate of the IoU is 0.1419
+    assert abs(jaccard_index_3d_exact(a, b) - 0.1419) < 0.003
+
+    # pairs are clipped one at a time, so that no other pair pads the polygons
+    rng = np.random.default_rng(8)
+    n = 400
+    a, b = [BBox3DList.from_arrays(rng.uniform(0, 1, size=(n, 3)), rng.uniform(0.5, 3, (n, 3)),
+                                   rng.normal(size=(n, 4))) for _ in range(2)]
+    iou = np.array([jaccard_index_3d_exact(a[i], b[i]) for i in range(n)])
+    assert np.count_nonzero(iou) > 0.9 * n
+    assert np.all((iou >= 0) & (iou <= 1))
+    assert np.allclose(iou[:100], [jaccard_index_3d_exact(b[i], a[i]) for i in range(100)])
+
+
 def visualize_boxes(box_list):
     for b in box_list:
         polygon = Polygon(b.p[0:4, 0:2], fill=False)
@@ -273,3 +501,27 @@ def visualize_boxes(box_list):
     plt.axis('scaled')
     plt.show()
     plt.show()
+
+
+def test_multi_jaccard_index_workers():
+    rng = np.random.default_rng(3)
+    a = BBox2DList(np.hstack((rng.uniform(0, 500, (300, 2)), rng.uniform(5, 80, (300, 2)))))
+    b = BBox2DList(np.hstack((rng.uniform(0, 500, (200, 2)), rng.uniform(5, 80, (200, 2)))))
+    assert np.array_equal(multi_jaccard_index_2d(a, b),
+                          multi_jaccard_index_2d(a, b, tile_size=64, workers=2))
+    for x, y in zip(multi_jaccard_index_2d_sparse(a, b, format=None),
+                    multi_jaccard_index_2d_sparse(a, b, format=None, workers=2)):
+        assert np.array_equal(x, y)
+
+    n = 200
+    yaw = rng.uniform(-np.pi, np.pi, (2, n))
+    q = np.stack((np.cos(yaw / 2), 0 * yaw, 0 * yaw, np.sin(yaw / 2)), axis=-1)
+    boxes = [BBox3DList.from_arrays(np.c_[rng.uniform(0, 30, (n, 2)), rng.uniform(-1, 1, n)],
+                                    rng.uniform(1, 5, (n, 3)), q[i]) for i in range(2)]
+    for func in (multi_jaccard_index_3d, multi_jaccard_index_3d_exact):
+        assert np.array_equal(func(*boxes), func(*boxes, workers=2))
+
+    rotated = RotatedBBox2DList(np.c_[rng.uniform(0, 30, (n, 2)), rng.uniform(1, 5, (n, 2)),
+                                      yaw[0]])
+    assert np.array_equal(multi_jaccard_index_rotated_2d(rotated, rotated),
+                          multi_jaccard_index_rotated_2d(rotated, rotated, workers=2))
@@ -0,0 +1,78 @@
+"""Tests for parallel."""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bbox import parallel
+from bbox.parallel import parallel_map, split
+
+
+def block_sum(arrays, start, stop, scale):
+    arrays["out"][start:stop] = arrays["x"][start:stop] * scale
+    return arrays["x"][start:stop].sum()
+
+
+def test_split():
+    assert [stop - start for start, stop in split(10, 3)] in ([3, 3, 4], [3, 4, 3], [4, 3, 3])
+    assert split(2, 5) == [(0, 1), (1, 2)]
+    assert split(0, 4) == []
+
+    # the expensive elements end up in separate ranges
+    ranges = split(6, 2, costs=[10, 0, 0, 0, 0, 10])
+    assert len(ranges) == 2 and 0 < ranges[0][1] <= 5
+
+    ranges = split(1000, 7, costs=np.random.default_rng(0).random(1000))
+    assert ranges[0][0] == 0 and ranges[-1][1] == 1000
+    assert all(a[1] == b[0] for a, b in zip(ranges[:-1], ranges[1:]))
+
+
+def test_parallel_map():
+    x = np.arange(100, dtype=np.float64)
+    tasks = [(start, stop, 2.0) for start, stop in split(100, 4)]
+
+    out = np.zeros(100)
+    serial = parallel_map(block_sum, {"x": x, "out": out}, tasks)
+    assert np.array_equal(out, 2 * x)
+
+    out = np.zeros(100)
+    parallel = parallel_map(block_sum, {"x": x, "out": out}, tasks, workers=2, outputs=("out",))
+    assert parallel == serial
+    assert np.array_equal(out, 2 * x)
+
+    # arrays not listed in outputs are not copied back
+    out = np.zeros(100)
+    parallel_map(block_sum, {"x": x, "out": out}, tasks, workers=2)
+    assert np.all(out == 0)
+
+
+def test_parallel_map_memmap(tmp_path):
+    x = np.arange(100, dtype=np.float64)
+    tasks = [(start, stop, 3.0) for start, stop in split(100, 4)]
+
+    # the workers write into the file directly
+    out = np.memmap(tmp_path / "out.dat", dtype=np.float64, mode="w+", shape=(100,))
+    parallel_map(block_sum, {"x": x, "out": out}, tasks, workers=2, outputs=("out",))
+    assert np.array_equal(out, 3 * x)
+    assert np.array_equal(np.fromfile(tmp_path / "out.dat"), 3 * x)
+
+    # a view of a memmap is copied back
+    out = np.memmap(tmp_path / "out2.dat", dtype=np.float64, mode="w+", shape=(200,))
+    parallel_map(block_sum, {"x": x, "out": out[::2]}, tasks, workers=2, outputs=("out",))
+    assert np.array_equal(out[::2], 3 * x)
+    assert np.all(out[1::2] == 0)
+
+
+def test_detach():
+    block = shared_memory.SharedMemory(create=True, size=80)
+    try:
+        parallel._attach({"x": (block.name, (10,), "<f8", None)})
+        attached, array = parallel._shared["x"]
+        assert array.shape == (10,)
+        del array
+        parallel._detach()
+        assert not parallel._shared
+        assert attached.buf is None
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,54 @@
+"""Unit tests for rotated_bbox2d"""
+
+import numpy as np
+import pytest
+
+from bbox import RotatedBBox2D
+from bbox.geometry import polygon_area
+
+
+class TestRotatedBBox2D(object):
+    def test_init(self):
+        box = RotatedBBox2D([3, 4, 2, 1, 0.5])
+        assert box.cx == 3 and box.cy == 4
+        assert box.w == 2 and box.h == 1
+        assert box.theta == 0.5
+        assert RotatedBBox2D(box) == box
+        assert RotatedBBox2D(np.array([3, 4, 2, 1, 0.5])) == box
+        assert RotatedBBox2D((3, 4, 2, 1, 0.5)) == box
+
+    def test_init_invalid(self):
+        with pytest.raises(ValueError):
+            RotatedBBox2D([1, 2, 3, 4])
+        with pytest.raises(TypeError):
+            RotatedBBox2D("1, 2, 3, 4, 5")
+        with pytest.raises(ValueError):
+            RotatedBBox2D([1, 2, 0, 4, 0])
+        with pytest.raises(ValueError):
+            RotatedBBox2D([1, 2, 3, -4, 0])
+
+    def test_corners(self):
+        box = RotatedBBox2D([1, 1, 4, 2, 0])
+        assert np.allclose(box.p, [[3, 2], [-1, 2], [-1, 0], [3, 0]])
+
+        box = RotatedBBox2D([0, 0, 4, 2, np.pi / 2])
+        assert np.allclose(box.p, [[-1, 2], [-1, -2], [1, -2], [1, 2]])
+        assert np.allclose(box.aabb(), [-1, -2, 1, 2])
+
+    def test_area(self):
+        box = RotatedBBox2D([5, -2, 3, 7, 1.2])
+        assert box.area == 21
+        assert np.isclose(polygon_area(box.p), box.area)
+
+    def test_setters(self):
+        box = RotatedBBox2D([0, 0, 1, 1, 0])
+        box.w = 3
+        box.h = 2
+        box.theta = 0.25
+        box.cx, box.cy = 1, 2
+        assert np.array_equal(box.numpy(), [1, 2, 3, 2, 0.25])
+
+        with pytest.raises(ValueError):
+            box.w = 0
+        with pytest.raises(ValueError):
+            box.h = -1
@@ -0,0 +1,54 @@
+"""Unit tests for rotated_bbox2d_list"""
+
+import numpy as np
+import pytest
+
+from bbox import RotatedBBox2D, RotatedBBox2DList
+
+
+class TestRotatedBBox2DList(object):
+    @classmethod
+    def setup_class(cls):
+        cls.n = 10
+        cls.l = [RotatedBBox2D(np.random.rand(5) * 10) for _ in range(cls.n)]
+        cls.bbl = RotatedBBox2DList(cls.l)
+
+    def test_null(self):
+        bbl = RotatedBBox2DList([])
+        assert len(bbl) == 0
+        assert bbl.shape == (0, 5)
+        assert bbl.p.shape == (0, 4, 2)
+
+    def test_init(self):
+        assert len(self.bbl) == self.n
+        assert RotatedBBox2DList(self.bbl) == self.bbl
+        assert RotatedBBox2DList(self.bbl.numpy()) == self.bbl
+        assert RotatedBBox2DList(self.bbl.numpy()[0]).shape == (1, 5)
+
+    def test_init_invalid(self):
+        with pytest.raises(TypeError):
+            RotatedBBox2DList("1, 2, 3")
+        with pytest.raises(TypeError):
+            RotatedBBox2DList([1, 2, 3])
+        with pytest.raises(ValueError):
+            RotatedBBox2DList(np.zeros((3, 4)))
+        with pytest.raises(ValueError):
+            RotatedBBox2DList(np.array([[0, 0, 1, 1, 0], [0, 0, 0, 1, 0]]))
+        with pytest.raises(ValueError):
+            RotatedBBox2DList(np.array([[0, 0, 1, -2, 0]]))
+
+    def test_attributes(self):
+        for i, box in enumerate(self.l):
+            assert self.bbl[i] == box
+            assert self.bbl.cx[i] == box.cx
+            assert self.bbl.cy[i] == box.cy
+            assert self.bbl.w[i] == box.w
+            assert self.bbl.h[i] == box.h
+            assert self.bbl.theta[i] == box.theta
+            assert np.isclose(self.bbl.area[i], box.area)
+            assert np.allclose(self.bbl.p[i], box.p)
+            assert np.allclose(self.bbl.aabb()[i], box.aabb())
+
+    def test_slice(self):
+        assert self.bbl[2:5] == RotatedBBox2DList(self.l[2:5])
+        assert self.bbl.tolist() == self.l
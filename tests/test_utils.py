@@ -1,7 +1,9 @@
 import numpy as np
-from bbox import BBox2D, BBox2DList, BBox3D
+from bbox import BBox2D, BBox2DList, BBox3D, RotatedBBox2DList
 from bbox.box_modes import XYXY, XYWH
-from bbox.utils import nms, aspect_ratio
+from bbox.metrics import jaccard_index_rotated_2d
+from bbox.utils import nms, batched_nms, soft_nms, weighted_box_fusion, aspect_ratio, \
+    rotated_nms
 from PIL import Image
 import pytest
 
@@ -78,6 +80,210 @@ def test_nms():
     assert np.all(keep == naive_keep)
 
 
+@pytest.mark.filterwarnings("ignore:.*[double_scalars|true_divide|less_equal]")
+def test_nms_sweep():
+    np.random.seed(529)
+    for _ in range(20):
+        n = np.random.randint(1, 200)
+        bboxes = np.random.randint(0, 300, size=(n, 4))
+        # include boxes with zero width/height
+        bboxes[:, 2:] = np.random.randint(0, 60, size=(n, 2))
+        scores = np.round(np.random.rand(n), 2)
+        bbl = BBox2DList(bboxes)
+
+        for thresh in (0, 0.0001, 0.3, 0.7, -1):
+            keep = nms(bbl, scores, thresh)
+            assert np.array_equal(nms(bbl, scores, thresh, method="sweep"), keep)
+
+
+def test_nms_invalid_method():
+    bbl = BBox2DList(np.random.randint(1, 50, size=(10, 4)))
+    with pytest.raises(ValueError):
+        nms(bbl, np.random.rand(10), 0.3, method="fast")
+
+
+@pytest.mark.filterwarnings("ignore:.*[double_scalars|true_divide|less_equal]")
+def test_batched_nms():
+    np.random.seed(529)
+    n = 300
+    bboxes = np.random.randint(0, 300, size=(n, 4))
+    bboxes[:, 2:] = np.random.randint(0, 60, size=(n, 2))
+    scores = np.random.rand(n)
+    group_ids = np.random.choice(["a", "b", "c", "d"], size=n)
+    bbl = BBox2DList(bboxes)
+
+    for thresh in (0, 0.3, 0.7, -1):
+        # run NMS separately for each group
+        keep = []
+        for g in np.unique(group_ids):
+            idx = np.flatnonzero(group_ids == g)
+            keep.append(idx[nms(BBox2DList(bboxes[idx]), scores[idx], thresh)])
+        keep = np.concatenate(keep)
+        keep = keep[np.argsort(-scores[keep])]
+
+        for method in ("greedy", "sweep"):
+            batched_keep = batched_nms(bbl, scores, group_ids, thresh, method=method)
+            assert np.array_equal(batched_keep, keep)
+
+
+def test_batched_nms_invalid():
+    assert batched_nms(BBox2DList([]), [], [], 0.5).shape == (0,)
+    bbl = BBox2DList(np.random.randint(1, 50, size=(10, 4)))
+    with pytest.raises(ValueError):
+        batched_nms(bbl, np.random.rand(10), np.zeros(9), 0.3)
+
+
+def test_nms_prefilter():
+    np.random.seed(529)
+    bboxes = np.random.randint(0, 300, size=(500, 4))
+    bboxes[:, 2:] = np.random.randint(1, 60, size=(500, 2))
+    scores = np.random.rand(500)
+    bbl = BBox2DList(bboxes)
+
+    for method in ("greedy", "sweep"):
+        keep = nms(bbl, scores, 0.3, method=method)
+
+        # the first kept boxes do not depend on the boxes after them
+        assert np.array_equal(nms(bbl, scores, 0.3, method=method, max_output=10), keep[:10])
+
+        top = np.argsort(-scores)[:100]
+        topk_keep = top[nms(BBox2DList(bboxes[top]), scores[top], 0.3)]
+        assert np.array_equal(nms(bbl, scores, 0.3, method=method, pre_nms_topk=100),
+                              topk_keep)
+
+        above = np.flatnonzero(scores > 0.5)
+        thresh_keep = above[nms(BBox2DList(bboxes[above]), scores[above], 0.3)]
+        assert np.array_equal(nms(bbl, scores, 0.3, method=method, score_thresh=0.5),
+                              thresh_keep)
+
+        keep = nms(bbl, scores, 0.3, method=method, score_thresh=0.5, pre_nms_topk=100,
+                   max_output=5)
+        assert np.array_equal(keep, thresh_keep[:5])
+
+    group_ids = np.random.randint(0, 3, size=500)
+    keep = batched_nms(bbl, scores, group_ids, 0.3)
+    assert np.array_equal(batched_nms(bbl, scores, group_ids, 0.3, max_output=20), keep[:20])
+
+
+def naive_soft_nms(dets, iou_thresh, sigma, score_thresh, method):
+    """Per-box reference implementation of Soft-NMS."""
+    dets = [list(d) + [i] for i, d in enumerate(dets)]
+    keep, kept_scores = [], []
+    while dets:
+        best = max(range(len(dets)), key=lambda k: dets[k][4])
+        b = dets.pop(best)
+        if b[4] <= score_thresh:
+            break
+        keep.append(b[5])
+        kept_scores.append(b[4])
+        for d in dets:
+            o = naive_nms_iou(b, d)
+            if method == "linear":
+                d[4] *= (1 - o) if o > iou_thresh else 1
+            else:
+                d[4] *= np.exp(-o * o / sigma)
+    return keep, kept_scores
+
+
+def naive_nms_iou(a, b):
+    w = max(0, min(a[2], b[2]) - max(a[0], b[0]) + 1)
+    h = max(0, min(a[3], b[3]) - max(a[1], b[1]) + 1)
+    inter = w * h
+    return inter / ((a[2] - a[0] + 1) * (a[3] - a[1] + 1) +
+                    (b[2] - b[0] + 1) * (b[3] - b[1] + 1) - inter)
+
+
+def test_soft_nms():
+    np.random.seed(529)
+    bboxes = np.random.randint(1, 50, size=(60, 4))
+    scores = np.random.rand(60)
+    bbl = BBox2DList(bboxes)
+    dets = np.hstack((bbl.numpy(mode=XYXY), scores[:, np.newaxis]))
+
+    for method in ("linear", "gaussian"):
+        keep, kept_scores = soft_nms(bbl, scores, iou_thresh=0.3, sigma=0.5,
+                                     score_thresh=0.01, method=method)
+        naive_keep, naive_scores = naive_soft_nms(dets, 0.3, 0.5, 0.01, method)
+        assert np.array_equal(keep, naive_keep)
+        assert np.allclose(kept_scores, naive_scores)
+        assert np.all(kept_scores > 0.01)
+
+
+def test_soft_nms_invalid():
+    bbl = BBox2DList(np.random.randint(1, 50, size=(10, 4)))
+    with pytest.raises(ValueError):
+        soft_nms(bbl, np.random.rand(10), method="hard")
+    with pytest.raises(ValueError):
+        soft_nms(bbl, np.random.rand(9))
+
+
+def test_weighted_box_fusion():
+    bbl = BBox2DList([[0, 0, 9, 9], [2, 0, 11, 9], [100, 100, 109, 109]], mode=XYXY)
+    scores = np.array([0.9, 0.3, 0.5])
+
+    fused, fused_scores = weighted_box_fusion(bbl, scores, iou_thresh=0.5)
+    assert np.allclose(fused.numpy(mode=XYXY), [[0.5, 0, 9.5, 9],
+                                                [100, 100, 109, 109]])
+    assert np.allclose(fused_scores, [0.6, 0.5])
+
+    fused, fused_scores = weighted_box_fusion(bbl, scores, iou_thresh=0.5, n_models=2)
+    assert np.allclose(fused_scores, [0.6, 0.25])
+
+    fused, fused_scores = weighted_box_fusion(bbl, scores, iou_thresh=0.9)
+    assert len(fused) == 3
+    assert np.allclose(fused_scores, [0.9, 0.5, 0.3])
+
+    fused, fused_scores = weighted_box_fusion(bbl, scores, score_thresh=0.4)
+    assert len(fused) == 2
+
+    # integer boxes are fused without truncation
+    fused, _ = weighted_box_fusion(BBox2DList(bbl, dtype=np.int32), scores, iou_thresh=0.5)
+    assert fused.dtype == np.float64
+    assert np.allclose(fused.numpy(mode=XYXY), [[0.5, 0, 9.5, 9], [100, 100, 109, 109]])
+
+
+def test_nms_dtype():
+    np.random.seed(529)
+    bboxes = np.random.randint(1, 50, size=(40, 4))
+    scores = np.random.rand(40)
+    keep = nms(BBox2DList(bboxes), scores, 0.3)
+
+    for dtype in (np.float32, np.float16, np.int32):
+        bbl = BBox2DList(bboxes, dtype=dtype)
+        assert np.array_equal(nms(bbl, scores, 0.3), keep)
+
+
+def naive_rotated_nms(iou, scores, thresh):
+    order = list(np.argsort(scores)[::-1])
+    keep = []
+    while order:
+        i = order.pop(0)
+        keep.append(i)
+        order = [j for j in order if iou[i, j] <= thresh]
+    return np.array(keep)
+
+
+def test_rotated_nms():
+    rng = np.random.default_rng(0)
+    boxes = np.hstack((rng.uniform(0, 60, size=(120, 2)), rng.uniform(5, 20, size=(120, 2)),
+                       rng.uniform(-np.pi, np.pi, size=(120, 1))))
+    bbl = RotatedBBox2DList(boxes)
+    scores = rng.random(120)
+    boxes = bbl.tolist()
+    iou = np.array([[jaccard_index_rotated_2d(x, y) for y in boxes] for x in boxes])
+
+    for thresh in (0.1, 0.3, 0.7):
+        keep = rotated_nms(bbl, scores, thresh)
+        assert np.array_equal(keep, naive_rotated_nms(iou, scores, thresh))
+
+    keep = rotated_nms(bbl, scores, 0.3, max_output=5)
+    assert np.array_equal(keep, naive_rotated_nms(iou, scores, 0.3)[:5])
+    assert rotated_nms(bbl[:0], scores[:0], 0.3).shape == (0,)
+
+    with pytest.raises(ValueError):
+        rotated_nms(bbl, scores[:10], 0.3)
+
+
 def test_aspect_ratio():
     box = BBox2D([0, 0, 15, 15], mode=XYXY)
     box_ar = aspect_ratio(box, [0.5, 1, 2])